@@ -0,0 +1,146 @@
+"""Build a pre-filled toolkit for every inquiry in data/uk_public_inquiries.csv.
+
+    python scripts/batch_workbooks.py -o toolkits/
+    python scripts/batch_workbooks.py -o toolkits/ --jobs 4 --cache-dir .toolkit-cache
+    python scripts/batch_workbooks.py -o toolkits/ --store archive/ --engagement acme-2026
+
+Each row's name, type, chair and dates fill the Overview tab (an ongoing
+inquiry gets an estimated Target Report Date), and its own profile is the
+query for the Comparable Inquiries tab. Builds run in a
+process pool (one worker per core by default) and are written to
+``<output dir>/<slug of the inquiry name>.xlsx``. A row that fails to build is
+reported and skipped; the exit status is non-zero if any row failed. With
+``--store`` the toolkits are also archived in a content-addressed store
+(package_store.py) under the engagement's manifest; builds are
+reproducible, so re-running a batch over unchanged data adds nothing to it.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+import build_workbook as bw
+import comparables
+import inquiry_data
+import package_store
+import sheet_cache
+
+def slugify(text, limit=80):
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:limit].rstrip("-") or "inquiry"
+
+def output_names(rows):
+    """One file name per row, in CSV order; repeated names get a numeric suffix."""
+    seen = {}
+    for row in rows:
+        slug = slugify(row.get("name") or "")
+        seen[slug] = seen.get(slug, 0) + 1
+        yield f"{slug}.xlsx" if seen[slug] == 1 else f"{slug}-{seen[slug]}.xlsx"
+
+def optional_date(text):
+    return date.fromisoformat(text.strip()) if text and text.strip() else ""
+
+def inquiry_info(row):
+    """Overview values for one CSV row; raises ValueError for unusable rows."""
+    name = (row.get("name") or "").strip()
+    if not name:
+        raise ValueError("row has no inquiry name")
+    if row.get("inquiry_type") not in ("statutory", "non_statutory"):
+        raise ValueError(f"unknown inquiry_type {row.get('inquiry_type')!r}")
+    return {
+        "Inquiry Name": name,
+        "Type": inquiry_data.type_label(row["inquiry_type"], row.get("statutory_basis") or ""),
+        "Chair": (row.get("chair_name") or "").strip(),
+        "Date Established": optional_date(row.get("date_established")),
+        "Target Report Date": optional_date(row.get("final_report_date")),
+    }
+
+def comparables_query(row):
+    """The row's own profile, so its Comparable Inquiries tab lists the others most like it."""
+    query = {field: (row.get(field) or "").strip() for field in ["description", *comparables.CATEGORY_FIELDS]}
+    query.update({field: inquiry_data.parse_number(row.get(field) or "") for field in comparables.SCALE_FIELDS})
+    query["exclude"] = [(row.get("name") or "").strip()]
+    return query
+
+def build_one(row, path, streaming=False, cache_dir=None):
+    """Worker: build one toolkit and return ``(seconds, error)``."""
+    t0 = time.perf_counter()
+    try:
+        config = {"info": inquiry_info(row), "streaming": streaming, "comparables": comparables_query(row),
+                  "durations": {field: row.get(field) or None for field in ("subject_area", "inquiry_type")}}
+        cache = sheet_cache.SheetCache(cache_dir) if cache_dir else None
+        bw.build_workbook(config, path, cache=cache)
+    except Exception as e:
+        return time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+    return time.perf_counter() - t0, None
+
+def read_rows(csv_path):
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+def build_all(csv_path, output_dir, jobs=None, streaming=False, cache_dir=None):
+    """Build every row of ``csv_path`` into ``output_dir``.
+
+    Yields ``(file name, inquiry name, seconds, error)`` as builds finish;
+    ``error`` is None on success.
+    """
+    rows = read_rows(csv_path)
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {}
+        for row, name in zip(rows, output_names(rows)):
+            path = os.path.join(output_dir, name)
+            futures[pool.submit(build_one, row, path, streaming, cache_dir)] = (name, row.get("name", ""))
+        for future in as_completed(futures):
+            name, inquiry = futures[future]
+            try:
+                seconds, error = future.result()
+            except Exception as e:  # the worker process itself died
+                seconds, error = None, f"{type(e).__name__}: {e}"
+            yield name, inquiry, seconds, error
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build one pre-filled toolkit per inquiry in the CSV.")
+    parser.add_argument("-o", "--output-dir", required=True, help="directory for the xlsx files")
+    parser.add_argument("--csv", default=inquiry_data.DATA_CSV)
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--streaming", action="store_true", help="use openpyxl write-only mode")
+    parser.add_argument("--cache-dir", metavar="DIR", help="share unchanged tabs between builds (see sheet_cache.py)")
+    parser.add_argument("--store", metavar="DIR", help="also archive the toolkits here (see package_store.py)")
+    parser.add_argument("--engagement", help="manifest to record them under (default: the output directory's name)")
+    args = parser.parse_args(argv)
+    engagement = args.engagement or slugify(os.path.basename(os.path.abspath(args.output_dir)))
+    if not package_store.ENGAGEMENT.fullmatch(engagement):
+        parser.error(f"engagement names are letters, digits, '.', '-' and '_', not {engagement!r}")
+    store = package_store.PackageStore(args.store) if args.store else None
+
+    t0 = time.perf_counter()
+    results, stored, written = [], {}, 0
+    for name, inquiry, seconds, error in build_all(args.csv, args.output_dir, args.jobs, args.streaming, args.cache_dir):
+        took = "      -" if seconds is None else f"{seconds:6.2f}s"
+        print(f"  {took}  {name}" + (f"  FAILED ({inquiry}): {error}" if error else ""))
+        results.append((name, error))
+        if store is not None and error is None:
+            with open(os.path.join(args.output_dir, name), "rb") as f:
+                data = f.read()
+            digest, n = store.put(data)
+            stored[name] = (digest, len(data))
+            written += n
+
+    failed = sorted(name for name, error in results if error)
+    print(f"\nBuilt {len(results) - len(failed)} of {len(results)} toolkits in {time.perf_counter() - t0:.1f}s")
+    if store is not None:
+        changed = store.record(engagement, stored)
+        print(f"Archived in {args.store} as {engagement!r}: {len(changed)} new or changed, "
+              f"{written / 1024:.0f} KiB written for {sum(size for _, size in stored.values()) / 1024:.0f} KiB of xlsx")
+    if failed:
+        print("Failed:\n  " + "\n  ".join(failed))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
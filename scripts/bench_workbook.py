@@ -0,0 +1,184 @@
+"""Benchmark workbook generation: per-tab wall time, peak memory and xlsx size.
+
+    python scripts/bench_workbook.py -o bench.json
+    python scripts/bench_workbook.py --scales 50 1000 --baseline bench.json
+
+Each (rows, mode) run happens in a fresh process so peak RSS is per run.
+Timings come from an untraced build and tracemalloc peaks from a second,
+traced build, so tracing overhead never leaks into the wall times.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+
+import openpyxl
+
+import build_metrics
+import build_workbook as bw
+
+DEFAULT_SCALES = [50, 1_000, 10_000, 100_000]
+MODES = ["normal", "streaming", "xml"]
+
+# ── Synthetic register rows (values respect each tab's validations) ──
+def decision_rows(n):
+    phases = list(bw.phase_data) + ["Cross-cutting"]
+    for i in range(n):
+        yield [f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", phases[i % len(phases)], f"Decision {i}",
+               "Option A; Option B", f"Rationale for decision {i}", "Chair", "None identified", None]
+
+def core_participant_rows(n):
+    types = ["Individual", "Organisation", "Government Body", "Action Group", "Other"]
+    funding = ["Public Funded", "Self-Funded", "Application Pending", "Not Applicable"]
+    for i in range(n):
+        yield [f"Core Participant {i}", types[i % len(types)], "All modules", "2024-01-15",
+               f"Solicitors LLP {i % 250}", funding[i % len(funding)], f"Group {i % 40}", f"contact{i}@example.org", None]
+
+def stakeholder_rows(n):
+    cats = ["Sponsor Department", "Core Participant", "Witness", "Victims / Families", "Media", "Other"]
+    levels = ["Manage Closely", "Keep Satisfied", "Keep Informed", "Monitor"]
+    for i in range(n):
+        yield [f"Stakeholder {i}", cats[i % len(cats)], "Interested party", ["High", "Medium", "Low"][i % 3],
+               levels[i % len(levels)], f"contact{i}@example.org", "Monthly briefing", None]
+
+def stage_name(tab_name):
+    # All seven checklist tabs are reported as one stage
+    return "Phase tabs" if tab_name in bw.phase_data else tab_name
+
+# ── One build, run inside a worker process ──
+def run_build(rows, mode, trace):
+    config = {
+        "streaming": mode == "streaming",
+        "backend": "xml" if mode == "xml" else "openpyxl",
+        "register_rows": min(rows, bw.DEFAULT_CONFIG["register_rows"]),
+        "decisions": decision_rows(rows),
+        "core_participants": core_participant_rows(rows),
+        "stakeholders": stakeholder_rows(rows),
+    }
+    metrics = build_metrics.BuildMetrics(trace_memory=trace)
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        bw.build_workbook(config, path, metrics=metrics)
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+    stages = {}
+    for name, measured in metrics.result["stages"].items():
+        stage = stages.setdefault(stage_name(name), {"seconds": 0.0})
+        stage["seconds"] += measured["seconds"]
+        if trace:
+            stage["tracemalloc_peak_bytes"] = max(stage.get("tracemalloc_peak_bytes", 0), measured["tracemalloc_peak_bytes"])
+    return {"wall_seconds": metrics.result["wall_seconds"], "stages": stages,
+            "peak_rss_bytes": build_metrics.max_rss_bytes(), "xlsx_bytes": size}
+
+def run_isolated(rows, mode, trace):
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_build, rows, mode, trace).result()
+
+def run_scale(rows, mode, trace=True):
+    result = {"rows": rows, "mode": mode, **run_isolated(rows, mode, trace=False)}
+    if trace:
+        traced = run_isolated(rows, mode, trace=True)
+        for name, stage in traced["stages"].items():
+            result["stages"][name]["tracemalloc_peak_bytes"] = stage["tracemalloc_peak_bytes"]
+    return result
+
+# ── Reporting ──
+def fmt_bytes(n):
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def pct_change(new, old):
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100
+
+def print_run(run, base=None):
+    def delta(new, old):
+        change = pct_change(new, old)
+        return "" if change is None else f" ({change:+.1f}%)"
+
+    print(f"\n{run['rows']:,} rows, {run['mode']}")
+    b = base or {}
+    print(f"  wall        {run['wall_seconds']:8.2f}s{delta(run['wall_seconds'], b.get('wall_seconds'))}")
+    print(f"  peak RSS    {fmt_bytes(run['peak_rss_bytes']):>9}{delta(run['peak_rss_bytes'], b.get('peak_rss_bytes'))}")
+    print(f"  xlsx size   {fmt_bytes(run['xlsx_bytes']):>9}{delta(run['xlsx_bytes'], b.get('xlsx_bytes'))}")
+    base_stages = b.get("stages", {})
+    for name, stage in run["stages"].items():
+        old = base_stages.get(name, {})
+        peak = stage.get("tracemalloc_peak_bytes")
+        print(f"    {name:<28}{stage['seconds']:8.3f}s{delta(stage['seconds'], old.get('seconds')):<12}"
+              f"{'' if peak is None else 'tracemalloc ' + fmt_bytes(peak)}")
+
+def regressions(runs, baseline, threshold):
+    found = []
+    for run in runs:
+        base = baseline.get((run["rows"], run["mode"]))
+        if not base:
+            continue
+        for key in ("wall_seconds", "xlsx_bytes", "peak_rss_bytes"):
+            change = pct_change(run[key], base.get(key))
+            if change is not None and change > threshold:
+                found.append(f"{run['rows']:,} rows {run['mode']}: {key} {change:+.1f}%")
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark build_workbook at several register sizes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="rows per register (CP Register, Stakeholder Map, Decision Log)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip the traced pass")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, metavar="PCT",
+                        help="exit non-zero if wall time, RSS or size grows by more than PCT%% vs the baseline")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {(r["rows"], r["mode"]): r for r in json.load(f)["runs"]}
+
+    runs = []
+    for rows in args.scales:
+        for mode in args.modes:
+            run = run_scale(rows, mode, trace=not args.no_tracemalloc)
+            print_run(run, baseline.get((rows, mode)))
+            runs.append(run)
+
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "openpyxl": openpyxl.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.baseline and args.max_regression is not None:
+        found = regressions(runs, baseline, args.max_regression)
+        if found:
+            print("\nRegressions over threshold:\n  " + "\n  ".join(found))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Budget forecast for the Budget Tracker, resampled from comparable inquiries.
+
+The comparables are the inquiries in data/uk_public_inquiries.csv with a known
+cost, optionally narrowed by subject area, type or scale. When the new
+inquiry's expected hearing days, witnesses or core participants are given,
+each comparable's cost is scaled by the geometric mean of the ratios of those
+drivers. The P10/P50/P90 are bootstrap estimates: the comparables are
+resampled with replacement, the percentiles of each resample are taken,
+and each percentile is averaged over the resamples, which smooths the jumps
+between the few costs a small group has. They describe the range one more
+inquiry like them might cost (not the uncertainty of their median, which
+is far narrower); the total is then split across the Budget Tracker
+categories using the COST_CATEGORIES percentages for the forecast's scale
+class. Filters that leave fewer than two comparables fall back to all
+inquiries with a cost.
+"""
+import numpy as np
+
+import inquiry_data
+
+RESAMPLES = 10_000
+# Fixed so that rebuilding a workbook gives the same figures
+SEED = 2005
+FORECAST_PERCENTILES = [10, 50, 90]
+
+# Profile keyword -> CSV column used to scale comparable costs
+DRIVERS = {
+    "hearing_days": "hearing_days",
+    "witnesses": "witnesses_count",
+    "core_participants": "core_participants_count",
+}
+
+# Same groups and percentages as src/data/costCategories.js, by scale class
+COST_GROUPS = {
+    "legal": {"small": 40, "medium": 55, "large": 60, "very large": 55},
+    "staff": {"small": 30, "medium": 20, "large": 15, "very large": 15},
+    "accommodation": {"small": 10, "medium": 10, "large": 10, "very large": 10},
+    "tech": {"small": 10, "medium": 8, "large": 8, "very large": 10},
+    "other": {"small": 10, "medium": 7, "large": 7, "very large": 10},
+}
+
+# Budget Tracker category -> (COST_CATEGORIES group, share of that group)
+category_groups = {
+    "Chair and panel fees": ("staff", 0.20),
+    "Counsel fees": ("legal", 0.40),
+    "Solicitor and legal team costs": ("legal", 0.35),
+    "Core participant legal costs": ("legal", 0.25),
+    "Secretariat staff salaries": ("staff", 0.60),
+    "Accommodation — office": ("accommodation", 0.30),
+    "Accommodation — hearing venue": ("accommodation", 0.35),
+    "IT systems and evidence management": ("tech", 0.80),
+    "Website hosting and development": ("tech", 0.20),
+    "Transcription services": ("accommodation", 0.15),
+    "Broadcast and AV": ("accommodation", 0.20),
+    "Witness expenses": ("other", 0.10),
+    "Witness and staff welfare support": ("staff", 0.10),
+    "Travel and subsistence": ("other", 0.15),
+    "Security": ("staff", 0.10),
+    "Communications and media": ("other", 0.15),
+    "Expert and assessor fees": ("other", 0.25),
+    "Printing and publication": ("other", 0.10),
+    "Archiving and records management": ("other", 0.10),
+    "Other / contingency": ("other", 0.15),
+}
+
+def comparable_mask(table, subject_area=None, inquiry_type=None, scale=None):
+    cost = table["cost_millions"]
+    mask = cost > 0  # NaN compares False
+    if subject_area:
+        mask &= table["subject_area"] == subject_area
+    if inquiry_type:
+        mask &= table["inquiry_type"] == inquiry_type
+    if scale:
+        mask &= inquiry_data.scale_class(cost) == scale
+    return mask
+
+def scaled_costs(table, mask, drivers):
+    """Comparable costs (£m), scaled to the new inquiry's drivers where given."""
+    cost = table["cost_millions"][mask]
+    if not drivers:
+        return cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.array([np.log(value / table[DRIVERS[key]][mask]) for key, value in drivers.items()])
+    logs[~np.isfinite(logs)] = np.nan
+    known = ~np.isnan(logs).all(axis=0)
+    # Comparables missing every driver can't be scaled and are left out
+    ratio = np.exp(np.nanmean(logs[:, known], axis=0))
+    return cost[known] * ratio
+
+def bootstrap_percentiles(values, resamples=RESAMPLES, seed=SEED):
+    """P10/P50/P90 of ``values``, each averaged over ``resamples`` bootstrap resamples of them."""
+    rng = np.random.default_rng(seed)
+    samples = values[rng.integers(0, len(values), size=(resamples, len(values)))]
+    return np.percentile(samples, FORECAST_PERCENTILES, axis=1).mean(axis=1)
+
+def category_shares(categories, scale):
+    """Fraction of the total for each category; sums to 1."""
+    shares = np.array([COST_GROUPS[group][scale] * weight for group, weight in map(category_groups.__getitem__, categories)])
+    return shares / shares.sum()
+
+def forecast(categories, csv_path=inquiry_data.DATA_CSV, subject_area=None, inquiry_type=None, scale=None,
+             hearing_days=None, witnesses=None, core_participants=None, resamples=RESAMPLES):
+    """Forecast the total cost and split it across ``categories``.
+
+    Returns a dict with ``n`` (comparables used), ``widened`` (True if the
+    filters matched too few and every inquiry with a cost was used),
+    ``scale`` (class of the P50), ``totals`` (P10/P50/P90 in £), ``shares``
+    and ``by_category`` (an array of P10/P50/P90 in £, one row per category).
+    """
+    table = inquiry_data.load_inquiries(csv_path)
+    drivers = {key: value for key, value in
+               [("hearing_days", hearing_days), ("witnesses", witnesses), ("core_participants", core_participants)]
+               if value}
+    values = scaled_costs(table, comparable_mask(table, subject_area, inquiry_type, scale), drivers)
+    widened = len(values) < 2 and bool(subject_area or inquiry_type or scale)
+    if widened:
+        values = scaled_costs(table, comparable_mask(table), drivers)
+    if len(values) < 2:
+        raise ValueError(f"Only {len(values)} inquiries with a known cost to forecast from")
+
+    totals = bootstrap_percentiles(values, resamples) * 1_000_000
+    forecast_scale = inquiry_data.scale_class(np.array([totals[1] / 1_000_000]))[0]
+    shares = category_shares(categories, forecast_scale)
+    return {
+        "n": len(values),
+        "widened": widened,
+        "resamples": resamples,
+        "scale": forecast_scale,
+        "totals": dict(zip(FORECAST_PERCENTILES, totals.tolist())),
+        "shares": shares,
+        "by_category": np.outer(shares, totals),
+    }
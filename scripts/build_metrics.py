@@ -0,0 +1,161 @@
+"""Opt-in instrumentation for build_workbook.build_workbook.
+
+    python scripts/build_workbook.py --metrics metrics.json
+    python scripts/build_workbook.py --metrics - --trace-memory --profile build.prof
+
+From code, pass a BuildMetrics and read ``metrics.result`` afterwards, or give
+it a callback that receives the same dict when the build finishes:
+
+    metrics = build_metrics.BuildMetrics(callback=export)
+    build_workbook.build_workbook(config, path, metrics=metrics)
+
+Each tab builder and the final save are a stage. A stage records its wall
+time, the cells appended, the style objects added to the workbook's style
+tables (fonts, fills, borders, alignments, number formats, cell and
+differential styles), the data-validation ranges added, and the process's
+peak RSS so far; with ``trace_memory`` also the tracemalloc peak within the
+stage. Tabs copied from the sheet cache are listed under ``reused`` instead.
+With ``profile`` the whole build runs under cProfile and the stats are
+dumped there (read them with ``python -m pstats``). Without a BuildMetrics
+the builder does none of this.
+"""
+from contextlib import contextmanager
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STYLE_TABLES = ["_fonts", "_fills", "_borders", "_alignments", "_protections", "_number_formats",
+                "_cell_styles", "_named_styles"]
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def style_count(wb):
+    # The XML backend keeps its style tables on an inner openpyxl workbook
+    registry = getattr(wb, "_styles", wb)
+    return sum(len(getattr(registry, table)) for table in STYLE_TABLES) + registry._differential_styles.count
+
+def validation_count(ws):
+    return sum(len(dv.sqref.ranges) for dv in ws.data_validations.dataValidation)
+
+class BuildMetrics:
+    """Collects per-stage timings and counters for one build at a time."""
+
+    def __init__(self, trace_memory=False, profile=None, callback=None):
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.callback = callback
+        self.result = None
+
+    @contextmanager
+    def build(self, wb, config):
+        """Instrument the build of ``wb``; the result is emitted when the block exits cleanly."""
+        self.wb = wb
+        self.stages = {}
+        self.reused = []
+        self.cells = 0
+        self.watch_sheets(wb)
+        profiler = cProfile.Profile() if self.profile else None
+        if self.trace_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(self.profile)
+            wall = time.perf_counter() - t0
+            if self.trace_memory:
+                tracemalloc.stop()
+            del wb.create_sheet
+            self.wb = None
+        self.result = self.summary(config, wall)
+        if self.callback is not None:
+            self.callback(self.result)
+
+    def watch_sheets(self, wb):
+        """Count the cells every new sheet's ``append`` is given."""
+        create_sheet = wb.create_sheet
+
+        def counted_create_sheet(*args, **kwargs):
+            ws = create_sheet(*args, **kwargs)
+            append = ws.append
+
+            def counted_append(row):
+                row = list(row)
+                self.cells += len(row)
+                append(row)
+            ws.append = counted_append
+            return ws
+        wb.create_sheet = counted_create_sheet
+
+    @contextmanager
+    def stage(self, name):
+        """Time one stage; the yielded dict takes extra fields (e.g. validations)."""
+        entry = {}
+        styles, cells = style_count(self.wb), self.cells
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        yield entry
+        entry.update({
+            "seconds": time.perf_counter() - t0,
+            "cells": self.cells - cells,
+            "styles": style_count(self.wb) - styles,
+            "max_rss_bytes": max_rss_bytes(),
+        })
+        if self.trace_memory:
+            entry["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        self.stages[name] = entry
+
+    def builder(self, name, build):
+        """``build`` wrapped as a stage of its own."""
+        def instrumented(wb):
+            with self.stage(name) as entry:
+                ws = build(wb)
+                entry["validations"] = validation_count(ws)
+            return ws
+        return instrumented
+
+    def saver(self, save):
+        def instrumented(wb, *args):
+            with self.stage("save"):
+                return save(wb, *args)
+        return instrumented
+
+    def summary(self, config, wall):
+        totals = {key: sum(s.get(key, 0) for s in self.stages.values()) for key in ("cells", "styles", "validations")}
+        return {
+            "backend": config["backend"],
+            "streaming": config["streaming"],
+            "wall_seconds": wall,
+            "stages": self.stages,
+            "reused": self.reused,
+            "totals": totals,
+            "max_rss_bytes": max_rss_bytes(),
+            "tracemalloc_peak_bytes": max((s["tracemalloc_peak_bytes"] for s in self.stages.values()), default=None)
+            if self.trace_memory else None,
+            "profile": self.profile,
+        }
+
+def write_json(result, path):
+    """Write ``result`` to ``path``, or to stdout for "-"."""
+    text = json.dumps(result, indent=2)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
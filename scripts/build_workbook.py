@@ -1,9 +1,34 @@
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, numbers
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle, numbers
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.utils import get_column_letter, quote_sheetname
+from openpyxl.workbook.child import INVALID_TITLE_REGEX
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+import numpy as np
 from copy import copy
-
-wb = Workbook()
+from datetime import date
+from functools import partial
+from itertools import zip_longest
+import argparse
+import csv
+import io
+import json
+import os
+
+import budget_forecast
+import build_metrics
+import comparables
+import durations
+import evidence_review
+import formula_values
+import inquiry_data
+import package_store
+import schedule
+import search_index
+import sheet_cache
+import xml_backend
 
 # ── Colour palette ──
 NAVY = "1B2A4A"
@@ -38,6 +63,28 @@ thin_border = Border(
 center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
 left_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
 wrap_align = Alignment(vertical="top", wrap_text=True)
+band_fill = PatternFill("solid", fgColor=PALE_BLUE)
+total_font = Font(name="Arial", bold=True, color=WHITE, size=10)
+link_font = Font(name="Arial", size=10, color="0563C1", underline="single")
+# Differential fill used by the banding rule (dxf fills take the bgColor)
+band_dxf_fill = PatternFill("solid", start_color=PALE_BLUE, end_color=PALE_BLUE)
+# Timeline bars: critical items, other items, and their slack
+critical_dxf_fill = PatternFill("solid", start_color="C00000", end_color="C00000")
+bar_dxf_fill = PatternFill("solid", start_color=MID_BLUE, end_color=MID_BLUE)
+slack_dxf_fill = PatternFill("solid", start_color=LIGHT_BLUE, end_color=LIGHT_BLUE)
+
+# ── Named styles ──
+# Registered once per workbook; cells point at a style by name instead of
+# each carrying its own font, fill, alignment and border.
+named_styles = {
+    "header": dict(font=header_font, fill=header_fill, alignment=center_align, border=thin_border),
+    "sub-header": dict(font=sub_header_font, fill=sub_header_fill, alignment=center_align, border=thin_border),
+    "body": dict(font=body_font, alignment=wrap_align, border=thin_border),
+    # Not applied by the builder (banding is conditional formatting) but kept
+    # in the Cell Styles gallery for rows formatted by hand.
+    "body-alt": dict(font=body_font, fill=band_fill, alignment=wrap_align, border=thin_border),
+    "total": dict(font=total_font, fill=header_fill, border=thin_border),
+}
 
 status_fills = {
     "Not Started": PatternFill("solid", fgColor=LIGHT_GREY),
@@ -47,72 +94,108 @@ status_fills = {
     "Blocked": PatternFill("solid", fgColor=RED_BG),
 }
 
-def style_header_row(ws, row, max_col):
-    for col in range(1, max_col + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center_align
-        cell.border = thin_border
-
-def style_sub_header_row(ws, row, max_col):
-    for col in range(1, max_col + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.font = sub_header_font
-        cell.fill = sub_header_fill
-        cell.alignment = center_align
-        cell.border = thin_border
-
-def style_data_rows(ws, start_row, end_row, max_col, alt=True):
-    for r in range(start_row, end_row + 1):
-        for c in range(1, max_col + 1):
-            cell = ws.cell(row=r, column=c)
-            cell.font = body_font
-            cell.alignment = wrap_align
-            cell.border = thin_border
-            if alt and (r - start_row) % 2 == 1:
-                cell.fill = PatternFill("solid", fgColor=PALE_BLUE)
-
-def add_title(ws, title, subtitle=None):
-    ws.cell(row=1, column=1, value=title).font = title_font
-    if subtitle:
-        ws.cell(row=2, column=1, value=subtitle).font = subtitle_font
-    ws.row_dimensions[1].height = 30
-    return 4 if subtitle else 3
-
-def add_data_validation_status(ws, col_letter, start_row, end_row):
-    from openpyxl.worksheet.datavalidation import DataValidation
-    dv = DataValidation(type="list", formula1='"Not Started,In Progress,Complete,N/A,Blocked"', allow_blank=True)
-    dv.error = "Please select a valid status"
-    dv.errorTitle = "Invalid Status"
-    ws.add_data_validation(dv)
-    dv.add(f"{col_letter}{start_row}:{col_letter}{end_row}")
-
-def add_priority_validation(ws, col_letter, start_row, end_row):
-    from openpyxl.worksheet.datavalidation import DataValidation
-    dv = DataValidation(type="list", formula1='"High,Medium,Low"', allow_blank=True)
-    ws.add_data_validation(dv)
-    dv.add(f"{col_letter}{start_row}:{col_letter}{end_row}")
+def register_named_styles(wb):
+    for name, attrs in named_styles.items():
+        wb.add_named_style(NamedStyle(name=name, **attrs))
+
+def styled_cell(ws, value=None, font=None, fill=None, alignment=None, border=None, number_format=None, style=None):
+    # Sheets from the XML backend bring their own lightweight cell type
+    cell = getattr(ws, "cell_class", WriteOnlyCell)(ws, value=value)
+    if style is not None:
+        cell.style = style
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
+
+def header_row(ws, headers):
+    return [styled_cell(ws, h, style="header") for h in headers]
+
+def sub_header_row(ws, values):
+    return [styled_cell(ws, v, style="sub-header") for v in values]
+
+def data_row(ws, values, max_col):
+    values = list(values)
+    values += [None] * (max_col - len(values))
+    return [styled_cell(ws, v, style="body") for v in values]
+
+def add_banding(ws, header_row, end_row, max_col):
+    # Shade every second data row below the header with a single rule
+    ref = f"A{header_row + 1}:{get_column_letter(max_col)}{end_row}"
+    ws.conditional_formatting.add(ref, FormulaRule(formula=[f"MOD(ROW()-{header_row},2)=0"], fill=band_dxf_fill))
+
+def set_column_widths(ws, widths):
+    for i, w in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = w
 
-def add_likelihood_validation(ws, col_letter, start_row, end_row):
-    from openpyxl.worksheet.datavalidation import DataValidation
-    dv = DataValidation(type="list", formula1='"High,Medium,Low"', allow_blank=True)
-    ws.add_data_validation(dv)
-    dv.add(f"{col_letter}{start_row}:{col_letter}{end_row}")
+def merge_row(ws, row, end_column):
+    ref = f"A{row}:{get_column_letter(end_column)}{row}"
+    if hasattr(ws, "merge_cells"):
+        ws.merge_cells(ref)
+    else:  # write-only sheets just record the range
+        ws.merged_cells.add(ref)
+
+# Rows are appended in order so every builder works on both normal and
+# write-only (streaming) worksheets: column widths, row heights and freeze
+# panes must be set before the first append; validations, filters and merges
+# may follow the rows.
+def add_title(ws, title, subtitle=None, frozen_columns=0):
+    start = 4 if subtitle else 3
+    ws.row_dimensions[1].height = 30
+    # Set before any row is appended: streaming sheets write their views first
+    ws.freeze_panes = f"{get_column_letter(frozen_columns + 1)}{start + 1}"
+    ws.append([styled_cell(ws, title, title_font)])
+    if subtitle:
+        ws.append([styled_cell(ws, subtitle, subtitle_font)])
+    ws.append([])
+    return start
+
+def add_register_rows(ws, start, rows, max_col, min_rows):
+    """Append numbered register rows below the header row ``start``.
+
+    ``rows`` is any iterable of value sequences (without the "#" column) and
+    is consumed lazily; blank numbered rows follow until ``min_rows`` exist.
+    Returns the last row written.
+    """
+    idx = 0
+    for idx, values in enumerate(rows or (), 1):
+        ws.append(data_row(ws, [idx, *values], max_col))
+    for idx in range(idx + 1, min_rows + 1):
+        ws.append(data_row(ws, [idx], max_col))
+    end = start + idx
+    add_banding(ws, start, end, max_col)
+    return end
+
+# Drop-downs read their options from the hidden Lists tab through a
+# workbook-level name per list, and run from the first data row to the
+# bottom of the sheet so rows added later are covered too.
+MAX_ROW = 1048576
+
+def list_validation(ws, name):
+    """The drop-down of the ``name`` list on ``ws``, added on first use."""
+    for dv in ws.data_validations.dataValidation:
+        if dv.formula1 == name:
+            return dv
+    dv = DataValidation(type="list", formula1=name, allow_blank=True)
+    if name == "Status":
+        dv.error = "Please select a valid status"
+        dv.errorTitle = "Invalid Status"
+    ws.data_validations.append(dv)
+    return dv
+
+def add_list_validation(ws, name, col_letter, start_row):
+    list_validation(ws, name).add(f"{col_letter}{start_row}:{col_letter}{MAX_ROW}")
 
 # ═══════════════════════════════════════════════════════════════
-# TAB 1: OVERVIEW & INSTRUCTIONS
+# CONTENT — checklist, risk, matrix and budget tables
 # ═══════════════════════════════════════════════════════════════
-ws = wb.active
-ws.title = "Overview"
-ws.sheet_properties.tabColor = NAVY
-
-r = 1
-ws.cell(row=r, column=1, value="Public Inquiry Consulting Toolkit").font = Font(name="Arial", bold=True, color=NAVY, size=18)
-ws.row_dimensions[r].height = 35
-r += 1
-ws.cell(row=r, column=1, value="Lifecycle Management Workbook").font = Font(name="Arial", bold=True, color=MID_BLUE, size=13)
-r += 2
 
 info = [
     ("Inquiry Name:", ""),
@@ -126,15 +209,7 @@ info = [
     ("Terms of Reference Date:", ""),
     ("Target Report Date:", ""),
 ]
-for label, val in info:
-    ws.cell(row=r, column=1, value=label).font = bold_font
-    ws.cell(row=r, column=2, value=val).font = body_font
-    ws.cell(row=r, column=2).alignment = left_align
-    r += 1
-
-r += 1
-ws.cell(row=r, column=1, value="How to use this workbook").font = subtitle_font
-r += 1
+
 instructions = [
     "Each tab corresponds to a phase of the inquiry lifecycle. Use the checklists to track progress.",
     "The Decision Log captures key decisions for institutional memory — fill it as you go.",
@@ -143,21 +218,6 @@ instructions = [
     "The Budget Tracker, CP Register, and Stakeholder Map are cross-cutting tools.",
     "Status options: Not Started | In Progress | Complete | N/A | Blocked",
 ]
-for inst in instructions:
-    ws.cell(row=r, column=1, value=inst).font = body_font
-    ws.cell(row=r, column=1).alignment = wrap_align
-    ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=5)
-    r += 1
-
-ws.column_dimensions["A"].width = 30
-ws.column_dimensions["B"].width = 45
-ws.column_dimensions["C"].width = 20
-ws.column_dimensions["D"].width = 20
-ws.column_dimensions["E"].width = 20
-
-# ═══════════════════════════════════════════════════════════════
-# PHASE TABS — checklist items for each phase
-# ═══════════════════════════════════════════════════════════════
 
 phase_data = {
     "1. Establish & Scope": {
@@ -290,86 +350,108 @@ phase_data = {
     },
 }
 
-for tab_name, data in phase_data.items():
-    ws = wb.create_sheet(title=tab_name)
-    ws.sheet_properties.tabColor = data["color"]
-
-    start = add_title(ws, tab_name, data["subtitle"])
-
-    headers = ["#", "Action Item", "Description / Guidance", "Priority", "Responsible Role", "Status", "Target Date", "Notes"]
-    col_widths = [5, 35, 55, 10, 20, 14, 14, 30]
-    for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-        ws.cell(row=start, column=i, value=h)
-        ws.column_dimensions[get_column_letter(i)].width = w
-    style_header_row(ws, start, len(headers))
-
-    data_start = start + 1
-    for idx, (action, desc, priority, role) in enumerate(data["items"], 1):
-        r = data_start + idx - 1
-        ws.cell(row=r, column=1, value=idx)
-        ws.cell(row=r, column=2, value=action)
-        ws.cell(row=r, column=3, value=desc)
-        ws.cell(row=r, column=4, value=priority)
-        ws.cell(row=r, column=5, value=role)
-        ws.cell(row=r, column=6, value="Not Started")
-        ws.cell(row=r, column=7, value="")
-        ws.cell(row=r, column=8, value="")
-
-    data_end = data_start + len(data["items"]) - 1
-    style_data_rows(ws, data_start, data_end, len(headers))
-    add_data_validation_status(ws, "F", data_start, data_end)
-    add_priority_validation(ws, "D", data_start, data_end)
-
-    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{data_end}"
-    ws.freeze_panes = f"A{data_start}"
-
-# ═══════════════════════════════════════════════════════════════
-# DECISION LOG
-# ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="Decision Log")
-ws.sheet_properties.tabColor = "7030A0"
-
-start = add_title(ws, "Decision Log", "Capturing key decisions for institutional memory")
-
-headers = ["#", "Date", "Phase", "Decision", "Options Considered", "Rationale", "Decided By", "Implications / Dependencies", "Review Date"]
-col_widths = [5, 12, 18, 35, 35, 35, 18, 30, 12]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
-
-from openpyxl.worksheet.datavalidation import DataValidation
-phase_dv = DataValidation(type="list",
-    formula1='"1. Establish & Scope,2. Appointments & Team,3. Infrastructure & Ops,4. Protocols & Procedures,5. Evidence & Investigation,6. Hearings,7. Report & Closure,Cross-cutting"',
-    allow_blank=True)
-ws.add_data_validation(phase_dv)
-
-for r in range(start + 1, start + 51):
-    ws.cell(row=r, column=1, value=r - start)
-    for c in range(1, len(headers) + 1):
-        ws.cell(row=r, column=c).font = body_font
-        ws.cell(row=r, column=c).alignment = wrap_align
-        ws.cell(row=r, column=c).border = thin_border
-        if (r - start) % 2 == 0:
-            ws.cell(row=r, column=c).fill = PatternFill("solid", fgColor=PALE_BLUE)
-phase_dv.add(f"C{start+1}:C{start+50}")
-ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{start+50}"
-ws.freeze_panes = f"A{start+1}"
-
-# ═══════════════════════════════════════════════════════════════
-# RISK REGISTER
-# ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="Risk Register")
-ws.sheet_properties.tabColor = "C00000"
-
-start = add_title(ws, "Risk Register", "Common pitfalls and risks across the inquiry lifecycle")
-
-headers = ["#", "Phase", "Risk Description", "Likelihood", "Impact", "Risk Rating", "Mitigation", "Owner", "Status", "Review Date"]
-col_widths = [5, 18, 40, 12, 12, 12, 40, 18, 14, 12]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
+# Planning weeks for each checklist item and the items it waits for, used by
+# the Timeline tab (schedule.py). The weeks are relative: the plan is
+# stretched to end on the benchmark report date.
+phase_plan = {
+    # 1. Establish & Scope
+    "Confirm statutory basis": (2, []),
+    "Draft and consult on terms of reference": (6, ["Confirm statutory basis"]),
+    "Assess ECHR obligations": (2, []),
+    "Check concurrent proceedings": (2, []),
+    "Scoping exercise": (4, []),
+    "Consult previous administrations": (2, ["Scoping exercise"]),
+    "Public Sector Equality Duty assessment": (2, ["Draft and consult on terms of reference"]),
+    "Prepare announcement": (2, ["Draft and consult on terms of reference", "Consult previous administrations", "Appoint chair"]),
+    "Publish terms of reference": (1, ["Prepare announcement", "Public Sector Equality Duty assessment", "Assess ECHR obligations", "Check concurrent proceedings"]),
+    "Commission cost and duration estimate": (3, ["Scoping exercise"]),
+    # 2. Appointments & Team
+    "Appoint chair": (4, ["Confirm statutory basis"]),
+    "Assess need for panel members": (2, ["Appoint chair"]),
+    "Appoint inquiry secretary": (4, ["Confirm statutory basis"]),
+    "Appoint solicitor to the inquiry": (6, ["Appoint chair"]),
+    "Assess need for and appoint counsel": (6, ["Appoint solicitor to the inquiry"]),
+    "Agree engagement letters and terms": (2, ["Assess need for and appoint counsel"]),
+    "National security vetting": (8, ["Appoint inquiry secretary"]),
+    "Conflict of interest checks": (2, ["Appoint chair"]),
+    "Build wider secretariat": (8, ["Appoint inquiry secretary"]),
+    "Agree staff welfare and support arrangements": (2, ["Build wider secretariat"]),
+    "Plan for return of staff to parent departments": (2, ["Build wider secretariat"]),
+    # 3. Infrastructure & Ops
+    "Identify and secure hearing venue": (12, ["Appoint inquiry secretary"]),
+    "Secure office accommodation": (6, ["Appoint inquiry secretary"]),
+    "Procure IT systems — basic infrastructure": (6, ["Appoint inquiry secretary"]),
+    "Procure eDiscovery / evidence management system": (16, ["Procure IT systems — basic infrastructure"]),
+    "Set up secure document transfer capability": (4, ["Procure IT systems — basic infrastructure"]),
+    "Commission inquiry website": (6, ["Appoint inquiry secretary"]),
+    "Establish physical security arrangements": (4, ["Secure office accommodation"]),
+    "Establish data security protocols": (4, ["Procure IT systems — basic infrastructure"]),
+    "Agree vetting levels for all staff": (2, ["Appoint inquiry secretary"]),
+    "Procure hearing room broadcast and transcription": (12, ["Identify and secure hearing venue"]),
+    "Engage National Archives early": (2, ["Appoint inquiry secretary"]),
+    "Register as data controller with ICO": (2, ["Appoint inquiry secretary"]),
+    # 4. Protocols & Procedures
+    "Develop issues list from terms of reference": (6, ["Publish terms of reference", "Assess need for and appoint counsel"]),
+    "Publish provisional timetable": (2, ["Develop issues list from terms of reference"]),
+    "Draft and publish core participant designation protocol": (4, ["Appoint solicitor to the inquiry", "Publish terms of reference"]),
+    "Draft protocol on legal representation and funding": (4, ["Draft and publish core participant designation protocol"]),
+    "Request Section 40 determination from minister": (4, ["Draft protocol on legal representation and funding"]),
+    "Draft disclosure and document handling protocol": (4, ["Appoint solicitor to the inquiry"]),
+    "Draft witness statement protocol": (4, ["Appoint solicitor to the inquiry"]),
+    "Draft hearing procedure protocol": (4, ["Draft witness statement protocol"]),
+    "Establish media engagement strategy": (3, ["Appoint inquiry secretary"]),
+    "Draft restriction order / notice protocol": (4, ["Draft disclosure and document handling protocol"]),
+    "Draft redaction protocol": (3, ["Draft disclosure and document handling protocol"]),
+    "Agree management statement with sponsor department": (4, ["Appoint inquiry secretary"]),
+    "Develop internal working practices": (4, ["Build wider secretariat"]),
+    # 5. Evidence & Investigation
+    "Issue written requests for documentary evidence": (4, ["Develop issues list from terms of reference", "Draft disclosure and document handling protocol",
+                                                            "Procure eDiscovery / evidence management system", "Set up secure document transfer capability"]),
+    "Manage incoming document volumes": (40, ["Issue written requests for documentary evidence"]),
+    "Assess need for Section 21 compulsion notices": (4, ["Issue written requests for documentary evidence"]),
+    "Handle privilege claims and PII applications": (16, ["Issue written requests for documentary evidence"]),
+    "Prepare and issue witness statement requests": (12, ["Issue written requests for documentary evidence", "Draft witness statement protocol"]),
+    "Conduct witness interviews where inquiry-led": (16, ["Prepare and issue witness statement requests"]),
+    "Disclose relevant material to core participants": (24, ["Manage incoming document volumes", "Draft redaction protocol",
+                                                             "Draft and publish core participant designation protocol"]),
+    "Manage ongoing disclosure requests and challenges": (16, ["Disclose relevant material to core participants"]),
+    "Commission expert reports or establish expert groups": (24, ["Develop issues list from terms of reference"]),
+    "Consider innovative evidence-gathering methods": (8, ["Develop issues list from terms of reference"]),
+    "Conduct National Archives searches": (8, ["Issue written requests for documentary evidence", "Engage National Archives early"]),
+    "Ongoing review and refinement of issues list": (8, ["Manage incoming document volumes"]),
+    # 6. Hearings
+    "Plan and hold preliminary hearing(s)": (2, ["Draft hearing procedure protocol", "Identify and secure hearing venue",
+                                                 "Draft and publish core participant designation protocol"]),
+    "Prepare hearing timetable": (4, ["Conduct witness interviews where inquiry-led", "Disclose relevant material to core participants"]),
+    "Prepare opening statement": (4, ["Prepare hearing timetable", "Commission expert reports or establish expert groups"]),
+    "Witness preparation meetings": (4, ["Prepare hearing timetable"]),
+    "Manage witness support during hearings": (30, ["Prepare opening statement"]),
+    "Conduct oral evidence sessions": (30, ["Prepare opening statement", "Witness preparation meetings",
+                                            "Procure hearing room broadcast and transcription"]),
+    "Manage core participant engagement during hearings": (30, ["Prepare opening statement"]),
+    "Publish daily transcripts": (30, ["Prepare opening statement", "Commission inquiry website"]),
+    "Manage live broadcast of proceedings": (30, ["Prepare opening statement", "Procure hearing room broadcast and transcription"]),
+    "Handle closed or private hearing sessions": (4, ["Prepare opening statement", "Draft restriction order / notice protocol"]),
+    "Receive closing statements from core participants": (4, ["Conduct oral evidence sessions"]),
+    "Manage media throughout hearing period": (30, ["Prepare opening statement", "Establish media engagement strategy"]),
+    "Monitor for judicial review risk": (30, ["Plan and hold preliminary hearing(s)"]),
+    # 7. Report & Closure
+    "Agree report writing approach": (4, ["Prepare opening statement"]),
+    "Draft report": (30, ["Agree report writing approach", "Receive closing statements from core participants"]),
+    "Conduct Maxwellisation / warning letter process": (12, ["Draft report"]),
+    "Reviews and checks before publication": (6, ["Conduct Maxwellisation / warning letter process"]),
+    "Agree publication responsibility and process": (2, ["Agree report writing approach"]),
+    "Manage advance access for minister": (1, ["Reviews and checks before publication", "Agree publication responsibility and process"]),
+    "Organise lock-in for core participants": (1, ["Reviews and checks before publication"]),
+    "Arrange laying before Parliament": (1, ["Manage advance access for minister", "Organise lock-in for core participants"]),
+    "Publish report": (1, ["Arrange laying before Parliament"]),
+    "Prepare and submit lessons learned paper": (6, ["Publish report"]),
+    "Terminate contracts and vacate premises": (8, ["Publish report"]),
+    "Archive and transfer records to National Archives": (12, ["Publish report"]),
+    "Communicate inquiry closure to stakeholders": (2, ["Archive and transfer records to National Archives"]),
+    "Transition witness and stakeholder support": (6, ["Publish report"]),
+    "Monitor recommendation implementation": (26, ["Publish report"]),
+}
 
 risks = [
     ("1. Establish & Scope", "Terms of reference too broad or ambiguous, leading to scope creep, cost overruns, and delay", "Medium", "High", "Ensure ToR are clear, unambiguous, and deliverable. Consult widely. Include explicit exclusions.", "Chair / Sponsor"),
@@ -392,48 +474,6 @@ risks = [
     ("Cross-cutting", "Staff burnout from distressing material and high-pressure environment", "High", "Medium", "Welfare support from outset. Trauma-informed training. Regular check-ins. Access to counselling.", "Secretary / HR"),
 ]
 
-data_start = start + 1
-for idx, (phase, desc, like, impact, mitigation, owner) in enumerate(risks, 1):
-    r = data_start + idx - 1
-    ws.cell(row=r, column=1, value=idx)
-    ws.cell(row=r, column=2, value=phase)
-    ws.cell(row=r, column=3, value=desc)
-    ws.cell(row=r, column=4, value=like)
-    ws.cell(row=r, column=5, value=impact)
-    rating_cell = get_column_letter(6)
-    ws.cell(row=r, column=6).value = f'=IF(AND(D{r}="High",E{r}="High"),"Critical",IF(OR(D{r}="High",E{r}="High"),"High",IF(AND(D{r}="Low",E{r}="Low"),"Low","Medium")))'
-    ws.cell(row=r, column=7, value=mitigation)
-    ws.cell(row=r, column=8, value=owner)
-    ws.cell(row=r, column=9, value="Open")
-    ws.cell(row=r, column=10, value="")
-
-data_end = data_start + len(risks) - 1
-style_data_rows(ws, data_start, data_end, len(headers))
-add_likelihood_validation(ws, "D", data_start, data_end + 20)
-add_likelihood_validation(ws, "E", data_start, data_end + 20)
-
-status_dv = DataValidation(type="list", formula1='"Open,Mitigating,Closed,Accepted"', allow_blank=True)
-ws.add_data_validation(status_dv)
-status_dv.add(f"I{data_start}:I{data_end+20}")
-
-ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{data_end}"
-ws.freeze_panes = f"A{data_start}"
-
-# ═══════════════════════════════════════════════════════════════
-# STATUTORY VS NON-STATUTORY MATRIX
-# ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="Statutory vs Non-Statutory")
-ws.sheet_properties.tabColor = "548235"
-
-start = add_title(ws, "Statutory vs Non-Statutory Decision Matrix", "Key differences to inform scoping advice")
-
-headers = ["Dimension", "Statutory (Inquiries Act 2005)", "Non-Statutory", "Consulting Considerations"]
-col_widths = [25, 40, 40, 40]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
-
 matrix = [
     ("Legal framework", "Governed by Inquiries Act 2005 and Inquiry Rules 2006. Codified powers and procedures.", "No binding legal framework. Chair determines procedure within terms of reference.", "Statutory provides certainty but less flexibility. Non-statutory allows innovation but carries risk of challenge on fairness grounds."),
     ("Power to compel evidence", "Chair can compel witnesses to attend, give evidence under oath, and produce documents (s.21). Criminal sanctions for non-compliance.", "No power to compel. Relies on voluntary cooperation. Minister should seek assurances from information providers.", "If cooperation is uncertain — particularly from reluctant organisations — statutory basis is strongly advisable."),
@@ -449,32 +489,6 @@ matrix = [
     ("Data protection", "Independent data controller. Must register with ICO, appoint DPO, produce privacy notice.", "Independent data controller. Same GDPR and Data Protection Act 2018 obligations.", "No practical difference. Both require full data protection compliance from the outset."),
 ]
 
-data_start = start + 1
-for idx, (dim, stat, nonstat, consult) in enumerate(matrix):
-    r = data_start + idx
-    ws.cell(row=r, column=1, value=dim)
-    ws.cell(row=r, column=2, value=stat)
-    ws.cell(row=r, column=3, value=nonstat)
-    ws.cell(row=r, column=4, value=consult)
-data_end = data_start + len(matrix)
-style_data_rows(ws, data_start, data_end, len(headers))
-ws.freeze_panes = f"A{data_start}"
-
-# ═══════════════════════════════════════════════════════════════
-# BUDGET TRACKER
-# ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="Budget Tracker")
-ws.sheet_properties.tabColor = "BF8F00"
-
-start = add_title(ws, "Budget Tracker", "Monitoring inquiry expenditure against budget")
-
-headers = ["Cost Category", "Budget (£)", "Spend to Date (£)", "Committed (£)", "Forecast Total (£)", "Variance (£)", "Variance %", "Notes"]
-col_widths = [30, 15, 15, 15, 15, 15, 12, 30]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
-
 categories = [
     "Chair and panel fees",
     "Counsel fees",
@@ -498,116 +512,980 @@ categories = [
     "Other / contingency",
 ]
 
-data_start = start + 1
-for idx, cat in enumerate(categories):
-    r = data_start + idx
-    ws.cell(row=r, column=1, value=cat)
-    for c in [2, 3, 4, 5]:
-        ws.cell(row=r, column=c).number_format = '#,##0'
-    ws.cell(row=r, column=6).value = f'=B{r}-E{r}'
-    ws.cell(row=r, column=6).number_format = '#,##0'
-    ws.cell(row=r, column=7).value = f'=IF(B{r}=0,"-",F{r}/B{r})'
-    ws.cell(row=r, column=7).number_format = '0.0%'
-
-data_end = data_start + len(categories) - 1
-style_data_rows(ws, data_start, data_end, len(headers), alt=True)
-
-# Totals row
-total_r = data_end + 1
-ws.cell(row=total_r, column=1, value="TOTAL").font = Font(name="Arial", bold=True, color=WHITE, size=10)
-ws.cell(row=total_r, column=1).fill = PatternFill("solid", fgColor=NAVY)
-for c in [2, 3, 4, 5, 6]:
-    col_l = get_column_letter(c)
-    ws.cell(row=total_r, column=c).value = f'=SUM({col_l}{data_start}:{col_l}{data_end})'
-    ws.cell(row=total_r, column=c).font = Font(name="Arial", bold=True, color=WHITE, size=10)
-    ws.cell(row=total_r, column=c).fill = PatternFill("solid", fgColor=NAVY)
-    ws.cell(row=total_r, column=c).number_format = '#,##0'
-    ws.cell(row=total_r, column=c).border = thin_border
-ws.cell(row=total_r, column=7).value = f'=IF(B{total_r}=0,"-",F{total_r}/B{total_r})'
-ws.cell(row=total_r, column=7).font = Font(name="Arial", bold=True, color=WHITE, size=10)
-ws.cell(row=total_r, column=7).fill = PatternFill("solid", fgColor=NAVY)
-ws.cell(row=total_r, column=7).number_format = '0.0%'
-ws.cell(row=total_r, column=7).border = thin_border
-ws.cell(row=total_r, column=8).fill = PatternFill("solid", fgColor=NAVY)
-ws.cell(row=total_r, column=8).border = thin_border
-
-ws.freeze_panes = f"A{data_start}"
+# Drop-down options, by the workbook name each list is defined as
+validation_lists = {
+    "Status": ["Not Started", "In Progress", "Complete", "N/A", "Blocked"],
+    "Priority": ["High", "Medium", "Low"],
+    "Likelihood": ["High", "Medium", "Low"],
+    "Phase": [*phase_data, "Cross-cutting"],
+    "RiskStatus": ["Open", "Mitigating", "Closed", "Accepted"],
+    "CPType": ["Individual", "Organisation", "Government Body", "Action Group", "Other"],
+    "Funding": ["Public Funded", "Self-Funded", "Application Pending", "Not Applicable"],
+    "StakeholderCategory": ["Sponsor Department", "Chair / Panel", "Inquiry Team", "Core Participant", "Witness",
+                             "Victims / Families", "Media", "Government Body", "NGO / Campaign Group",
+                             "Expert / Assessor", "Legal Representative", "Other"],
+    "Influence": ["High", "Medium", "Low"],
+    "EngagementLevel": ["Manage Closely", "Keep Satisfied", "Keep Informed", "Monitor"],
+}
 
 # ═══════════════════════════════════════════════════════════════
-# CORE PARTICIPANT REGISTER
+# TAB 1: OVERVIEW & INSTRUCTIONS
+# ═══════════════════════════════════════════════════════════════
+def duration_profile(config):
+    profile = {key: (config["forecast"] or {}).get(key) for key in ("subject_area", "inquiry_type")}
+    profile.update(config["durations"])
+    return profile
+
+def date_established(config):
+    try:
+        return date.fromisoformat(str(config["info"].get("Date Established", "")))
+    except ValueError:
+        return None
+
+def as_of_date(config):
+    """The date ongoing inquiries are measured to: ``config["as_of"]``, else the CSV's latest date."""
+    if config["as_of"]:
+        return date.fromisoformat(str(config["as_of"]))
+    return inquiry_data.data_date(inquiry_data.load_inquiries())
+
+def target_report_date(config):
+    """``(dates, basis)`` text for the Overview from the censoring-aware duration curves."""
+    established = date_established(config)
+    target = durations.target_dates(established, **duration_profile(config), as_of=as_of_date(config))
+    group = target["group"].split("=")[-1].replace("_", "-")
+    basis = (f"Kaplan–Meier over {target['n']} {'' if group == 'all' else group + ' '}inquiries "
+             f"({target['n'] - target['closed']} ongoing), from the Date Established")
+    median, p80 = (target[key].strftime("%d %b %Y") if target[key] else "beyond the data" for key in ("median", "p80"))
+    return f"Median {median}; P80 {p80}", basis
+
+def add_overview_tab(wb, config):
+    ws = wb.create_sheet(title="Overview")
+    ws.sheet_properties.tabColor = NAVY
+    set_column_widths(ws, [30, 45, 20, 20, 20])
+
+    ws.row_dimensions[1].height = 35
+    ws.append([styled_cell(ws, "Public Inquiry Consulting Toolkit", Font(name="Arial", bold=True, color=NAVY, size=18))])
+    ws.append([styled_cell(ws, "Lifecycle Management Workbook", Font(name="Arial", bold=True, color=MID_BLUE, size=13))])
+    ws.append([])
+    r = 4
+
+    overrides = config["info"]
+    for label, val in info:
+        val = overrides.get(label.rstrip(":"), val)
+        row = [styled_cell(ws, label, bold_font), styled_cell(ws, val, body_font, alignment=left_align)]
+        # Estimated only from a real start date: a blank template gets no invented date
+        if label == "Target Report Date:" and not val and config["durations"] is not None and date_established(config):
+            val, basis = target_report_date(config)
+            row = [row[0], styled_cell(ws, val, body_font, alignment=left_align), styled_cell(ws, basis, body_font)]
+        ws.append(row)
+        r += 1
+
+    ws.append([])
+    ws.append([styled_cell(ws, "How to use this workbook", subtitle_font)])
+    r += 2
+    for inst in instructions:
+        ws.append([styled_cell(ws, inst, body_font, alignment=wrap_align)])
+        merge_row(ws, r, 5)
+        r += 1
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# PHASE TABS — checklist items for each phase
+# ═══════════════════════════════════════════════════════════════
+phase_headers = ["#", "Action Item", "Description / Guidance", "Priority", "Responsible Role", "Status", "Target Date", "Notes"]
+
+def add_phase_tab(wb, tab_name, data, targets=None, title=None, guidance_tab=None):
+    """``targets`` are Target Dates in item order (from the Timeline schedule), or None for blanks.
+
+    With ``guidance_tab`` (a module's copy of a phase) each description is a
+    link to the same row of that tab instead of another copy of the text.
+    """
+    ws = wb.create_sheet(title=tab_name)
+    ws.sheet_properties.tabColor = data["color"]
+
+    headers = phase_headers
+    set_column_widths(ws, [5, 35, 55, 10, 20, 14, 14, 30])
+
+    start = add_title(ws, title or tab_name, data["subtitle"])
+    ws.append(header_row(ws, headers))
+
+    data_start = start + 1
+    for idx, (action, desc, priority, role) in enumerate(data["items"], 1):
+        if guidance_tab:
+            target = f"#{quote_sheetname(guidance_tab)}!C{data_start + idx - 1}".replace('"', '""')
+            desc = f'=HYPERLINK("{target}","Guidance in {guidance_tab}")'
+        row = data_row(ws, [idx, action, desc, priority, role, "Not Started", targets[idx - 1] if targets else None], len(headers))
+        if guidance_tab:
+            row[2].font = link_font
+        if targets:
+            row[6].number_format = "yyyy-mm-dd"
+        ws.append(row)
+
+    data_end = data_start + len(data["items"]) - 1
+    add_banding(ws, start, data_end, len(headers))
+    add_list_validation(ws, "Status", "F", data_start)
+    add_list_validation(ws, "Priority", "D", data_start)
+
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{data_end}"
+    return ws
+
 # ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="CP Register")
-ws.sheet_properties.tabColor = "7030A0"
+# DECISION LOG
+# ═══════════════════════════════════════════════════════════════
+decision_headers = ["#", "Date", "Phase", "Decision", "Options Considered", "Rationale", "Decided By", "Implications / Dependencies", "Review Date"]
+
+def add_decision_log_tab(wb, rows=None, min_rows=50, tab_name="Decision Log", title="Decision Log"):
+    ws = wb.create_sheet(title=tab_name)
+    ws.sheet_properties.tabColor = "7030A0"
+
+    headers = decision_headers
+    set_column_widths(ws, [5, 12, 18, 35, 35, 35, 18, 30, 12])
+
+    start = add_title(ws, title, "Capturing key decisions for institutional memory")
+    ws.append(header_row(ws, headers))
+
+    end = add_register_rows(ws, start, rows, len(headers), min_rows)
+    add_list_validation(ws, "Phase", "C", start + 1)
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{end}"
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# RISK REGISTER
+# ═══════════════════════════════════════════════════════════════
+risk_headers = ["#", "Phase", "Risk Description", "Likelihood", "Impact", "Risk Rating", "Mitigation", "Owner", "Status", "Review Date"]
+
+def risk_rating(likelihood, impact):
+    """The Risk Rating column's formula, evaluated in Python."""
+    if likelihood == "High" and impact == "High":
+        return "Critical"
+    if "High" in (likelihood, impact):
+        return "High"
+    if likelihood == "Low" and impact == "Low":
+        return "Low"
+    return "Medium"
+
+def add_risk_register_tab(wb, tab_name="Risk Register", title="Risk Register"):
+    ws = wb.create_sheet(title=tab_name)
+    ws.sheet_properties.tabColor = "C00000"
 
-start = add_title(ws, "Core Participant Register", "Tracking core participants, legal representation, and funding")
+    headers = risk_headers
+    set_column_widths(ws, [5, 18, 40, 12, 12, 12, 40, 18, 14, 12])
 
-headers = ["#", "Name / Organisation", "Type", "Phase(s) Designated", "Date Designated", "Recognised Legal Rep", "Funding Status", "Joint Representation Group", "Key Contact", "Notes"]
-col_widths = [5, 25, 15, 18, 12, 25, 15, 20, 20, 25]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
+    start = add_title(ws, title, "Common pitfalls and risks across the inquiry lifecycle")
+    ws.append(header_row(ws, headers))
 
-type_dv = DataValidation(type="list", formula1='"Individual,Organisation,Government Body,Action Group,Other"', allow_blank=True)
-ws.add_data_validation(type_dv)
+    data_start = start + 1
+    for idx, (phase, desc, like, impact, mitigation, owner) in enumerate(risks, 1):
+        r = data_start + idx - 1
+        rating = f'=IF(AND(D{r}="High",E{r}="High"),"Critical",IF(OR(D{r}="High",E{r}="High"),"High",IF(AND(D{r}="Low",E{r}="Low"),"Low","Medium")))'
+        ws.append(data_row(ws, [idx, phase, desc, like, impact, rating, mitigation, owner, "Open"], len(headers)))
 
-funding_dv = DataValidation(type="list", formula1='"Public Funded,Self-Funded,Application Pending,Not Applicable"', allow_blank=True)
-ws.add_data_validation(funding_dv)
+    data_end = data_start + len(risks) - 1
+    add_banding(ws, start, data_end, len(headers))
+    add_list_validation(ws, "Likelihood", "D", data_start)
+    add_list_validation(ws, "Likelihood", "E", data_start)
+    add_list_validation(ws, "RiskStatus", "I", data_start)
 
-for r in range(start + 1, start + 51):
-    ws.cell(row=r, column=1, value=r - start)
-    for c in range(1, len(headers) + 1):
-        ws.cell(row=r, column=c).font = body_font
-        ws.cell(row=r, column=c).alignment = wrap_align
-        ws.cell(row=r, column=c).border = thin_border
-        if (r - start) % 2 == 0:
-            ws.cell(row=r, column=c).fill = PatternFill("solid", fgColor=PALE_BLUE)
-type_dv.add(f"C{start+1}:C{start+50}")
-funding_dv.add(f"G{start+1}:G{start+50}")
-ws.freeze_panes = f"A{start+1}"
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{data_end}"
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# STATUTORY VS NON-STATUTORY MATRIX
+# ═══════════════════════════════════════════════════════════════
+matrix_headers = ["Dimension", "Statutory (Inquiries Act 2005)", "Non-Statutory", "Consulting Considerations"]
+
+def add_matrix_tab(wb):
+    ws = wb.create_sheet(title="Statutory vs Non-Statutory")
+    ws.sheet_properties.tabColor = "548235"
+
+    headers = matrix_headers
+    set_column_widths(ws, [25, 40, 40, 40])
+
+    start = add_title(ws, "Statutory vs Non-Statutory Decision Matrix", "Key differences to inform scoping advice")
+    ws.append(header_row(ws, headers))
+
+    for values in matrix:
+        ws.append(data_row(ws, values, len(headers)))
+    # trailing styled row left free for an extra dimension
+    ws.append(data_row(ws, [], len(headers)))
+    add_banding(ws, start, start + len(matrix) + 1, len(headers))
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# BUDGET TRACKER
+# ═══════════════════════════════════════════════════════════════
+budget_headers = ["Cost Category", "Budget (£)", "Spend to Date (£)", "Committed (£)", "Forecast Total (£)", "Variance (£)", "Variance %", "Notes"]
+
+def add_budget_tab(wb, forecast=None):
+    ws = wb.create_sheet(title="Budget Tracker")
+    ws.sheet_properties.tabColor = "BF8F00"
+
+    headers = budget_headers
+    set_column_widths(ws, [30, 15, 15, 15, 15, 15, 12, 30])
+
+    start = add_title(ws, "Budget Tracker", "Monitoring inquiry expenditure against budget")
+    ws.append(header_row(ws, headers))
+
+    # The budget starts at the benchmark P50 for each category; Forecast
+    # Total is the team's own estimate, so it starts blank
+    p50 = forecast["by_category"][:, 1].round(-3).tolist() if forecast else [None] * len(categories)
+
+    data_start = start + 1
+    for idx, cat in enumerate(categories):
+        r = data_start + idx
+        row = data_row(ws, [cat, p50[idx], None, None, None, f'=B{r}-E{r}', f'=IF(B{r}=0,"-",F{r}/B{r})'], len(headers))
+        for cell in row[1:6]:
+            cell.number_format = '#,##0'
+        row[6].number_format = '0.0%'
+        ws.append(row)
+
+    data_end = data_start + len(categories) - 1
+    add_banding(ws, start, data_end, len(headers))
+
+    # Totals row
+    total_r = data_end + 1
+    row = [styled_cell(ws, "TOTAL", style="total")]
+    for c in [2, 3, 4, 5, 6]:
+        col_l = get_column_letter(c)
+        row.append(styled_cell(ws, f'=SUM({col_l}{data_start}:{col_l}{data_end})', style="total", number_format='#,##0'))
+    row.append(styled_cell(ws, f'=IF(B{total_r}=0,"-",F{total_r}/B{total_r})', style="total", number_format='0.0%'))
+    row.append(styled_cell(ws, None, style="total"))
+    ws.append(row)
+
+    if forecast:
+        add_budget_forecast(ws, forecast, total_r + 2)
+    return ws
+
+def add_budget_forecast(ws, forecast, r):
+    """Append the P10/P50/P90 split below the tracker, starting at row ``r``."""
+    ws.append([])
+    ws.append([styled_cell(ws, "Benchmark forecast", subtitle_font)])
+    basis = (f"all {forecast['n']} inquiries with a known cost, as none matched the forecast filters"
+             if forecast["widened"] else f"{forecast['n']} comparable inquiries")
+    ws.append([styled_cell(ws,
+        f"Range of costs of {basis}, averaged over {forecast['resamples']:,} bootstrap resamples, "
+        f"split using the indicative percentages for a {forecast['scale']} inquiry.", body_font, alignment=wrap_align)])
+    merge_row(ws, r + 1, 8)
+    pct_headers = ["Cost Category"] + [f"P{p} (£)" for p in budget_forecast.FORECAST_PERCENTILES] + ["Share %"]
+    start = r + 2
+    ws.append(sub_header_row(ws, pct_headers))
+    for cat, amounts, share in zip(categories, forecast["by_category"].round(-3).tolist(), forecast["shares"].round(4).tolist()):
+        row = data_row(ws, [cat, *amounts, share], len(pct_headers))
+        for cell in row[1:4]:
+            cell.number_format = '#,##0'
+        row[4].number_format = '0.0%'
+        ws.append(row)
+    end = start + len(categories)
+    add_banding(ws, start, end, len(pct_headers))
+
+    row = [styled_cell(ws, "TOTAL", style="total")]
+    row += [styled_cell(ws, round(total, -3), style="total", number_format='#,##0') for total in forecast["totals"].values()]
+    row.append(styled_cell(ws, 1, style="total", number_format='0.0%'))
+    ws.append(row)
+
+# ═══════════════════════════════════════════════════════════════
+# CORE PARTICIPANT REGISTER
+# ═══════════════════════════════════════════════════════════════
+cp_headers = ["#", "Name / Organisation", "Type", "Phase(s) Designated", "Date Designated", "Recognised Legal Rep", "Funding Status", "Joint Representation Group", "Key Contact", "Notes"]
+
+def add_cp_register_tab(wb, rows=None, min_rows=50):
+    ws = wb.create_sheet(title="CP Register")
+    ws.sheet_properties.tabColor = "7030A0"
+
+    headers = cp_headers
+    set_column_widths(ws, [5, 25, 15, 18, 12, 25, 15, 20, 20, 25])
+
+    start = add_title(ws, "Core Participant Register", "Tracking core participants, legal representation, and funding")
+    ws.append(header_row(ws, headers))
+
+    add_register_rows(ws, start, rows, len(headers), min_rows)
+    add_list_validation(ws, "CPType", "C", start + 1)
+    add_list_validation(ws, "Funding", "G", start + 1)
+    return ws
 
 # ═══════════════════════════════════════════════════════════════
 # STAKEHOLDER MAP
 # ═══════════════════════════════════════════════════════════════
-ws = wb.create_sheet(title="Stakeholder Map")
-ws.sheet_properties.tabColor = "548235"
+stakeholder_headers = ["#", "Stakeholder", "Category", "Interest / Role", "Influence", "Engagement Level", "Key Contact", "Engagement Approach", "Notes"]
 
-start = add_title(ws, "Stakeholder Map", "Key relationships and engagement approach")
+def add_stakeholder_tab(wb, rows=None, min_rows=50):
+    ws = wb.create_sheet(title="Stakeholder Map")
+    ws.sheet_properties.tabColor = "548235"
 
-headers = ["#", "Stakeholder", "Category", "Interest / Role", "Influence", "Engagement Level", "Key Contact", "Engagement Approach", "Notes"]
-col_widths = [5, 25, 18, 30, 12, 15, 20, 30, 25]
-for i, (h, w) in enumerate(zip(headers, col_widths), 1):
-    ws.cell(row=start, column=i, value=h)
-    ws.column_dimensions[get_column_letter(i)].width = w
-style_header_row(ws, start, len(headers))
+    headers = stakeholder_headers
+    set_column_widths(ws, [5, 25, 18, 30, 12, 15, 20, 30, 25])
 
-cat_dv = DataValidation(type="list",
-    formula1='"Sponsor Department,Chair / Panel,Inquiry Team,Core Participant,Witness,Victims / Families,Media,Government Body,NGO / Campaign Group,Expert / Assessor,Legal Representative,Other"',
-    allow_blank=True)
-ws.add_data_validation(cat_dv)
+    start = add_title(ws, "Stakeholder Map", "Key relationships and engagement approach")
+    ws.append(header_row(ws, headers))
 
-influence_dv = DataValidation(type="list", formula1='"High,Medium,Low"', allow_blank=True)
-ws.add_data_validation(influence_dv)
+    add_register_rows(ws, start, rows, len(headers), min_rows)
+    add_list_validation(ws, "StakeholderCategory", "C", start + 1)
+    add_list_validation(ws, "Influence", "E", start + 1)
+    add_list_validation(ws, "EngagementLevel", "F", start + 1)
+    return ws
 
-engage_dv = DataValidation(type="list", formula1='"Manage Closely,Keep Satisfied,Keep Informed,Monitor"', allow_blank=True)
-ws.add_data_validation(engage_dv)
+# ═══════════════════════════════════════════════════════════════
+# BENCHMARKS — comparable inquiries from data/uk_public_inquiries.csv
+# ═══════════════════════════════════════════════════════════════
+percentile_labels = {
+    "cost_millions": "Cost (£m)",
+    "duration_months": "Duration (months)",
+    "cost_per_hearing_day": "Cost per hearing day (£)",
+    "cost_per_witness": "Cost per witness (£)",
+}
+
+benchmark_headers = ["Inquiry", "Type", "Subject Area", "Status", "Established", "Closed", "Duration (months)", "Cost (£m)",
+           "Scale", "Hearing Days", "Witnesses", "Core Participants", "Cost per Hearing Day (£)", "Cost per Witness (£)"]
+
+def add_benchmarks_tab(wb, as_of=None, csv_path=inquiry_data.DATA_CSV):
+    table = inquiry_data.load_inquiries(csv_path)
+    stats = inquiry_data.compute_statistics(table, as_of or inquiry_data.data_date(table))
+    records = inquiry_data.benchmark_records(table, stats)
+
+    ws = wb.create_sheet(title="Benchmarks")
+    ws.sheet_properties.tabColor = "4A7FB5"
+
+    headers = benchmark_headers
+    set_column_widths(ws, [32, 18, 14, 12, 12, 12, 12, 11, 11, 11, 11, 12, 15, 15])
+
+    start = add_title(ws, "Benchmarks", "Comparable UK public inquiries, cheapest first (unknown cost last)")
+    ws.append(header_row(ws, headers))
+
+    for b in records:
+        row = data_row(ws, [
+            b["fullName"], b["type"], b["subjectArea"], b["status"],
+            date.fromisoformat(b["established"]) if b["established"] else None,
+            date.fromisoformat(b["closed"]) if b["closed"] else None,
+            b["durationMonths"], b["cost"], b["scale"], b["hearingDays"], b["witnesses"], b["cps"],
+            b["costPerHearingDay"], b["costPerWitness"],
+        ], len(headers))
+        row[4].number_format = row[5].number_format = "yyyy-mm-dd"
+        row[7].number_format = "#,##0.0"
+        for cell in row[12:14]:
+            cell.number_format = "#,##0"
+        ws.append(row)
+    data_end = start + len(records)
+    add_banding(ws, start, data_end, len(headers))
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{data_end}"
 
-for r in range(start + 1, start + 51):
-    ws.cell(row=r, column=1, value=r - start)
-    for c in range(1, len(headers) + 1):
-        ws.cell(row=r, column=c).font = body_font
-        ws.cell(row=r, column=c).alignment = wrap_align
-        ws.cell(row=r, column=c).border = thin_border
-        if (r - start) % 2 == 0:
-            ws.cell(row=r, column=c).fill = PatternFill("solid", fgColor=PALE_BLUE)
-cat_dv.add(f"C{start+1}:C{start+50}")
-influence_dv.add(f"E{start+1}:E{start+50}")
-engage_dv.add(f"F{start+1}:F{start+50}")
-ws.freeze_panes = f"A{start+1}"
+    # Percentiles by subject area
+    ws.append([])
+    ws.append([styled_cell(ws, "Percentiles by subject area", subtitle_font)])
+    pct_headers = ["Subject Area", "Metric", "n"] + [f"P{p}" for p in inquiry_data.PERCENTILES]
+    pct_start = data_end + 3
+    ws.append(sub_header_row(ws, pct_headers))
+    r = pct_start
+    for area, metrics in stats["percentiles"].items():
+        for metric, label in percentile_labels.items():
+            summary = metrics[metric]
+            row = data_row(ws, [area, label, summary["n"]] + [summary.get(f"p{p}") for p in inquiry_data.PERCENTILES], len(pct_headers))
+            for cell in row[3:]:
+                cell.number_format = "#,##0.0"
+            ws.append(row)
+            r += 1
+    add_banding(ws, pct_start, r, len(pct_headers))
+    return ws
 
 # ═══════════════════════════════════════════════════════════════
-# SAVE
+# COMPARABLE INQUIRIES — nearest neighbours from comparables.py
+# ═══════════════════════════════════════════════════════════════
+comparable_headers = ["Rank", "Inquiry", "Type", "Subject Area", "Status", "Cost (£m)", "Hearing Days", "Witnesses",
+                      "Core Participants", "Similarity", "Description Match", "Profile Match", "Scale Match"]
+
+# budget_forecast keyword -> CSV column, for the default query
+forecast_query_fields = {
+    "subject_area": "subject_area",
+    "inquiry_type": "inquiry_type",
+    "hearing_days": "hearing_days",
+    "witnesses": "witnesses_count",
+    "core_participants": "core_participants_count",
+}
+
+def comparables_query(config):
+    """``(query, k, exclude)`` from the config, falling back to the forecast's profile."""
+    forecast = config["forecast"] or {}
+    query = {column: forecast[key] for key, column in forecast_query_fields.items() if forecast.get(key)}
+    query.update(config["comparables"])
+    k = query.pop("k", comparables.DEFAULT_K)
+    exclude = tuple(query.pop("exclude", ()))
+    return query, k, exclude
+
+def add_comparables_tab(wb, query, k, exclude=(), csv_path=inquiry_data.DATA_CSV):
+    ws = wb.create_sheet(title="Comparable Inquiries")
+    ws.sheet_properties.tabColor = "4A7FB5"
+
+    headers = comparable_headers
+    set_column_widths(ws, [6, 40, 18, 14, 12, 11, 11, 11, 12, 11, 12, 12, 12])
+
+    described = ", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in query.items() if key != "description")
+    start = add_title(ws, "Comparable Inquiries", f"Most similar past inquiries ({described or 'description only'})"
+                      if query else "Set \"comparables\" in the build config to rank past inquiries")
+    ws.append(header_row(ws, headers))
+    if not query:
+        return ws
+
+    table = inquiry_data.load_inquiries(csv_path)
+    matches = comparables.find_comparables(query, k, exclude, comparables.load_index(csv_path))
+    for rank, match in enumerate(matches, 1):
+        i = match["row"]
+        row = data_row(ws, [
+            rank, table["name"][i], inquiry_data.type_label(table["inquiry_type"][i], table["statutory_basis"][i]),
+            table["subject_area"][i], table["status"][i],
+            *(None if np.isnan(table[c][i]) else float(table[c][i]) for c in comparables.SCALE_FIELDS[:4]),
+            *(None if match[p] is None else round(match[p], 3) for p in ("score", "text", "category", "scale")),
+        ], len(headers))
+        row[5].number_format = "#,##0.0"
+        for cell in row[9:]:
+            cell.number_format = "0%"
+        ws.append(row)
+    end = start + len(matches)
+    add_banding(ws, start, end, len(headers))
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{end}"
+    return ws
+
 # ═══════════════════════════════════════════════════════════════
-output_path = "/sessions/lucid-youthful-gates/mnt/practical guide/Inquiry Consulting Toolkit.xlsx"
-wb.save(output_path)
-print(f"Saved to {output_path}")
+# EVIDENCE REVIEW — Monte Carlo staffing and timeline
+# ═══════════════════════════════════════════════════════════════
+def evidence_review_options(config):
+    """Keyword arguments for evidence_review.run, falling back to the forecast's hearing days."""
+    options = {"hearing_days": (config["forecast"] or {}).get("hearing_days")}
+    options.update(config["evidence_review"])
+    if "teams" in options:
+        options["team_sizes"] = sorted(options.pop("teams"))
+    return options
+
+def add_evidence_review_tab(wb, options):
+    ws = wb.create_sheet(title="Evidence Review")
+    ws.sheet_properties.tabColor = phase_data["5. Evidence & Investigation"]["color"]
+    set_column_widths(ws, [34, 16, 16, 16, 16, 16])
+
+    result = evidence_review.run(**options)
+    weeks = result["weeks_to_hearing"]
+    start = add_title(ws, "Evidence Review Simulation",
+                      f"{result['scenarios']:,} scenarios of disclosure intake, review, redaction and statement drafting; "
+                      f"hearings in {weeks} weeks")
+
+    # ── Assumptions ──
+    headers = ["Input", "P10", "P50", "P90"]
+    ws.append(sub_header_row(ws, headers))
+    inputs = result["inputs"]
+    assumptions = [
+        ("Documents disclosed", inputs["documents"], "#,##0"),
+        ("Documents received", inputs["received"], "#,##0"),
+        ("Witness statements", inputs["statements"], "#,##0"),
+        ("Share of received disclosed", inputs["relevant_share"], "0%"),
+        ("Review rate (docs / person-day)", inputs["review_rate"], "#,##0"),
+        ("Redaction rate (docs / person-day)", inputs["redaction_rate"], "#,##0"),
+        ("Drafting rate (statements / week)", inputs["drafting_rate"], "0.0"),
+    ]
+    for label, values, fmt in assumptions:
+        row = data_row(ws, [label, *np.percentile(values, [10, 50, 90]).round(2).tolist()], len(headers))
+        for cell in row[1:]:
+            cell.number_format = fmt
+        ws.append(row)
+    end = start + len(assumptions)
+    add_banding(ws, start, end, len(headers))
+
+    # ── Staffing ──
+    recommended = result["recommended"]
+    ws.append([])
+    ws.append([styled_cell(ws, "Staffing", subtitle_font)])
+    ws.append([styled_cell(ws, (f"Smallest evidence team clearing review and redaction before the hearings in "
+                                f"{evidence_review.TARGET_CONFIDENCE:.0%} of scenarios: {recommended}") if recommended else
+                               (f"No team size tried clears review and redaction before the hearings in "
+                                f"{evidence_review.TARGET_CONFIDENCE:.0%} of scenarios"), body_font, alignment=wrap_align)])
+    merge_row(ws, end + 3, 6)
+    headers = ["Evidence Team", "Cleared by Hearing", "Cleared P50 (week)", "Cleared P80 (week)", "Statements by Hearing"]
+    start = end + 4
+    ws.append(sub_header_row(ws, headers))
+    for r in result["staffing"]:
+        row = data_row(ws, [r["team"], round(r["on_time"], 4), *(r[p] if np.isfinite(r[p]) else "Not cleared" for p in ("p50", "p80")),
+                            round(r["statements_on_time"], 4)], len(headers))
+        row[1].number_format = row[4].number_format = "0%"
+        if r["team"] == recommended:
+            for cell in row:
+                cell.font = bold_font
+        ws.append(row)
+    end = start + len(result["staffing"])
+    add_banding(ws, start, end, len(headers))
+
+    # ── Timeline ──
+    ws.append([])
+    ws.append([styled_cell(ws, f"Timeline with an evidence team of {result['timeline_team']}", subtitle_font)])
+    headers = ["Week", "Received P50", "Disclosed P10", "Disclosed P50", "Disclosed P90", "Statements P50"]
+    start = end + 3
+    ws.append(sub_header_row(ws, headers))
+    # Up to the first row at or after the hearings
+    timeline = [t for t in result["timeline"] if t[0] - evidence_review.TIMELINE_STEP < weeks]
+    for week, received, disclosed, statements in timeline:
+        row = data_row(ws, [week, round(received[1]), *(round(v) for v in disclosed), round(statements[1])], len(headers))
+        for cell in row[1:]:
+            cell.number_format = "#,##0"
+        ws.append(row)
+    add_banding(ws, start, start + len(timeline), len(headers))
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# TIMELINE — critical-path schedule of the checklist as a Gantt chart
+# ═══════════════════════════════════════════════════════════════
+TIMELINE_TAB = "Timeline"
+timeline_headers = ["#", "Phase", "Action Item", "Start", "Finish", "Latest Finish", "Slack (days)", "Critical"]
+
+def checklist_schedule(config):
+    """The checklist scheduled from ``config["schedule"]`` (see DEFAULT_CONFIG).
+
+    Returns a dict with the ``established`` and ``report`` dates, the
+    ``basis`` of the report date, the duration ``scale`` and ``rows``: one
+    schedule.schedule_dates row per ``(phase, action)``.
+    """
+    options = config["schedule"]
+    established = options.get("established") or date_established(config) or as_of_date(config)
+    if isinstance(established, str):
+        established = date.fromisoformat(established)
+    report, basis = options.get("report"), "given report date"
+    if isinstance(report, str):
+        report = date.fromisoformat(report)
+    if report is None and config["durations"] is not None:
+        report = durations.target_dates(established, **duration_profile(config), as_of=as_of_date(config))["median"]
+        basis = "median report date of comparable inquiries"
+    if report is None:
+        basis = "planning weeks"
+    _, rows, scale = schedule.schedule_dates(schedule.checklist_tasks(phase_data, phase_plan), established, report)
+    return {"established": established, "report": report, "basis": basis, "scale": scale, "rows": rows}
+
+def phase_targets(plan, tab_name):
+    return [plan["rows"][(tab_name, action)]["finish"] for action, *_ in phase_data[tab_name]["items"]]
+
+def month_starts(first, last):
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        yield month
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def add_timeline_tab(wb, plan):
+    """One row per checklist item, with a month-by-month Gantt chart.
+
+    The bars are three conditional formatting rules over the chart area
+    (critical items, other items, then slack up to the latest finish) rather
+    than a fill on each cell, so the chart follows dates edited by hand.
+    """
+    ws = wb.create_sheet(title=TIMELINE_TAB)
+    ws.sheet_properties.tabColor = NAVY
+
+    rows = plan["rows"]
+    end = max(r["latest_finish"] for r in rows.values())
+    months = list(month_starts(plan["established"], end))
+    headers = timeline_headers
+    set_column_widths(ws, [5, 24, 40, 11, 11, 11, 8, 8] + [3.5] * len(months))
+
+    start = add_title(ws, "Timeline", f"Critical path from {plan['established']:%d %b %Y} to {end:%d %b %Y} "
+                                      f"({plan['basis']}); red bars are critical, pale bars are slack", frozen_columns=3)
+    ws.row_dimensions[start].height = 42
+    header = header_row(ws, headers + months)
+    for cell in header[len(headers):]:
+        cell.number_format = "mmm yy"
+        cell.alignment = Alignment(horizontal="center", vertical="center", text_rotation=90)
+    ws.append(header)
+
+    idx = 0
+    for tab_name, data in phase_data.items():
+        for action, *_ in data["items"]:
+            idx += 1
+            r = rows[(tab_name, action)]
+            row = data_row(ws, [idx, tab_name, action, r["start"], r["finish"], r["latest_finish"], r["slack"],
+                                "Yes" if r["critical"] else None], len(headers))
+            for cell in row[3:6]:
+                cell.number_format = "yyyy-mm-dd"
+            ws.append(row)
+    last = start + idx
+    add_banding(ws, start, last, len(headers))
+
+    first_month = get_column_letter(len(headers) + 1)
+    chart = f"{first_month}{start + 1}:{get_column_letter(len(headers) + len(months))}{last}"
+    # The month in this column overlaps [from, to]
+    month, next_month = f"{first_month}${start}", f"DATE(YEAR({first_month}${start}),MONTH({first_month}${start})+1,1)"
+    row = start + 1
+    ws.conditional_formatting.add(chart, FormulaRule(
+        formula=[f'AND($H{row}="Yes",{month}<=$E{row},{next_month}>$D{row})'], fill=critical_dxf_fill, stopIfTrue=True))
+    ws.conditional_formatting.add(chart, FormulaRule(
+        formula=[f"AND({month}<=$E{row},{next_month}>$D{row})"], fill=bar_dxf_fill, stopIfTrue=True))
+    ws.conditional_formatting.add(chart, FormulaRule(
+        formula=[f"AND({month}<=$F{row},{next_month}>$E{row})"], fill=slack_dxf_fill))
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{last}"
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# INDEX — search hits linking back to the guidance, risks and matrix
+# ═══════════════════════════════════════════════════════════════
+INDEX_TAB = "Index"
+index_headers = ["Search Term", "Kind", "Tab", "Item", "Score", "Go To"]
+
+def add_index_tab(wb, terms, k=search_index.DEFAULT_K):
+    """The best ``k`` hits for each search term, ranked by BM25 (search_index.py).
+
+    Links are HYPERLINK formulas rather than cell hyperlinks so they need no
+    sheet relationships and survive every backend and the sheet cache.
+    """
+    ws = wb.create_sheet(title=INDEX_TAB)
+    ws.sheet_properties.tabColor = MID_BLUE
+
+    headers = index_headers
+    set_column_widths(ws, [20, 10, 28, 60, 8, 14])
+
+    start = add_title(ws, "Index", "Checklist actions, risks and matrix rows matching each search term")
+    ws.append(header_row(ws, headers))
+
+    index = search_index.SearchIndex(search_index.build_index(phase_data, risks, matrix))
+    end = start
+    for term in terms:
+        for hit in index.search(term, k):
+            target = f"#{quote_sheetname(hit['tab'])}!A{hit['row']}".replace('"', '""')
+            row = data_row(ws, [term, hit["kind"], hit["tab"], hit["title"], round(hit["score"], 2),
+                                f'=HYPERLINK("{target}","Row {hit["row"]}")'], len(headers))
+            row[4].number_format = "0.00"
+            row[5].font = link_font
+            ws.append(row)
+            end += 1
+    add_banding(ws, start, end, len(headers))
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{end}"
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# MODULES — each module's own checklists, decision log and risk register
+# ═══════════════════════════════════════════════════════════════
+# Phases every module works through, and the suffix of the module's copy
+module_phases = {"5. Evidence & Investigation": "Evidence", "6. Hearings": "Hearings"}
+MODULE_ID_LENGTH = 20
+
+def check_modules(modules):
+    """Raise ValueError unless ``modules`` is a list of {"id", "title"} dicts with distinct, usable ids."""
+    seen = set()
+    for module in modules:
+        module_id = str(module.get("id", ""))
+        if not module_id or len(module_id) > MODULE_ID_LENGTH or INVALID_TITLE_REGEX.search(module_id):
+            raise ValueError(f"Module id {module_id!r} must be 1-{MODULE_ID_LENGTH} characters usable in a tab name")
+        if module_id in seen:
+            raise ValueError(f"Duplicate module id {module_id!r}")
+        seen.add(module_id)
+
+def module_tabs(module, config):
+    """Yield ``(tab name, builder, source)`` for one module's tabs.
+
+    The checklist copies link to the guidance on the shared phase tabs, so
+    its text is held once; everything else in a module's tabs comes from the
+    workbook's shared string and style tables.
+    """
+    module_id = module["id"]
+    heading = f"{module_id}: {module['title']}" if module.get("title") else module_id
+    for phase, suffix in module_phases.items():
+        tab_name = f"{module_id} {suffix}"
+        yield (tab_name, partial(add_phase_tab, tab_name=tab_name, data=phase_data[phase], title=heading, guidance_tab=phase),
+               [phase_data[phase], module])
+    tab_name = f"{module_id} Decisions"
+    yield (tab_name, partial(add_decision_log_tab, min_rows=config["register_rows"], tab_name=tab_name,
+                             title=f"{heading} — Decision Log"),
+           [module, config["register_rows"]])
+    tab_name = f"{module_id} Risks"
+    yield tab_name, partial(add_risk_register_tab, tab_name=tab_name, title=f"{heading} — Risk Register"), [risks, module]
+
+# ═══════════════════════════════════════════════════════════════
+# LISTS — hidden tab holding the options of every drop-down
+# ═══════════════════════════════════════════════════════════════
+LISTS_TAB = "Lists"
+
+def add_lists_tab(wb):
+    """One column per validation list, each defined as a workbook name.
+
+    Options can be edited here; rows inserted inside a list's range extend
+    its name, and so every drop-down that uses it.
+    """
+    ws = wb.create_sheet(title=LISTS_TAB)
+    ws.sheet_state = "hidden"
+    set_column_widths(ws, [max(len(name), *map(len, options)) + 2 for name, options in validation_lists.items()])
+    ws.append(header_row(ws, list(validation_lists)))
+    for values in zip_longest(*validation_lists.values()):
+        ws.append(data_row(ws, values, len(validation_lists)))
+
+    for col, (name, options) in enumerate(validation_lists.items(), 1):
+        letter = get_column_letter(col)
+        ref = f"{quote_sheetname(LISTS_TAB)}!${letter}$2:${letter}${len(options) + 1}"
+        wb.defined_names.add(DefinedName(name, attr_text=ref))
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+DEFAULT_OUTPUT = "Inquiry Consulting Toolkit.xlsx"
+
+DEFAULT_CONFIG = {
+    # Overview values keyed by label without the trailing colon, e.g. {"Chair": "..."}
+    "info": {},
+    # Write-only openpyxl workbook: rows are serialised as they are appended,
+    # so memory stays flat however long the registers are.
+    "streaming": False,
+    # "openpyxl", or "xml" to write SpreadsheetML directly (xml_backend.py);
+    # the XML backend always streams.
+    "backend": "openpyxl",
+    # Pre-filled register rows (iterables of values, without the "#" column).
+    # Generators are consumed lazily, which pairs with streaming mode.
+    "decisions": None,
+    "core_participants": None,
+    "stakeholders": None,
+    # Minimum rows pre-styled (and covered by validations) in each register
+    "register_rows": 50,
+    # Add the Benchmarks tab built from data/uk_public_inquiries.csv
+    "benchmarks": True,
+    # Seed the Budget Tracker from a bootstrap forecast over comparable inquiries
+    # (see budget_forecast.forecast for the keys, e.g. {"hearing_days": 120,
+    # "inquiry_type": "statutory"}); None leaves the figures blank.
+    "forecast": {},
+    # Query for the Comparable Inquiries tab: CSV column names (subject_area,
+    # inquiry_type, statutory_basis, cost_millions, hearing_days, ...), a
+    # free-text "description", "k" and "exclude" (inquiry names). Profile keys given in "forecast" are
+    # used unless overridden here; None (the default) leaves the tab out.
+    "comparables": None,
+    # Profile for the Overview's Target Report Date, estimated from how long
+    # comparable inquiries ran with ongoing ones treated as censored (see
+    # durations.py): {"subject_area": ..., "inquiry_type": ...}. Keys given in
+    # "forecast" are used unless overridden. Only filled in when the info
+    # gives a Date Established; None always leaves the date blank.
+    "durations": {},
+    # ISO date ongoing inquiries are measured to (Benchmarks durations, the
+    # Target Report Date) and a schedule without a Date Established starts
+    # from. None uses the latest date in the CSV, so the same CSV and config
+    # build the same bytes on any day.
+    "as_of": None,
+    # Evidence Review tab: Monte Carlo staffing for disclosure review (see
+    # evidence_review.run for the keys, e.g. {"documents": 400000,
+    # "weeks_to_hearing": 52, "teams": [10, 20, 40]}). Uses the forecast's
+    # hearing days unless given; None leaves the tab out.
+    "evidence_review": None,
+    # Search terms for the Index tab, e.g. ["Section 40", "Maxwellisation"];
+    # None leaves it out.
+    "index_terms": None,
+    # Timeline tab and phase Target Dates from a critical-path schedule of
+    # the checklist (see phase_plan and schedule.py): {"established": ...,
+    # "report": ...} as ISO dates. Starts from the Overview's Date
+    # Established (else "as_of") and ends on the median report date from
+    # "durations" unless given; None leaves the Target Dates blank.
+    "schedule": None,
+    # Modules of a large inquiry, e.g. [{"id": "M1", "title": "Resilience and
+    # preparedness"}]: each gets its own evidence and hearings checklists,
+    # decision log and risk register after the shared tabs (see
+    # module_workbook.py to add or rebuild one module in an existing file).
+    "modules": None,
+}
+
+BACKENDS = ["openpyxl", "xml"]
+
+def resolve_config(config=None):
+    resolved = {**DEFAULT_CONFIG, **(config or {})}
+    unknown = set(resolved) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+    if resolved["backend"] not in BACKENDS:
+        raise ValueError(f"Unknown backend {resolved['backend']!r}; expected one of {', '.join(BACKENDS)}")
+    if resolved["modules"]:
+        check_modules(resolved["modules"])
+    return resolved
+
+def new_workbook(config):
+    if config["backend"] == "xml":
+        wb = xml_backend.XmlWorkbook()
+    else:
+        wb = Workbook(write_only=config["streaming"])
+        if not config["streaming"]:
+            wb.remove(wb.active)
+    register_named_styles(wb)
+    return wb
+
+def tab_builders(config):
+    """Yield ``(tab name, builder)`` pairs in workbook order.
+
+    Each builder takes the workbook and adds its tab; ``config`` must already
+    be resolved.
+    """
+    yield "Overview", partial(add_overview_tab, config=config)
+    plan = None if config["schedule"] is None else checklist_schedule(config)
+    for tab_name, data in phase_data.items():
+        targets = None if plan is None else phase_targets(plan, tab_name)
+        yield tab_name, partial(add_phase_tab, tab_name=tab_name, data=data, targets=targets)
+    if plan is not None:
+        yield TIMELINE_TAB, partial(add_timeline_tab, plan=plan)
+    yield "Decision Log", partial(add_decision_log_tab, rows=config["decisions"], min_rows=config["register_rows"])
+    yield "Risk Register", add_risk_register_tab
+    yield "Statutory vs Non-Statutory", add_matrix_tab
+    forecast = None if config["forecast"] is None else budget_forecast.forecast(categories, **config["forecast"])
+    yield "Budget Tracker", partial(add_budget_tab, forecast=forecast)
+    yield "CP Register", partial(add_cp_register_tab, rows=config["core_participants"], min_rows=config["register_rows"])
+    yield "Stakeholder Map", partial(add_stakeholder_tab, rows=config["stakeholders"], min_rows=config["register_rows"])
+    if config["benchmarks"]:
+        yield "Benchmarks", partial(add_benchmarks_tab, as_of=as_of_date(config))
+    if config["comparables"] is not None:
+        query, k, exclude = comparables_query(config)
+        yield "Comparable Inquiries", partial(add_comparables_tab, query=query, k=k, exclude=exclude)
+    if config["evidence_review"] is not None:
+        yield "Evidence Review", partial(add_evidence_review_tab, options=evidence_review_options(config))
+    if config["index_terms"]:
+        yield INDEX_TAB, partial(add_index_tab, terms=config["index_terms"])
+    for module in config["modules"] or ():
+        for tab_name, build, _ in module_tabs(module, config):
+            yield tab_name, build
+    yield LISTS_TAB, add_lists_tab
+
+def register_source(rows, min_rows):
+    # Streamed rows (generators, CSV readers) can't be hashed without
+    # consuming them, so those registers are always rendered.
+    if rows is not None and not isinstance(rows, (list, tuple)):
+        return None
+    return [list(r) for r in rows or ()], min_rows
+
+def tab_sources(config):
+    """Map each tab name to the data it is rendered from, for cache keys.
+
+    None marks a tab whose source can't be hashed up front.
+    """
+    sources = {"Overview": [info, config["info"], instructions]}
+    if config["durations"] is not None:
+        # The target date moves with the CSV and the date ongoing inquiries run to
+        sources["Overview"] += [config["durations"], config["forecast"],
+                                inquiry_data.file_sha256(inquiry_data.DATA_CSV), as_of_date(config).isoformat()]
+    sources.update(phase_data)
+    if config["schedule"] is not None:
+        plan = checklist_schedule(config)
+        for tab_name, data in phase_data.items():
+            sources[tab_name] = [data, phase_targets(plan, tab_name)]
+        # The rows follow from the plan and the dates
+        sources[TIMELINE_TAB] = [phase_data, phase_plan, {key: plan[key] for key in ("established", "report", "scale")}]
+    sources["Decision Log"] = register_source(config["decisions"], config["register_rows"])
+    sources["Risk Register"] = risks
+    sources["Statutory vs Non-Statutory"] = matrix
+    sources["Budget Tracker"] = [categories, config["forecast"], inquiry_data.file_sha256(inquiry_data.DATA_CSV)]
+    sources["CP Register"] = register_source(config["core_participants"], config["register_rows"])
+    sources["Stakeholder Map"] = register_source(config["stakeholders"], config["register_rows"])
+    if config["benchmarks"]:
+        # Ongoing inquiries' durations run to as_of
+        sources["Benchmarks"] = [inquiry_data.file_sha256(inquiry_data.DATA_CSV), as_of_date(config).isoformat()]
+    if config["comparables"] is not None:
+        sources["Comparable Inquiries"] = [inquiry_data.file_sha256(inquiry_data.DATA_CSV), *comparables_query(config)]
+    if config["evidence_review"] is not None:
+        sources["Evidence Review"] = [inquiry_data.file_sha256(inquiry_data.DATA_CSV), evidence_review_options(config)]
+    if config["index_terms"]:
+        sources[INDEX_TAB] = [phase_data, risks, matrix, config["index_terms"]]
+    for module in config["modules"] or ():
+        sources.update((tab_name, source) for tab_name, _, source in module_tabs(module, config))
+    # Also defines the workbook names, so it is rendered every time
+    sources[LISTS_TAB] = None
+    return sources
+
+def save_workbook(wb, output=None):
+    # Formulas get their results written alongside (see formula_values.py),
+    # and the same workbook always saves to the same bytes (package_store.py)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return write_output(package_store.reproducible(formula_values.fill_package(buf.getvalue())), output)
+
+def write_output(data, output=None):
+    if output is None:
+        return data
+    if hasattr(output, "write"):
+        output.write(data)
+    else:
+        with open(output, "wb") as f:
+            f.write(data)
+    return output
+
+def build_workbook(config=None, output=None, cache=None, metrics=None):
+    """Build the toolkit and save it to ``output``.
+
+    ``output`` may be a filesystem path or a writable binary file object; the
+    same value is returned. With no output the xlsx is returned as bytes.
+    With a ``sheet_cache.SheetCache``, tabs whose source is unchanged since an
+    earlier build are copied from the cache instead of being rendered. With a
+    ``build_metrics.BuildMetrics``, each tab and the save are timed and counted.
+    """
+    config = resolve_config(config)
+    if cache is not None and config["backend"] != "openpyxl":
+        raise ValueError("The sheet cache only works with the openpyxl backend")
+    wb = new_workbook(config)
+    if metrics is None:
+        return assemble(wb, config, tab_builders(config), save_workbook, output, cache)
+    builders = ((name, metrics.builder(name, build)) for name, build in tab_builders(config))
+    with metrics.build(wb, config):
+        output = assemble(wb, config, builders, metrics.saver(save_workbook), output, cache)
+        if cache is not None:
+            metrics.reused = list(cache.reused)
+    return output
+
+def assemble(wb, config, builders, save, output, cache):
+    if cache is not None:
+        sources = tab_sources(config)
+        tabs = ((name, build, sources[name]) for name, build in builders)
+        return write_output(cache.build(wb, tabs, config["streaming"], save), output)
+    for _, build in builders:
+        build(wb)
+    return save(wb, output)
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def read_register_csv(path):
+    """Stream rows from a register CSV, skipping its header line."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            yield [v if v != "" else None for v in row]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Public Inquiry Consulting Toolkit workbook.")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"xlsx path to write (default: {DEFAULT_OUTPUT!r})")
+    parser.add_argument("-c", "--config", help="JSON file with build options, e.g. {\"info\": {\"Chair\": \"...\"}}")
+    parser.add_argument("--streaming", action="store_true", help="use openpyxl write-only mode (flat memory for large registers)")
+    parser.add_argument("--backend", choices=BACKENDS, help="\"xml\" writes SpreadsheetML directly instead of via openpyxl")
+    parser.add_argument("--decisions", metavar="CSV", help="pre-fill the Decision Log from a CSV (columns after \"#\")")
+    parser.add_argument("--core-participants", metavar="CSV", help="pre-fill the CP Register from a CSV (columns after \"#\")")
+    parser.add_argument("--stakeholders", metavar="CSV", help="pre-fill the Stakeholder Map from a CSV (columns after \"#\")")
+    parser.add_argument("--evidence-review", action="store_true", help="add the Evidence Review staffing simulation")
+    parser.add_argument("--index", metavar="TERM", action="append", help="add an Index tab of hits for TERM (repeatable)")
+    parser.add_argument("--schedule", metavar="ESTABLISHED", nargs="?", const="",
+                        help="add the Timeline tab and Target Dates, from ESTABLISHED (default: Date Established, else --as-of)")
+    parser.add_argument("--as-of", metavar="DATE", help="measure ongoing inquiries to DATE (default: the latest date in the CSV)")
+    parser.add_argument("--metrics", metavar="JSON", help="write per-tab timings and counters here (\"-\" for stdout)")
+    parser.add_argument("--trace-memory", action="store_true", help="add tracemalloc peaks to --metrics (slower)")
+    parser.add_argument("--profile", metavar="FILE", help="run the build under cProfile and dump the stats here")
+    parser.add_argument("--cache-dir", metavar="DIR", help="reuse tabs whose source is unchanged since an earlier build")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config) if args.config else {}
+    if args.streaming:
+        config["streaming"] = True
+    if args.backend:
+        config["backend"] = args.backend
+    if args.evidence_review and config.get("evidence_review") is None:
+        config["evidence_review"] = {}
+    if args.index:
+        config["index_terms"] = args.index
+    if args.as_of:
+        config["as_of"] = args.as_of
+    if args.schedule is not None:
+        config["schedule"] = {**(config.get("schedule") or {}), **({"established": args.schedule} if args.schedule else {})}
+    for key in ("decisions", "core_participants", "stakeholders"):
+        path = getattr(args, key)
+        if path:
+            config[key] = read_register_csv(path)
+
+    cache = sheet_cache.SheetCache(args.cache_dir) if args.cache_dir else None
+    metrics = None
+    if args.metrics or args.profile:
+        metrics = build_metrics.BuildMetrics(trace_memory=args.trace_memory, profile=args.profile)
+    output_path = build_workbook(config, os.fspath(args.output), cache=cache, metrics=metrics)
+    print(f"Saved to {output_path}")
+    if cache is not None:
+        print(f"Rendered {len(cache.rendered)} tab(s), reused {len(cache.reused)} from {args.cache_dir}")
+    if args.metrics:
+        build_metrics.write_json(metrics.result, args.metrics)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Find the past inquiries in data/uk_public_inquiries.csv most like a new one.
+
+    python scripts/comparables.py --subject-area health --type statutory --hearing-days 150
+    python scripts/comparables.py --like "Grenfell Tower Inquiry" -k 5
+    python scripts/comparables.py --description "hospital maternity deaths" --rebuild
+
+Similarity combines three parts, each in [0, 1]:
+
+- text: cosine similarity of TF-IDF vectors of ``description``
+- category: agreement on subject area, inquiry type and statutory basis
+- scale: exp(-|z difference|) on the log of cost, hearing days, witnesses,
+  core participants and documents, z-scored over the inquiries that report them
+
+A part the query does not describe is left out and the other weights
+renormalised. Within a part, fields missing on either side are skipped; an
+inquiry that cannot be compared on a part at all (no description, no scale
+figures) is given that part's mean similarity over the inquiries that can,
+so missing data is neither rewarded nor penalised. The feature matrices
+are built once per CSV version and saved to data/comparables.npz; queries are
+vectorised over every row at once.
+"""
+from collections import Counter
+from functools import lru_cache
+import argparse
+import math
+import os
+import re
+import sys
+import tempfile
+
+import numpy as np
+
+import inquiry_data
+
+INDEX_NPZ = os.path.join(inquiry_data.ROOT, "data", "comparables.npz")
+DEFAULT_K = 10
+
+# Part weights, and the weight of each field within the category part
+WEIGHTS = {"text": 0.4, "category": 0.3, "scale": 0.3}
+CATEGORY_FIELDS = {"subject_area": 0.5, "inquiry_type": 0.3, "statutory_basis": 0.2}
+SCALE_FIELDS = ["cost_millions", "hearing_days", "witnesses_count", "core_participants_count", "documents_disclosed"]
+
+STOPWORDS = set("""
+a an and are as at be by for from has have in into its of on or that the their this to was were which with
+inquiry inquiries public independent examining investigating investigation review
+""".split())
+
+def tokenize(text):
+    return [w for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(w) > 2 and w not in STOPWORDS]
+
+# ═══════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════
+def tfidf_rows(docs, vocab, idf):
+    """Sublinear TF-IDF, L2-normalised; one row per token list."""
+    column = {term: i for i, term in enumerate(vocab)}
+    out = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    for r, tokens in enumerate(docs):
+        for term, count in Counter(tokens).items():
+            if term in column:
+                out[r, column[term]] = (1 + math.log(count)) * idf[column[term]]
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+def build_index(csv_path=inquiry_data.DATA_CSV):
+    """Feature arrays for every row of the CSV, as saved in the .npz."""
+    table = inquiry_data.load_inquiries(csv_path)
+    docs = [tokenize(d) for d in table["description"]]
+    df = Counter(term for tokens in docs for term in set(tokens))
+    vocab = sorted(df)
+    # Smoothed idf, as scikit-learn computes it
+    idf = np.array([math.log((1 + len(docs)) / (1 + df[t])) + 1 for t in vocab])
+
+    index = {
+        "sha256": np.array(table.sha256),
+        "names": np.array(table["name"], dtype=str),
+        "vocab": np.array(vocab, dtype=str),
+        "idf": idf,
+        "text": tfidf_rows(docs, vocab, idf),
+    }
+    for field in CATEGORY_FIELDS:
+        values = np.array([v.strip().lower() for v in table[field]], dtype=str)
+        index[f"cat_{field}"] = values  # "" where missing
+
+    logs = np.log1p(np.column_stack([table[f] for f in SCALE_FIELDS]))
+    index["scale_mean"] = np.nanmean(logs, axis=0)
+    index["scale_std"] = np.nanstd(logs, axis=0)
+    index["scale_std"][~(index["scale_std"] > 0)] = 1
+    index["scale"] = (logs - index["scale_mean"]) / index["scale_std"]  # NaN where missing
+    return index
+
+def save_index(index, path=INDEX_NPZ):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez_compressed(f, **index)
+    os.replace(tmp, path)
+
+def load_index(csv_path=inquiry_data.DATA_CSV, index_path=INDEX_NPZ, rebuild=False):
+    """The index for the CSV's current contents, rebuilding the .npz when the CSV has changed."""
+    if rebuild:
+        _load_index.cache_clear()
+    st = os.stat(csv_path)
+    return _load_index(os.path.abspath(csv_path), st.st_mtime_ns, st.st_size, index_path, rebuild)
+
+@lru_cache(maxsize=4)
+def _load_index(csv_path, mtime_ns, size, index_path, rebuild):
+    sha = inquiry_data.load_inquiries(csv_path).sha256
+    if not rebuild and os.path.exists(index_path):
+        with np.load(index_path, allow_pickle=False) as saved:
+            if str(saved["sha256"]) == sha:
+                return dict(saved)
+    index = build_index(csv_path)
+    save_index(index, index_path)
+    return index
+
+# ═══════════════════════════════════════════════════════════════
+# QUERY
+# ═══════════════════════════════════════════════════════════════
+def weighted(parts):
+    """Combine ``(weight, similarity, available)`` arrays, skipping unavailable entries."""
+    total = sum(w * np.where(avail, sim, 0) for w, sim, avail in parts)
+    weight = sum(w * avail for w, _, avail in parts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight > 0, total / weight, 0), weight
+
+def similarities(index, query):
+    """Score every indexed inquiry against ``query``.
+
+    ``query`` may give ``description``, the CATEGORY_FIELDS and the
+    SCALE_FIELDS (CSV column names); anything absent is treated as unknown.
+    Returns ``(score, text, category, scale)`` arrays, NaN where a part
+    could not be compared.
+    """
+    n = len(index["names"])
+    nan = np.full(n, np.nan)
+
+    text = nan
+    tokens = tokenize(query.get("description"))
+    if tokens:
+        q = tfidf_rows([tokens], index["vocab"], index["idf"])[0]
+        if q.any():
+            text = index["text"] @ q
+            # Rows with no description have nothing to compare
+            text[~index["text"].any(axis=1)] = np.nan
+
+    fields = []
+    for field, w in CATEGORY_FIELDS.items():
+        value = (query.get(field) or "").strip().lower()
+        if value:
+            column = index[f"cat_{field}"]
+            fields.append((w, (column == value).astype(float), column != ""))
+    category = nan
+    if fields:
+        sim, weight = weighted(fields)
+        category = np.where(weight > 0, sim, np.nan)
+
+    q = np.array([query.get(f) if query.get(f) not in (None, "") else np.nan for f in SCALE_FIELDS], dtype=float)
+    q[~(q >= 0)] = np.nan
+    qz = (np.log1p(q) - index["scale_mean"]) / index["scale_std"]
+    diffs = np.abs(index["scale"] - qz)
+    counts = (~np.isnan(diffs)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.nansum(np.exp(-diffs), axis=1) / counts
+    scale[counts == 0] = np.nan
+
+    parts = []
+    for name, part in [("text", text), ("category", category), ("scale", scale)]:
+        known = ~np.isnan(part)
+        if known.any():
+            parts.append((WEIGHTS[name], np.where(known, part, part[known].mean()), np.ones(n, bool)))
+    score = weighted(parts)[0] if parts else np.zeros(n)
+    return score, text, category, scale
+
+def find_comparables(query, k=DEFAULT_K, exclude=(), index=None):
+    """The ``k`` best matches as dicts (CSV row index, name, score and parts), best first.
+
+    Rows whose name is in ``exclude`` are skipped, e.g. the inquiry itself.
+    """
+    index = index if index is not None else load_index()
+    score, text, category, scale = similarities(index, query)
+    names = index["names"]
+    candidates = [i for i in np.argsort(-score, kind="stable") if names[i] not in exclude]
+    return [{
+        "row": int(i), "name": str(names[i]), "score": float(score[i]),
+        "text": None if np.isnan(text[i]) else float(text[i]),
+        "category": None if np.isnan(category[i]) else float(category[i]),
+        "scale": None if np.isnan(scale[i]) else float(scale[i]),
+    } for i in candidates[:k]]
+
+def query_from_row(table, i):
+    """The query that describes CSV row ``i`` itself."""
+    return {field: table[field][i] for field in ["description", *CATEGORY_FIELDS, *SCALE_FIELDS]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the past inquiries most similar to a new one.")
+    parser.add_argument("--like", metavar="NAME", help="use an inquiry already in the CSV as the query")
+    parser.add_argument("--description")
+    parser.add_argument("--subject-area")
+    parser.add_argument("--type", dest="inquiry_type", choices=["statutory", "non_statutory"])
+    parser.add_argument("--statutory-basis")
+    parser.add_argument("--cost", dest="cost_millions", type=float, help="£m")
+    parser.add_argument("--hearing-days", type=float)
+    parser.add_argument("--witnesses", dest="witnesses_count", type=float)
+    parser.add_argument("--core-participants", dest="core_participants_count", type=float)
+    parser.add_argument("--documents", dest="documents_disclosed", type=float)
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--csv", default=inquiry_data.DATA_CSV)
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index even if the CSV is unchanged")
+    args = parser.parse_args(argv)
+
+    index = load_index(args.csv, rebuild=args.rebuild)
+    query = {key: value for key, value in vars(args).items()
+             if key in ["description", *CATEGORY_FIELDS, *SCALE_FIELDS] and value is not None}
+    exclude = ()
+    if args.like:
+        table = inquiry_data.load_inquiries(args.csv)
+        matches = [i for i, name in enumerate(table["name"]) if name.lower() == args.like.lower()]
+        if not matches:
+            parser.error(f"no inquiry named {args.like!r}")
+        query = {**query_from_row(table, matches[0]), **query}
+        exclude = (table["name"][matches[0]],)
+    if not query:
+        parser.error("describe the inquiry (see --help) or use --like")
+
+    print(f"{'score':>6} {'text':>5} {'cat':>5} {'scale':>5}  inquiry")
+    for match in find_comparables(query, args.k, exclude, index):
+        parts = " ".join("    -" if match[p] is None else f"{match[p]:5.2f}" for p in ("text", "category", "scale"))
+        print(f"{match['score']:6.3f} {parts}  {match['name']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""Merge core participant lists into the CP Register.
+
+    python scripts/cp_import.py lists/*.csv lists/*.xlsx -o "Inquiry Toolkit.xlsx"
+    python scripts/cp_import.py lists/ --register-csv core_participants.csv
+
+Solicitors' spreadsheets (CSV or xlsx, any sheet whose header row names the
+participant) are streamed row by row. Columns are matched on their headers
+loosely ("Name", "Organisation", "Solicitor", "Email", ...).
+
+Duplicates are found in two passes without comparing every pair:
+
+- names are normalised (case, accents, punctuation, titles such as "Mr" or
+  "Dr", company suffixes such as "Ltd") and fingerprinted as their sorted
+  words, so "Smith, John" and "Mr John Smith" collide in a dict; rows with
+  the same fingerprint but different legal rep firms are kept apart, as two
+  people who share a name
+- remaining near-misses ("John Smiht") are found through blocking keys that
+  drop one letter from one word, and merged when one word is a single typo
+  away and the rows don't name different legal rep firms
+
+Merged entries keep the first value seen for each column and fill blanks
+from the others; a firm one of them doesn't list is added to the
+``Recognised Legal Rep`` ("A LLP; B & Co"). Participants are then grouped for joint representation
+with a union-find over shared ``Recognised Legal Rep`` firms (a participant
+listing several firms links their groups). Type and funding are mapped onto
+the CPType and Funding drop-down options; anything else is left blank and
+kept in Notes. The rows go into the CP Register, or a CSV that
+``build_workbook.py --core-participants`` reads.
+"""
+from datetime import datetime
+from functools import lru_cache
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from openpyxl import load_workbook
+
+import build_workbook as bw
+
+# Shorter words must match exactly for two names to be merged
+FUZZY_LENGTH = 5
+
+# Register column -> header spellings accepted in the inputs (normalised by header_key)
+column_aliases = {
+    "Name / Organisation": ["name / organisation", "name", "organisation", "organization", "core participant", "participant", "full name"],
+    "Type": ["type", "cp type", "participant type", "category"],
+    "Phase(s) Designated": ["phase(s) designated", "phases", "phase", "modules", "module"],
+    "Date Designated": ["date designated", "designated", "date"],
+    "Recognised Legal Rep": ["recognised legal rep", "recognised legal representative", "legal rep", "legal representative",
+                             "solicitor", "solicitors", "firm", "representation"],
+    "Funding Status": ["funding status", "funding", "section 40"],
+    "Joint Representation Group": ["joint representation group", "group"],
+    "Key Contact": ["key contact", "contact", "email", "contact email"],
+    "Notes": ["notes", "comments"],
+}
+register_columns = bw.cp_headers[1:]
+# "A & Co / B LLP" or "A; B" lists more than one firm
+FIRM_SEPARATORS = re.compile(r"[;/|\n]+")
+
+TITLES = {"mr", "mrs", "ms", "miss", "mx", "dr", "prof", "professor", "sir", "dame", "lord", "lady", "rev", "revd", "the", "hon"}
+SUFFIXES = {"ltd", "limited", "plc", "llp", "lp", "inc", "co", "company", "uk", "group", "solicitors", "solicitor", "law", "legal"}
+
+# Drop-down option -> words that map onto it, most specific first ("NHS Trust"
+# is a government body, "Bereaved Families Group" an action group)
+type_words = {
+    "Government Body": ["government", "department", "ministry", "public body", "council", "police", "nhs", "authority"],
+    "Action Group": ["action group", "campaign", "group", "association", "network"],
+    "Organisation": ["organisation", "organization", "company", "charity", "trust", "firm", "business"],
+    "Individual": ["individual", "person", "bereaved", "family member", "survivor", "witness"],
+    "Other": ["other"],
+}
+funding_words = {
+    "Public Funded": ["public", "section 40", "s40", "s.40", "funded by inquiry", "yes"],
+    "Self-Funded": ["self", "private", "own"],
+    "Application Pending": ["pending", "applied", "application"],
+    "Not Applicable": ["n/a", "not applicable", "none", "no"],
+}
+
+def header_key(text):
+    return re.sub(r"\s+", " ", str(text or "").strip().lower())
+
+header_lookup = {alias: column for column, aliases in column_aliases.items() for alias in aliases}
+
+# ═══════════════════════════════════════════════════════════════
+# READING
+# ═══════════════════════════════════════════════════════════════
+def rows_from_table(rows, source):
+    """Yield ``(source, {register column: value})`` for rows under the first recognisable header row."""
+    mapping = None
+    for row in rows:
+        if mapping is None:
+            found = {i: header_lookup[header_key(v)] for i, v in enumerate(row) if header_key(v) in header_lookup}
+            if "Name / Organisation" in found.values():
+                # First matching column wins, e.g. "Name" before "Organisation"
+                mapping = {}
+                for i, column in found.items():
+                    if column not in mapping.values():
+                        mapping[i] = column
+            continue
+        record = {column: row[i] for i, column in mapping.items() if i < len(row) and row[i] not in (None, "")}
+        if record.get("Name / Organisation"):
+            yield source, record
+
+def read_source(path):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                yield from rows_from_table(ws.iter_rows(values_only=True), f"{os.path.basename(path)}:{ws.title}")
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from rows_from_table(csv.reader(f), os.path.basename(path))
+
+def expand_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith((".csv", ".xlsx", ".xlsm")) and not name.startswith("~$"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+# ═══════════════════════════════════════════════════════════════
+# MATCHING
+# ═══════════════════════════════════════════════════════════════
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # path halving
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+def name_words(text, drop):
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().lower()
+    text = text.replace("&", " and ")
+    return [w for w in re.findall(r"[a-z0-9]+", text) if w not in drop]
+
+def fingerprint(name):
+    """Order-free key: "Smith, Mr John" and "John Smith" give the same one."""
+    words = name_words(name, TITLES | SUFFIXES)
+    return " ".join(sorted(set(words))) or str(name).strip().lower()
+
+def deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))} | {word}
+
+def blocking_keys(key):
+    """The name with one word replaced by each of its one-letter deletions.
+
+    Two names that differ by one typo in one word (a letter changed, added or
+    dropped) share at least one of these keys, so candidates come from dict
+    lookups rather than comparing every pair. Words shorter than FUZZY_LENGTH
+    ("Mark" / "Mary") only ever match exactly.
+    """
+    words = key.split()
+    for i, word in enumerate(words):
+        if len(word) >= FUZZY_LENGTH:
+            rest = " ".join(words[:i] + words[i + 1:])
+            for variant in deletions(word):
+                yield f"{rest}|{variant}"
+
+def one_edit(a, b):
+    """True if ``a`` becomes ``b`` by changing, adding or dropping one letter."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i + (len(a) == len(b)):] == b[i + 1:]
+
+def same_firm(a, b):
+    # A row without a legal rep can be anyone's
+    return not a or not b or bool(a & b)
+
+def near_duplicates(keys, firms):
+    """Pairs of indices into ``keys`` (fingerprints) one typo apart.
+
+    Names whose rows give different legal rep firms are left apart.
+    """
+    blocks = {}
+    for i, key in enumerate(keys):
+        for block in blocking_keys(key):
+            blocks.setdefault(block, []).append(i)
+    seen = set()
+    for members in blocks.values():
+        for n, a in enumerate(members):
+            for b in members[n + 1:]:
+                if (a, b) in seen:
+                    continue
+                seen.add((a, b))
+                wa, wb = set(keys[a].split()), set(keys[b].split())
+                if not same_firm(firms[a], firms[b]):
+                    continue
+                if len(wa ^ wb) == 2 and one_edit(*(wa - wb), *(wb - wa)):
+                    yield a, b
+
+# Column -> [(option, pattern of its words)]
+option_patterns = {
+    column: [(option, re.compile("|".join(rf"\b{re.escape(w)}(?!\w)" for w in words))) for option, words in table.items()]
+    for column, table in (("Type", type_words), ("Funding Status", funding_words))
+}
+
+@lru_cache(maxsize=None)
+def choose(column, value):
+    """The ``column`` drop-down option ``value`` means, or None. Lists repeat a handful of values, hence the cache."""
+    text = str(value).strip().lower()
+    for option, pattern in option_patterns[column]:
+        if text == option.lower():
+            return option
+    for option, pattern in option_patterns[column]:
+        if pattern.search(text):
+            return option
+    return None
+
+def clean(record, source):
+    """A register row (dict) from one input record; unmapped type/funding go to Notes."""
+    row = {column: record.get(column) for column in register_columns}
+    notes = [str(row["Notes"]).strip()] if row["Notes"] else []
+    for column in option_patterns:
+        if row[column] is not None:
+            option = choose(column, row[column])
+            if option is None:
+                notes.append(f"{column}: {row[column]}")
+            row[column] = option
+    # Register cells are plain text, so dates are written the way the CSV route gives them
+    designated = row["Date Designated"]
+    if isinstance(designated, datetime):
+        row["Date Designated"] = designated.date().isoformat()
+    elif isinstance(designated, str):
+        for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d %B %Y", "%d %b %Y"):
+            try:
+                row["Date Designated"] = datetime.strptime(designated.strip(), fmt).date().isoformat()
+                break
+            except ValueError:
+                pass
+    row["Name / Organisation"] = re.sub(r"\s+", " ", str(row["Name / Organisation"])).strip()
+    row["Notes"] = "; ".join(notes) or None
+    row["_sources"] = [source]
+    return row
+
+def merge(into, row):
+    for column in register_columns:
+        if into[column] in (None, "") and row[column] not in (None, ""):
+            into[column] = row[column]
+        elif column == "Recognised Legal Rep" and row[column]:
+            # Every firm is kept, so grouping still links the participant to each one
+            known = rep_firms(into[column])
+            added = [part.strip() for part in FIRM_SEPARATORS.split(str(row[column]))
+                     if part.strip() and fingerprint(part) not in known]
+            if added:
+                into[column] = "; ".join([str(into[column]), *added])
+        elif column == "Notes" and row[column] and row[column] not in into[column]:
+            into[column] = f"{into[column]}; {row[column]}"
+    into["_sources"] += [s for s in row["_sources"] if s not in into["_sources"]]
+
+def rep_firms(value):
+    return {fingerprint(part) for part in FIRM_SEPARATORS.split(str(value or "")) if part.strip()}
+
+def deduplicate(records):
+    """Merge ``(source, record)`` pairs into unique register rows; returns ``(rows, stats)``."""
+    by_key = {}  # fingerprint -> [(row, its firms)], one per distinct participant of that name
+    total = 0
+    for source, record in records:
+        total += 1
+        row = clean(record, source)
+        firms = rep_firms(row["Recognised Legal Rep"])
+        entries = by_key.setdefault(fingerprint(row["Name / Organisation"]), [])
+        for n, (kept, kept_firms) in enumerate(entries):
+            if same_firm(kept_firms, firms):
+                merge(kept, row)
+                entries[n] = (kept, kept_firms | firms)
+                break
+        else:
+            entries.append((row, firms))
+    keys = [key for key, entries in by_key.items() for _ in entries]
+    rows = [row for entries in by_key.values() for row, _ in entries]
+    firms = [firms for entries in by_key.values() for _, firms in entries]
+    exact = len(rows)
+
+    uf = UnionFind(len(rows))
+    for a, b in near_duplicates(keys, firms):
+        # Checked again for the groups, or a row without a firm could join two namesakes' rows
+        ra, rb = uf.find(a), uf.find(b)
+        if ra != rb and same_firm(firms[ra], firms[rb]):
+            firms[uf.union(ra, rb)] = firms[ra] | firms[rb]
+    merged = {}
+    for i, row in enumerate(rows):
+        root = uf.find(i)
+        if root in merged:
+            merge(merged[root], row)
+        else:
+            merged[root] = row
+    rows = list(merged.values())
+    return rows, {"input_rows": total, "after_exact": exact, "unique": len(rows)}
+
+def group_representation(rows):
+    """Fill "Joint Representation Group" by union-find over shared legal rep firms.
+
+    Groups already named in the input link their members too and keep their
+    name; others are numbered. Returns the number of groups.
+    """
+    uf = UnionFind(len(rows))
+    first = {}
+    for i, row in enumerate(rows):
+        links = {("firm", f) for f in rep_firms(row["Recognised Legal Rep"])}
+        if row["Joint Representation Group"]:
+            links.add(("group", str(row["Joint Representation Group"]).strip().lower()))
+        for link in links:
+            if link in first:
+                uf.union(first[link], i)
+            else:
+                first[link] = i
+    members = {}
+    for i in range(len(rows)):
+        members.setdefault(uf.find(i), []).append(i)
+    groups = sorted((m for m in members.values() if len(m) > 1), key=lambda m: (-len(m), m[0]))
+    for number, group in enumerate(groups, 1):
+        given = next((rows[i]["Joint Representation Group"] for i in group if rows[i]["Joint Representation Group"]), None)
+        firm = next((rows[i]["Recognised Legal Rep"] for i in group if rows[i]["Recognised Legal Rep"]), None)
+        label = given or f"Group {number}" + (f" ({firm})" if firm else "")
+        for i in group:
+            rows[i]["Joint Representation Group"] = label
+            rows[i]["_group"] = number
+    return len(groups)
+
+def import_participants(paths):
+    """``(rows, stats)``: register rows (lists, without "#") sorted by group then name."""
+    t0 = time.perf_counter()
+    rows, stats = deduplicate(record for path in expand_paths(paths) for record in read_source(path))
+    stats["groups"] = group_representation(rows)
+    # Largest groups first, then participants represented alone
+    alone = stats["groups"] + 1
+    rows.sort(key=lambda r: (r.get("_group", alone), r["Name / Organisation"].lower()))
+    stats["seconds"] = time.perf_counter() - t0
+    return [[row[column] for column in register_columns] for row in rows], stats
+
+def write_register_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(register_columns)
+        for row in rows:
+            writer.writerow(["" if v is None else v for v in row])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate and group core participant lists into the CP Register.")
+    parser.add_argument("inputs", nargs="+", help="CSV / xlsx files or directories of them")
+    parser.add_argument("-o", "--output", help="build a toolkit with the merged CP Register here")
+    parser.add_argument("-c", "--config", help="JSON build config for the toolkit (see build_workbook.py)")
+    parser.add_argument("--streaming", action="store_true", help="build with openpyxl write-only mode (flat memory for long registers)")
+    parser.add_argument("--register-csv", help="write the merged rows as a CSV for build_workbook.py --core-participants")
+    args = parser.parse_args(argv)
+    if not args.output and not args.register_csv:
+        parser.error("give --output and/or --register-csv")
+
+    rows, stats = import_participants(args.inputs)
+    print(f"{stats['input_rows']:,} rows -> {stats['after_exact']:,} after exact matches -> {stats['unique']:,} participants "
+          f"in {stats['groups']:,} joint representation groups ({stats['seconds']:.2f}s)")
+    if args.register_csv:
+        write_register_csv(rows, args.register_csv)
+        print(f"Wrote {args.register_csv}")
+    if args.output:
+        config = bw.load_config(args.config) if args.config else {}
+        config["core_participants"] = rows
+        if args.streaming:
+            config["streaming"] = True
+        print(f"Saved to {bw.build_workbook(config, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Inquiry duration estimates that treat ongoing inquiries as right-censored.
+
+    python scripts/durations.py                       # summary by type and subject area
+    python scripts/durations.py --as-of 2026-01-01 --rebuild
+
+Measuring ongoing inquiries up to a date (as computeDuration does) counts them
+as if they had just closed, which pulls every duration estimate down. Here
+an ongoing inquiry only says its duration is *at least* the time so far:
+Kaplan–Meier survival curves of "still open after t months" are computed
+for every inquiry, for each inquiry type and for each subject area, with
+the median, P80 (80% closed) and restricted mean (area under the curve up to
+the longest observed duration). Bootstrap intervals come from resampling
+inquiries within each group; all resamples of a group are computed at once
+as matrix products over the group's event times.
+
+Ongoing inquiries are measured to the latest date the CSV records unless
+another ``as_of`` is given, so the curves depend on the CSV alone; they are
+saved to data/durations.json (not tracked) keyed by its hash. Curves for
+another date are computed in memory only.
+"""
+from datetime import date
+from functools import lru_cache
+import argparse
+import calendar
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+import inquiry_data
+
+CURVES_JSON = os.path.join(inquiry_data.ROOT, "data", "durations.json")
+CURVES_VERSION = 1
+
+RESAMPLES = 2_000
+# Fixed so that rebuilding a workbook gives the same figures
+SEED = 2005
+INTERVAL = [2.5, 97.5]
+# Groups with fewer closed inquiries than this are left out
+MIN_EVENTS = 5
+GROUP_FIELDS = ["inquiry_type", "subject_area"]
+
+def survival_data(table, as_of=None):
+    """``(months, closed)`` for every inquiry with a start date; open ones run to ``as_of``."""
+    as_of = np.datetime64(as_of or inquiry_data.data_date(table), "D")
+    start = table["date_established"]
+    closed = ~np.isnat(table["date_closed"])
+    end = np.where(closed, table["date_closed"], as_of)
+    days = (end - start).astype(float)
+    known = ~np.isnat(start) & (days >= 0)
+    return days[known] / inquiry_data.DAYS_PER_MONTH, closed[known], known
+
+# ═══════════════════════════════════════════════════════════════
+# KAPLAN–MEIER
+# ═══════════════════════════════════════════════════════════════
+def kaplan_meier(months, closed, weights=None):
+    """Survival after each event time, for one or many weightings of the same inquiries.
+
+    ``weights`` is an (R, n) array of how often each inquiry is counted (a
+    bootstrap resample is a row of counts); None means each once. Returns
+    ``(times, survival)`` with ``survival`` shaped (R, len(times)).
+    """
+    weights = np.ones((1, len(months))) if weights is None else np.atleast_2d(weights)
+    times = np.unique(months[closed])
+    events = (months[:, None] == times) & closed[:, None]
+    at_risk = months[:, None] >= times
+    d = weights @ events
+    n = weights @ at_risk
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hazard = np.where(n > 0, d / n, 0)
+    return times, np.cumprod(1 - hazard, axis=1)
+
+def quantile_time(times, survival, closed_share):
+    """First time by which ``closed_share`` of inquiries have closed; NaN if never reached."""
+    reached = survival <= 1 - closed_share + 1e-12
+    first = reached.argmax(axis=1)
+    return np.where(reached.any(axis=1), times[first], np.nan)
+
+def restricted_mean(times, survival, horizon):
+    """Area under the survival step function from 0 to ``horizon`` months."""
+    edges = np.concatenate([[0], times[times < horizon], [horizon]])
+    # S is 1 before the first event time and steps down at each one
+    steps = np.concatenate([np.ones((len(survival), 1)), survival[:, :len(edges) - 2]], axis=1)
+    return (steps * np.diff(edges)).sum(axis=1)
+
+def summarise(months, closed, resamples=RESAMPLES, seed=SEED):
+    times, survival = kaplan_meier(months, closed)
+    horizon = float(months.max())
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(months), size=(resamples, len(months)))
+    counts = np.zeros((resamples, len(months)))
+    np.add.at(counts, (np.arange(resamples)[:, None], idx), 1)
+    boot_times, boot = kaplan_meier(months, closed, counts)
+
+    def estimate(fn, *args):
+        point = fn(times, survival, *args)[0]
+        sample = fn(boot_times, boot, *args)
+        # Resamples where the estimate is undefined (curve never gets there) are dropped
+        sample = sample[~np.isnan(sample)]
+        low, high = np.percentile(sample, INTERVAL) if len(sample) else (np.nan, np.nan)
+        return {"estimate": _num(point), "low": _num(low), "high": _num(high)}
+
+    return {
+        "n": int(len(months)),
+        "closed": int(closed.sum()),
+        "curve": {"months": [round(float(t), 2) for t in times],
+                  "survival": [round(float(s), 4) for s in survival[0]]},
+        "median": estimate(quantile_time, 0.5),
+        "p80": estimate(quantile_time, 0.8),
+        "horizon": round(horizon, 2),
+        "restricted_mean": estimate(restricted_mean, horizon),
+    }
+
+def _num(value):
+    return None if np.isnan(value) else round(float(value), 1)
+
+def compute_curves(table, as_of=None, resamples=RESAMPLES):
+    """Summaries keyed by "all", then "<field>=<value>" for each GROUP_FIELDS value."""
+    months, closed, known = survival_data(table, as_of)
+    groups = {"all": summarise(months, closed, resamples)}
+    for field in GROUP_FIELDS:
+        column = table[field][known]
+        for value in sorted(set(column) - {""}):
+            mask = column == value
+            if closed[mask].sum() >= MIN_EVENTS:
+                groups[f"{field}={value}"] = summarise(months[mask], closed[mask], resamples)
+    return groups
+
+# ═══════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════
+def load_curves(csv_path=inquiry_data.DATA_CSV, as_of=None, curves_path=CURVES_JSON, rebuild=False):
+    """Curves for the CSV's current contents, measured to ``as_of`` (default the CSV's latest date)."""
+    if rebuild:
+        _load_curves.cache_clear()
+    st = os.stat(csv_path)
+    return _load_curves(os.path.abspath(csv_path), st.st_mtime_ns, st.st_size, as_of and as_of.isoformat(), curves_path, rebuild)
+
+@lru_cache(maxsize=4)
+def _load_curves(csv_path, mtime_ns, size, as_of, curves_path, rebuild):
+    table = inquiry_data.load_inquiries(csv_path)
+    default = inquiry_data.data_date(table)
+    if as_of and date.fromisoformat(as_of) != default:
+        return compute_curves(table, date.fromisoformat(as_of))
+    # Parallel builds may all write this; they write the same bytes
+    key = {"version": CURVES_VERSION, "sha256": table.sha256, "resamples": RESAMPLES, "seed": SEED}
+    if not rebuild:
+        try:
+            with open(curves_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("key") == key:
+                return saved["groups"]
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+    groups = compute_curves(table, default)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(curves_path), suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "groups": groups}, f, separators=(",", ":"))
+    os.replace(tmp, curves_path)
+    return groups
+
+# ═══════════════════════════════════════════════════════════════
+# TARGET DATES
+# ═══════════════════════════════════════════════════════════════
+def add_months(start, months):
+    whole = int(months)
+    year, month = divmod(start.month - 1 + whole, 12)
+    year, month = start.year + year, month + 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    shifted = date(year, month, day)
+    return date.fromordinal(shifted.toordinal() + round((months - whole) * inquiry_data.DAYS_PER_MONTH))
+
+def target_dates(established=None, subject_area=None, inquiry_type=None, csv_path=inquiry_data.DATA_CSV, as_of=None):
+    """Median and P80 report dates for an inquiry established on ``established`` (default ``as_of``).
+
+    Uses the subject area's curve if it reaches P80, else the inquiry type's,
+    else all inquiries. An inquiry already running is only compared with
+    those that lasted at least as long (the curve conditioned on its months
+    so far). Returns a dict with ``group``, ``n``, ``closed``, ``median`` and
+    ``p80`` (dates, or None where the curve never gets there).
+    """
+    groups = load_curves(csv_path, as_of)
+    as_of = as_of or inquiry_data.data_date(inquiry_data.load_inquiries(csv_path))
+    established = established or as_of
+    elapsed = max(0, (as_of - established).days) / inquiry_data.DAYS_PER_MONTH
+    candidates = [f"subject_area={subject_area}" if subject_area else None,
+                  f"inquiry_type={inquiry_type}" if inquiry_type else None]
+    chosen = next((g for g in candidates if g in groups and groups[g]["p80"]["estimate"] is not None), "all")
+    summary = groups[chosen]
+    times = np.array(summary["curve"]["months"])
+    survival = np.array(summary["curve"]["survival"])
+    # S(t | still open at elapsed) = S(t) / S(elapsed), for t after elapsed
+    still_open = survival[times <= elapsed][-1] if (times <= elapsed).any() else 1.0
+    later = times > elapsed
+    dates = {}
+    for key, share in (("median", 0.5), ("p80", 0.8)):
+        months = quantile_time(times[later], survival[None, later] / still_open, share)[0] if later.any() else np.nan
+        dates[key] = None if np.isnan(months) else add_months(established, float(months))
+    return {"group": chosen, "n": summary["n"], "closed": summary["closed"], **dates}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Censoring-aware inquiry duration estimates.")
+    parser.add_argument("--csv", default=inquiry_data.DATA_CSV)
+    parser.add_argument("--as-of", type=date.fromisoformat, help="date ongoing inquiries are measured to (default: the latest date in the CSV)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute even if the saved curves are current")
+    args = parser.parse_args(argv)
+
+    groups = load_curves(args.csv, args.as_of, rebuild=args.rebuild)
+
+    def fmt(est):
+        if est["estimate"] is None:
+            return "not reached".rjust(20)
+        interval = "" if est["low"] is None else f" ({est['low']:.0f}-{est['high']:.0f})"
+        return f"{est['estimate']:5.1f}{interval}".rjust(20)
+
+    print(f"{'group':32s} {'n':>3} {'closed':>6} {'median months':>20} {'P80 months':>20} {'restricted mean':>20}")
+    for name, s in groups.items():
+        print(f"{name:32s} {s['n']:3d} {s['closed']:6d} {fmt(s['median'])} {fmt(s['p80'])} {fmt(s['restricted_mean'])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Monte Carlo staffing model for disclosure review before the hearings.
+
+    python scripts/evidence_review.py --hearing-days 150 --weeks-to-hearing 52
+    python scripts/evidence_review.py --documents 400000 --statements 300 --teams 5 10 15 20
+
+Each scenario draws the volumes and work rates, then steps week by week
+through the pipeline:
+
+- intake: documents received from information holders, spread over the
+  intake period with week-to-week noise
+- review: the evidence team reads for relevance; the relevant share goes on
+  to redaction
+- redaction: done by the same team, ahead of new review so that material
+  reaches core participants as soon as it can
+- witness statements: drafted by a separate legal team, no faster than the
+  reviewed evidence allows
+
+Volumes are calibrated from data/uk_public_inquiries.csv: ``documents_disclosed``
+and ``witness_statements_count`` are drawn log-normally, in proportion to
+``hearing_days`` when the new inquiry's hearing days are known (the
+log-ratio's mean and spread over the inquiries that report both), otherwise
+from the column's own spread. A volume given outright is used as is. Work
+rates are planning assumptions (see the constants below). All scenarios and
+team sizes advance together as (teams, scenarios) arrays, so 100,000
+scenarios take a few seconds.
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+import inquiry_data
+
+SCENARIOS = 100_000
+SEED = 2005
+TEAM_SIZES = [2, 5, 10, 15, 20, 30, 40, 50, 75, 100]
+# Probability of clearing review and redaction before the hearing that the
+# recommended team must reach
+TARGET_CONFIDENCE = 0.8
+
+# Planning assumptions: (median, log-normal sigma) per person
+REVIEW_RATE = (400, 0.25)     # documents reviewed per working day, eDiscovery-assisted
+REDACTION_RATE = (120, 0.3)   # relevant documents redacted per working day
+DRAFTING_RATE = (2, 0.3)      # witness statements drafted per week
+RELEVANT_SHARE = (3, 7)       # Beta parameters: share of documents received that are disclosed
+WORKING_DAYS = 5
+AVAILABILITY = 0.8            # leave, training and other work
+DRAFTERS = 6
+# Timeline rows are every this many weeks
+TIMELINE_STEP = 4
+
+def log_normal(rng, median, sigma, size):
+    return median * np.exp(sigma * rng.standard_normal(size))
+
+# ═══════════════════════════════════════════════════════════════
+# CALIBRATION
+# ═══════════════════════════════════════════════════════════════
+def volume_model(table, column, hearing_days=None):
+    """``(log median, sigma, n)`` of ``column`` for an inquiry with ``hearing_days``."""
+    values = table[column]
+    if hearing_days:
+        days = table["hearing_days"]
+        both = (values > 0) & (days > 0)
+        if both.sum() >= 2:
+            ratios = np.log(values[both] / days[both])
+            return math.log(hearing_days) + ratios.mean(), float(ratios.std(ddof=1)), int(both.sum())
+    logs = np.log(values[values > 0])
+    if len(logs) < 2:
+        raise ValueError(f"Too few inquiries report {column} to calibrate the simulation")
+    return float(logs.mean()), float(logs.std(ddof=1)), len(logs)
+
+def draw_inputs(rng, n, documents=None, statements=None, hearing_days=None, csv_path=inquiry_data.DATA_CSV):
+    """Per-scenario volumes and rates, as a dict of length-``n`` arrays."""
+    table = inquiry_data.load_inquiries(csv_path)
+    inputs = {}
+    for key, column, given in [("documents", "documents_disclosed", documents),
+                               ("statements", "witness_statements_count", statements)]:
+        if given:
+            inputs[key] = np.full(n, float(given))
+        else:
+            mu, sigma, _ = volume_model(table, column, hearing_days)
+            inputs[key] = np.exp(mu + sigma * rng.standard_normal(n))
+    inputs["relevant_share"] = rng.beta(*RELEVANT_SHARE, n)
+    inputs["received"] = inputs["documents"] / inputs["relevant_share"]
+    inputs["review_rate"] = log_normal(rng, *REVIEW_RATE, n)
+    inputs["redaction_rate"] = log_normal(rng, *REDACTION_RATE, n)
+    inputs["drafting_rate"] = log_normal(rng, *DRAFTING_RATE, n)
+    return inputs
+
+# ═══════════════════════════════════════════════════════════════
+# SIMULATION
+# ═══════════════════════════════════════════════════════════════
+def intake_weights(rng, n, intake_weeks):
+    """Share of documents arriving each week, front-loaded with noise; rows sum to 1."""
+    t = (np.arange(intake_weeks) + 0.5) / intake_weeks
+    shape = t * (1 - t) ** 2  # Beta(2, 3) density: a quick start, then a long tail
+    weights = shape * rng.gamma(4, 1 / 4, size=(n, intake_weeks))
+    return weights / weights.sum(axis=1, keepdims=True)
+
+def simulate(team_sizes, weeks_to_hearing=52, intake_weeks=None, drafters=DRAFTERS, scenarios=SCENARIOS,
+             seed=SEED, **volumes):
+    """Run the pipeline for every team size over the same scenarios.
+
+    ``volumes`` are passed to ``draw_inputs``. Weeks run to twice the hearing
+    date so late completions are still timed. Returns a dict with the drawn
+    ``inputs``, ``completion`` (teams x scenarios, in weeks; inf if not done
+    by the end), ``statements_done`` (weeks), ``timeline_team`` (the first
+    team size to clear the hearing date in TARGET_CONFIDENCE of scenarios,
+    else the last) and its ``timeline``: cumulative received / disclosed /
+    statements percentiles every TIMELINE_STEP weeks, up to the week it has
+    finished everything or the hearing if later.
+    """
+    rng = np.random.default_rng(seed)
+    n = scenarios
+    inputs = draw_inputs(rng, n, **volumes)
+    intake_weeks = intake_weeks or max(1, weeks_to_hearing // 2)
+    arrivals = intake_weights(rng, n, intake_weeks) * inputs["received"][:, None]
+    horizon = 2 * max(weeks_to_hearing, intake_weeks)
+
+    teams = np.array(team_sizes, dtype=float)[:, None]
+    shape = (len(teams), n)
+    review_queue, redaction_queue, reviewed, disclosed, statements = (np.zeros(shape) for _ in range(5))
+    completion = np.full(shape, np.inf)
+    statements_done = np.full(shape, np.inf)
+    received = np.zeros(n)
+    # Person-days a week
+    capacity = teams * (WORKING_DAYS * AVAILABILITY)
+    redaction_rate, review_rate = inputs["redaction_rate"], inputs["review_rate"]
+    drafting = drafters * inputs["drafting_rate"]
+    statements_per_document = inputs["statements"] / inputs["received"]
+    relevant_share = inputs["relevant_share"]
+    timeline = []
+    row = None
+    redacted, done, days, ready = (np.empty(shape) for _ in range(4))
+
+    for week in range(horizon):
+        if week < intake_weeks:
+            received += arrivals[:, week]
+            review_queue += arrivals[:, week]
+        # Redaction first, so reviewed material keeps flowing out
+        np.multiply(capacity, redaction_rate, out=redacted)
+        np.minimum(redaction_queue, redacted, out=redacted)
+        redaction_queue -= redacted
+        disclosed += redacted
+        np.divide(redacted, redaction_rate, out=days)
+        np.subtract(capacity, days, out=days)
+        np.multiply(days, review_rate, out=done)
+        np.minimum(review_queue, done, out=done)
+        review_queue -= done
+        reviewed += done
+        done *= relevant_share
+        redaction_queue += done
+        # A statement can't be finalised before the evidence behind it is reviewed
+        np.multiply(reviewed, statements_per_document, out=ready)
+        statements += drafting
+        np.minimum(ready, statements, out=statements)
+
+        if week >= intake_weeks - 1:
+            clear = (review_queue + redaction_queue < 0.5) & np.isinf(completion)
+            completion[clear] = week + 1
+            drafted = (statements >= inputs["statements"] - 0.5) & np.isinf(statements_done)
+            statements_done[drafted] = week + 1
+
+        if row is None:
+            # Shares on time only grow, so teams after the first to reach the
+            # target can no longer be the timeline team; at the hearing it is known
+            first = first_on_time((completion <= weeks_to_hearing).mean(axis=1))
+            candidates = range(len(teams)) if first is None else range(first + 1)
+            if week + 1 >= weeks_to_hearing:
+                row = len(teams) - 1 if first is None else first
+        if (week + 1) % TIMELINE_STEP == 0:
+            rows = [row] if row is not None else candidates
+            timeline.append((week + 1, np.percentile(received, [10, 50, 90]),
+                             {i: (np.percentile(disclosed[i], [10, 50, 90]), np.percentile(statements[i], [10, 50, 90]))
+                              for i in rows}))
+        if week + 1 >= weeks_to_hearing and np.isfinite(completion).all() and np.isfinite(statements_done).all():
+            break
+    end = max(weeks_to_hearing, completion[row].max(), statements_done[row].max())
+    timeline = [(week, received, *by_team[row]) for week, received, by_team in timeline if week <= end]
+    return {"inputs": inputs, "completion": completion, "statements_done": statements_done,
+            "timeline_team": team_sizes[row], "timeline": timeline}
+
+def first_on_time(on_time):
+    """Index of the first team on time in at least TARGET_CONFIDENCE of scenarios, or None."""
+    return next((i for i, share in enumerate(on_time) if share >= TARGET_CONFIDENCE), None)
+
+def staffing(team_sizes, completion, statements_done, weeks_to_hearing):
+    """One summary dict per team size, and the smallest team meeting TARGET_CONFIDENCE (or None)."""
+    rows = []
+    for size, weeks, drafted in zip(team_sizes, completion, statements_done):
+        rows.append({
+            "team": size,
+            "on_time": float((weeks <= weeks_to_hearing).mean()),
+            # inf (not done within the horizon) sorts last, so take actual draws
+            "p50": float(np.percentile(weeks, 50, method="inverted_cdf")),
+            "p80": float(np.percentile(weeks, 80, method="inverted_cdf")),
+            "statements_on_time": float((drafted <= weeks_to_hearing).mean()),
+        })
+    first = first_on_time([r["on_time"] for r in rows])
+    return rows, None if first is None else rows[first]["team"]
+
+def run(weeks_to_hearing=52, team_sizes=TEAM_SIZES, scenarios=SCENARIOS, **options):
+    """Sweep the team sizes, with the timeline of the recommended size (the last if none) from the same scenarios."""
+    result = simulate(team_sizes, weeks_to_hearing, scenarios=scenarios, **options)
+    rows, recommended = staffing(team_sizes, result["completion"], result["statements_done"], weeks_to_hearing)
+    return {"inputs": result["inputs"], "staffing": rows, "recommended": recommended,
+            "timeline_team": result["timeline_team"], "timeline": result["timeline"],
+            "weeks_to_hearing": weeks_to_hearing, "scenarios": scenarios}
+
+def fmt_weeks(value):
+    return "never" if math.isinf(value) else f"{value:.0f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate evidence review staffing before the hearings.")
+    parser.add_argument("--documents", type=float, help="documents expected to be disclosed (default: calibrated)")
+    parser.add_argument("--statements", type=float, help="witness statements expected (default: calibrated)")
+    parser.add_argument("--hearing-days", type=float, help="expected hearing days, used to calibrate the volumes")
+    parser.add_argument("--weeks-to-hearing", type=int, default=52)
+    parser.add_argument("--intake-weeks", type=int, help="weeks over which documents arrive (default: half the time to the hearing)")
+    parser.add_argument("--drafters", type=int, default=DRAFTERS)
+    parser.add_argument("--teams", type=int, nargs="+", default=TEAM_SIZES, help="evidence team sizes to compare")
+    parser.add_argument("-n", "--scenarios", type=int, default=SCENARIOS)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    result = run(args.weeks_to_hearing, sorted(args.teams), args.scenarios, documents=args.documents,
+                 statements=args.statements, hearing_days=args.hearing_days, intake_weeks=args.intake_weeks,
+                 drafters=args.drafters)
+    took = time.perf_counter() - t0
+
+    docs = np.percentile(result["inputs"]["documents"], [10, 50, 90])
+    print(f"Documents disclosed P10/P50/P90: {docs[0]:,.0f} / {docs[1]:,.0f} / {docs[2]:,.0f}")
+    print(f"{'team':>5} {'on time':>8} {'P50 wks':>8} {'P80 wks':>8} {'statements on time':>19}")
+    for r in result["staffing"]:
+        print(f"{r['team']:5d} {r['on_time']:8.0%} {fmt_weeks(r['p50']):>8} {fmt_weeks(r['p80']):>8} {r['statements_on_time']:19.0%}")
+    if result["recommended"]:
+        print(f"Smallest team clearing review by week {args.weeks_to_hearing} in {TARGET_CONFIDENCE:.0%} of scenarios: {result['recommended']}")
+    else:
+        print(f"No team size tried clears review by week {args.weeks_to_hearing} in {TARGET_CONFIDENCE:.0%} of scenarios")
+    print(f"{args.scenarios:,} scenarios in {took:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+"""Cached results for the formulas in a saved toolkit.
+
+openpyxl writes each formula with an empty value, so anything that reads the
+file without recalculating it (ingest_toolkits.py, pandas, previewers) sees
+None until Excel has opened and saved it. fill_package() evaluates every
+formula in each sheet of the package and writes the result next to it.
+
+The evaluator covers the formulas the builders write: numbers, strings,
+same-sheet cell references and ranges, arithmetic, comparisons, ``&`` and
+IF / AND / OR / NOT / SUM, with Excel's rules for blanks, text comparison
+and errors. A formula outside that subset keeps its empty value, and the
+workbook then still asks Excel for a full recalculation on load; when every
+formula has a value that request is dropped.
+"""
+from xml.sax.saxutils import escape, unescape
+import io
+import re
+import zipfile
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+import sheet_cache
+
+CELL = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.S)
+ATTR = re.compile(r'\b([rt])="([^"]*)"')
+FORMULA = re.compile(r"<f>(.*?)</f>", re.S)
+VALUE = re.compile(r"<v>(.*?)</v>", re.S)
+TEXT = re.compile(r"<t(?: [^>]*)?>(.*?)</t>", re.S)
+FULL_CALC = re.compile(r'\s*fullCalcOnLoad="(?:1|true)"')
+SHEET_PART = re.compile(r"xl/worksheets/[^/]+\.xml$")
+
+ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+TOKEN = re.compile(r"""\s*(?:
+    (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<str>"(?:[^"]|"")*")
+  | (?P<ref>\$?[A-Z]{1,3}\$?[0-9]+)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+  | (?P<op><>|<=|>=|[-+*/&=<>(),:])
+)""", re.X)
+COMPARISONS = {"=", "<>", "<", ">", "<=", ">="}
+
+class Unsupported(Exception):
+    """The formula uses something outside the evaluator's subset."""
+
+class Error(str):
+    """An Excel error value such as #DIV/0!; flows through like any value."""
+
+DIV0 = Error("#DIV/0!")
+VALUE_ERROR = Error("#VALUE!")
+
+# ═══════════════════════════════════════════════════════════════
+# EVALUATOR
+# ═══════════════════════════════════════════════════════════════
+def split_ref(ref):
+    ref = ref.replace("$", "")
+    i = next(i for i, ch in enumerate(ref) if ch.isdigit())
+    return column_index_from_string(ref[:i]), int(ref[i:])
+
+class CellRange:
+    def __init__(self, sheet, first, last):
+        (c1, r1), (c2, r2) = split_ref(first), split_ref(last)
+        self.sheet = sheet
+        self.bounds = min(c1, c2), min(r1, r2), max(c1, c2), max(r1, r2)
+
+    def values(self):
+        c1, r1, c2, r2 = self.bounds
+        if (c2 - c1 + 1) * (r2 - r1 + 1) > len(self.sheet.cells):
+            # Whole-column style ranges: only visit cells that exist
+            refs = [ref for ref in self.sheet.cells if c1 <= split_ref(ref)[0] <= c2 and r1 <= split_ref(ref)[1] <= r2]
+        else:
+            refs = [f"{get_column_letter(c)}{r}" for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)]
+        return [self.sheet.value(ref) for ref in refs]
+
+def number(value):
+    if value is None:
+        return 0
+    if isinstance(value, Error):
+        return value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return VALUE_ERROR
+    return value
+
+def text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return format_number(value)
+    return str(value)
+
+def truth(value):
+    if isinstance(value, Error):
+        return value
+    if isinstance(value, str):
+        return {"TRUE": True, "FALSE": False}.get(value.upper(), VALUE_ERROR)
+    return bool(value)
+
+def type_rank(value):
+    # Excel orders numbers < text < logical values
+    return 2 if isinstance(value, bool) else 1 if isinstance(value, str) else 0
+
+def compare(op, a, b):
+    for v in (a, b):
+        if isinstance(v, Error):
+            return v
+    # A blank takes the type of what it is compared with
+    if a is None:
+        a = "" if isinstance(b, str) else False if isinstance(b, bool) else 0
+    if b is None:
+        b = "" if isinstance(a, str) else False if isinstance(a, bool) else 0
+    if type_rank(a) != type_rank(b):
+        a, b = type_rank(a), type_rank(b)
+    elif isinstance(a, str):
+        a, b = a.lower(), b.lower()
+    return {"=": a == b, "<>": a != b, "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b}[op]
+
+def arithmetic(op, a, b):
+    a, b = number(a), number(b)
+    for v in (a, b):
+        if isinstance(v, Error):
+            return v
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    return DIV0 if b == 0 else a / b
+
+def flatten(args):
+    for arg in args:
+        if isinstance(arg, CellRange):
+            # Text and blanks in ranges are skipped, as in Excel
+            yield from (v for v in arg.values() if isinstance(v, Error) or (v is not None and not isinstance(v, str)))
+        else:
+            yield arg
+
+def fn_if(cond, if_true=True, if_false=False):
+    cond = truth(cond)
+    if isinstance(cond, Error):
+        return cond
+    return if_true if cond else if_false
+
+def fn_and(*args):
+    result = True
+    for v in map(truth, flatten(args)):
+        if isinstance(v, Error):
+            return v
+        result = result and v
+    return result
+
+def fn_or(*args):
+    result = False
+    for v in map(truth, flatten(args)):
+        if isinstance(v, Error):
+            return v
+        result = result or v
+    return result
+
+def fn_not(value):
+    value = truth(value)
+    return value if isinstance(value, Error) else not value
+
+def fn_sum(*args):
+    total = 0
+    for v in map(number, flatten(args)):
+        if isinstance(v, Error):
+            return v
+        total += v
+    return total
+
+def fn_hyperlink(link, friendly_name=None):
+    # The cell shows the friendly name, or the link itself
+    value = link if friendly_name is None else friendly_name
+    return value if isinstance(value, Error) else text(value)
+
+functions = {"IF": fn_if, "AND": fn_and, "OR": fn_or, "NOT": fn_not, "SUM": fn_sum, "HYPERLINK": fn_hyperlink}
+
+class Parser:
+    """Recursive descent over one formula, evaluating as it goes."""
+
+    def __init__(self, formula, sheet):
+        self.sheet = sheet
+        self.tokens, pos = [], 0
+        formula = formula.rstrip()
+        while pos < len(formula):
+            m = TOKEN.match(formula, pos)
+            if not m:
+                raise Unsupported(formula)
+            self.tokens.append((m.lastgroup, m.group(m.lastgroup)))
+            pos = m.end()
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        if self.pos == len(self.tokens):
+            raise Unsupported("unexpected end of formula")
+        self.pos += 1
+        return self.tokens[self.pos - 1]
+
+    def expect(self, op):
+        if self.take()[1] != op:
+            raise Unsupported(f"expected {op!r}")
+
+    def parse(self):
+        value = self.comparison()
+        if self.pos != len(self.tokens):
+            raise Unsupported(f"unexpected {self.peek()!r}")
+        if isinstance(value, CellRange):
+            raise Unsupported("range outside a function")
+        return value
+
+    def comparison(self):
+        value = self.concat()
+        while self.peek() in COMPARISONS:
+            op = self.take()[1]
+            value = compare(op, value, self.concat())
+        return value
+
+    def concat(self):
+        value = self.additive()
+        while self.peek() == "&":
+            self.take()
+            right = self.additive()
+            value = next((v for v in (value, right) if isinstance(v, Error)), None) or text(value) + text(right)
+        return value
+
+    def additive(self):
+        value = self.term()
+        while self.peek() in ("+", "-"):
+            op = self.take()[1]
+            value = arithmetic(op, value, self.term())
+        return value
+
+    def term(self):
+        value = self.unary()
+        while self.peek() in ("*", "/"):
+            op = self.take()[1]
+            value = arithmetic(op, value, self.unary())
+        return value
+
+    def unary(self):
+        if self.peek() in ("-", "+"):
+            op = self.take()[1]
+            return arithmetic(op, 0, self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, token = self.take()
+        if kind == "num":
+            return float(token)
+        if kind == "str":
+            return token[1:-1].replace('""', '"')
+        if kind == "ref":
+            if self.peek() == ":":
+                self.take()
+                kind, last = self.take()
+                if kind != "ref":
+                    raise Unsupported("range end is not a cell")
+                return CellRange(self.sheet, token, last)
+            return self.sheet.value(token.replace("$", ""))
+        if kind == "name":
+            name = token.upper()
+            if self.peek() != "(":
+                if name in ("TRUE", "FALSE"):
+                    return name == "TRUE"
+                raise Unsupported(f"name {token!r}")
+            if name not in functions:
+                raise Unsupported(f"function {token!r}")
+            self.take()
+            args = []
+            if self.peek() != ")":
+                args.append(self.comparison())
+                while self.peek() == ",":
+                    self.take()
+                    args.append(self.comparison())
+            self.expect(")")
+            if any(isinstance(a, CellRange) for a in args) and name not in ("SUM", "AND", "OR"):
+                raise Unsupported(f"range passed to {name}")
+            return functions[name](*args)
+        if token == "(":
+            value = self.comparison()
+            self.expect(")")
+            return value
+        raise Unsupported(f"unexpected {token!r}")
+
+class Sheet:
+    """Cell values and formulas of one worksheet; formulas evaluate on demand."""
+
+    def __init__(self, cells, formulas):
+        self.cells = cells
+        self.formulas = formulas
+        self.results = {}
+        self._pending = set()
+
+    def value(self, ref):
+        if ref not in self.formulas:
+            return self.cells.get(ref)
+        if ref not in self.results:
+            if ref in self._pending:
+                raise Unsupported(f"circular reference at {ref}")
+            self._pending.add(ref)
+            try:
+                self.results[ref] = Parser(self.formulas[ref], self).parse()
+            finally:
+                self._pending.discard(ref)
+        return self.results[ref]
+
+def evaluate(formula, cells=None):
+    """Evaluate one formula (without its leading "=") against ``cells``, a dict of ref -> value."""
+    return Parser(formula, Sheet(cells or {}, {})).parse()
+
+# ═══════════════════════════════════════════════════════════════
+# PACKAGE
+# ═══════════════════════════════════════════════════════════════
+def format_number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+def cell_value(kind, inner, shared):
+    if kind == "inlineStr":
+        return "".join(unescape(t, ENTITIES) for t in TEXT.findall(inner))
+    m = VALUE.search(inner)
+    if m is None or m.group(1) == "":
+        return None
+    raw = unescape(m.group(1), ENTITIES)
+    if kind == "s":
+        return shared[int(raw)]
+    if kind == "b":
+        return raw == "1"
+    if kind == "e":
+        return Error(raw)
+    if kind == "str":
+        return raw
+    return float(raw)
+
+def fill_sheet(xml, shared):
+    """Return ``(xml with formula results, every formula evaluated?)``."""
+    cells, formulas = {}, {}
+    for m in CELL.finditer(xml):
+        attrs = dict(ATTR.findall(m.group(1)))
+        inner = m.group(2) or ""
+        f = FORMULA.search(inner)
+        if f is not None:
+            formulas[attrs["r"]] = unescape(f.group(1), ENTITIES)
+        else:
+            cells[attrs["r"]] = cell_value(attrs.get("t", "n"), inner, shared)
+    if not formulas:
+        return xml, True
+
+    sheet, complete = Sheet(cells, formulas), True
+
+    def fill(m):
+        nonlocal complete
+        inner = m.group(2) or ""
+        f = FORMULA.search(inner)
+        if f is None:
+            return m.group(0)
+        attrs = dict(ATTR.findall(m.group(1)))
+        try:
+            value = sheet.value(attrs["r"])
+        except Unsupported:
+            complete = False
+            return m.group(0)
+        if isinstance(value, Error):
+            kind, v = "e", value
+        elif isinstance(value, bool):
+            kind, v = "b", str(int(value))
+        elif isinstance(value, str):
+            kind, v = "str", escape(value)
+        elif value is None:
+            kind, v = "n", "0"
+        else:
+            kind, v = "n", format_number(value)
+        head = re.sub(r'\s+t="[^"]*"', "", m.group(1))
+        return f'<c{head} t="{kind}">{f.group(0)}<v>{v}</v></c>'
+
+    return CELL.sub(fill, xml), complete
+
+class SharedStrings:
+    """The package's shared strings, each decoded only when a formula sheet reads it."""
+
+    def __init__(self, zin):
+        try:
+            xml = zin.read("xl/sharedStrings.xml").decode("utf-8")
+        except KeyError:
+            xml = ""
+        self.items = xml.split("<si>")[1:]
+        count = re.search(r'<sst\b[^>]*?\bcount="(\d+)"', xml)
+        self.count = int(count.group(1)) if count else len(self.items)
+
+    def __getitem__(self, idx):
+        return "".join(unescape(t, ENTITIES) for t in TEXT.findall(self.items[idx]))
+
+def fill_package(data):
+    """Return the xlsx ``data`` with a cached value for every formula it can evaluate."""
+    with zipfile.ZipFile(io.BytesIO(data)) as zin:
+        parts, complete = {}, True
+        shared = None
+        for name in zin.namelist():
+            if not SHEET_PART.match(name):
+                continue
+            xml = zin.read(name).decode("utf-8")
+            if "<f>" not in xml:
+                continue
+            if shared is None:
+                shared = SharedStrings(zin)
+            filled, ok = fill_sheet(xml, shared)
+            parts[name] = filled.encode("utf-8")
+            complete = complete and ok
+        if complete:
+            # Every formula now carries its result, so Excel need not recalculate on open
+            workbook = zin.read("xl/workbook.xml").decode("utf-8")
+            if FULL_CALC.search(workbook):
+                parts["xl/workbook.xml"] = FULL_CALC.sub("", workbook).encode("utf-8")
+        if not parts:
+            return data
+        return sheet_cache.rezip(zin, parts)
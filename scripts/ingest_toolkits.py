@@ -0,0 +1,202 @@
+"""Read filled-in toolkits back into a SQLite database.
+
+    python scripts/ingest_toolkits.py returned/*.xlsx -d toolkits.sqlite
+    python scripts/ingest_toolkits.py returned/ -d toolkits.sqlite --jobs 8
+
+Workbooks are streamed with openpyxl's read-only mode in a process pool. Each
+tab is located by its header row (the layout build_workbook.py writes: title,
+subtitle, blank row, headers) and read down to the first blank or TOTAL row.
+Rows are loaded with one executemany per table for each batch of workbooks;
+re-ingesting a file replaces its earlier rows.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from openpyxl import load_workbook
+
+import build_workbook as bw
+
+# How far down to look for a tab's header row (add_title puts it on row 3 or 4)
+HEADER_SEARCH_ROWS = 10
+BATCH_SIZE = 100
+
+# ── Tab layouts ──
+# table -> (sheet names, headers); every table also gets toolkit_id and tab
+tables = {
+    "phase_items": (list(bw.phase_data), bw.phase_headers),
+    "decisions": (["Decision Log"], bw.decision_headers),
+    "risks": (["Risk Register"], bw.risk_headers),
+    "budget": (["Budget Tracker"], bw.budget_headers),
+    "core_participants": (["CP Register"], bw.cp_headers),
+    "stakeholders": (["Stakeholder Map"], bw.stakeholder_headers),
+}
+
+def column_name(header):
+    if header == "#":
+        return "num"
+    return re.sub(r"[^a-z0-9]+", "_", header.lower().replace("%", " pct")).strip("_")
+
+def columns(table):
+    return [column_name(h) for h in tables[table][1]]
+
+def schema():
+    yield """CREATE TABLE IF NOT EXISTS toolkits (
+        id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, ingested TEXT NOT NULL,
+        inquiry_name TEXT, type TEXT, chair TEXT, date_established TEXT, target_report_date TEXT)"""
+    for table in tables:
+        cols = ", ".join(columns(table))
+        yield f"""CREATE TABLE IF NOT EXISTS {table} (
+            toolkit_id INTEGER NOT NULL REFERENCES toolkits(id) ON DELETE CASCADE, tab TEXT NOT NULL, {cols})"""
+        yield f"CREATE INDEX IF NOT EXISTS {table}_toolkit ON {table}(toolkit_id)"
+
+# ── Parsing (runs in the worker processes) ──
+def to_sql(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip() or None
+    return value
+
+def read_tab(ws, headers):
+    """Yield the data rows under ``headers``, as tuples of SQL values."""
+    rows = ws.iter_rows(max_col=len(headers), values_only=True)
+    for i, row in enumerate(rows):
+        if list(row[:len(headers)]) == headers:
+            break
+        if i == HEADER_SEARCH_ROWS:
+            raise ValueError(f"{ws.title!r}: header row not found")
+    else:
+        raise ValueError(f"{ws.title!r}: header row not found")
+
+    has_number = headers[0] == "#"
+    for row in rows:
+        row = tuple(to_sql(v) for v in row) + (None,) * (len(headers) - len(row))
+        if all(v is None for v in row) or row[0] == "TOTAL":
+            break
+        # Blank numbered register rows carry only the "#"
+        if has_number and all(v is None for v in row[1:]):
+            continue
+        yield row
+
+def read_overview(ws):
+    info = {}
+    for label, value in ws.iter_rows(min_row=4, max_row=4 + len(bw.info), max_col=2, values_only=True):
+        if isinstance(label, str) and label.endswith(":"):
+            info[label.rstrip(":")] = to_sql(value)
+    return info
+
+def fill_ratings(rows):
+    # Toolkits built before formulas got cached values, and never opened in
+    # Excel since, have no rating
+    rating = 1 + bw.risk_headers.index("Risk Rating")  # after the tab column
+    likelihood, impact = 1 + bw.risk_headers.index("Likelihood"), 1 + bw.risk_headers.index("Impact")
+    for row in rows:
+        if row[rating] is None:
+            row = row[:rating] + (bw.risk_rating(row[likelihood], row[impact]),) + row[rating + 1:]
+        yield row
+
+def read_toolkit(path):
+    """Parse one workbook; returns ``(path, info, rows by table, error)``."""
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        return path, None, None, f"{type(e).__name__}: {e}"
+    try:
+        info = read_overview(wb["Overview"]) if "Overview" in wb.sheetnames else {}
+        parsed = {}
+        for table, (sheets, headers) in tables.items():
+            rows = parsed[table] = []
+            for name in sheets:
+                if name in wb.sheetnames:
+                    rows.extend((name, *row) for row in read_tab(wb[name], headers))
+        parsed["risks"] = list(fill_ratings(parsed["risks"]))
+        return path, info, parsed, None
+    except Exception as e:
+        return path, None, None, f"{type(e).__name__}: {e}"
+    finally:
+        wb.close()
+
+# ── Loading ──
+def load_batch(conn, results):
+    """Insert parsed workbooks with one executemany per table."""
+    now = datetime.now().isoformat(timespec="seconds")
+    batch = {table: [] for table in tables}
+    with conn:
+        for path, info, parsed, _ in results:
+            conn.execute("DELETE FROM toolkits WHERE path = ?", (path,))
+            toolkit_id = conn.execute(
+                "INSERT INTO toolkits (path, ingested, inquiry_name, type, chair, date_established, target_report_date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, now, info.get("Inquiry Name"), info.get("Type"), info.get("Chair"),
+                 info.get("Date Established"), info.get("Target Report Date"))).lastrowid
+            for table, rows in parsed.items():
+                batch[table].extend((toolkit_id, *row) for row in rows)
+        for table, rows in batch.items():
+            marks = ", ".join("?" * (len(columns(table)) + 2))
+            conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    for statement in schema():
+        conn.execute(statement)
+    return conn
+
+def find_workbooks(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(".xlsx") and not name.startswith("~$"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def ingest(paths, db_path, jobs=None, batch_size=BATCH_SIZE):
+    """Parse ``paths`` in parallel into ``db_path``; yields ``(path, error)`` per file."""
+    files = [os.path.abspath(p) for p in find_workbooks(paths)]
+    conn = connect(db_path)
+    try:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            pending = []
+            for result in pool.map(read_toolkit, files, chunksize=4):
+                path, _, _, error = result
+                if error is None:
+                    pending.append(result)
+                    if len(pending) == batch_size:
+                        load_batch(conn, pending)
+                        pending = []
+                yield path, error
+            if pending:
+                load_batch(conn, pending)
+    finally:
+        conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load filled-in toolkits into SQLite.")
+    parser.add_argument("paths", nargs="+", help="xlsx files or directories to search")
+    parser.add_argument("-d", "--database", required=True, help="SQLite file to create or update")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    done, failed = 0, []
+    for path, error in ingest(args.paths, args.database, args.jobs):
+        if error:
+            print(f"  FAILED {path}: {error}")
+            failed.append(path)
+        done += 1
+    print(f"Loaded {done - len(failed)} of {done} workbooks into {args.database} in {time.perf_counter() - t0:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
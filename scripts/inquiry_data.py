@@ -0,0 +1,322 @@
+"""Typed, column-oriented view of data/uk_public_inquiries.csv and the
+statistics derived from it.
+
+    python scripts/inquiry_data.py            # refresh src/data/benchmarks.index.json
+    python scripts/inquiry_data.py --force    # rebuild even if the CSV is unchanged
+
+The CSV is parsed once per file version into NumPy columns (floats with NaN
+for missing numbers, datetime64[D] with NaT for missing dates, object arrays
+for text); a row whose values don't line up with the header fails the
+load, and a hearing-day count longer than the inquiry has run is dropped
+with a warning. Durations, scale classes, unit costs and per-subject-area
+percentiles are then computed over whole columns at once. The names and
+subjects the charts show come from the curated display_name and
+short_subject columns; inquiries without a short_subject are left out of the
+front-end index, with a warning, until one is curated for them.
+"""
+from datetime import date
+from functools import lru_cache
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_CSV = os.path.join(ROOT, "data", "uk_public_inquiries.csv")
+INDEX_JSON = os.path.join(ROOT, "src", "data", "benchmarks.index.json")
+
+NUMERIC_COLUMNS = [
+    "cost_millions", "total_recommendations_published", "core_participants_count", "witnesses_count",
+    "hearing_days", "documents_disclosed", "witness_statements_count", "final_report_pages",
+]
+DATE_COLUMNS = ["date_announced", "date_established", "date_closed", "final_report_date"]
+
+# Same thresholds (in £m) and month length as src/data/benchmarks.js
+SCALE_BOUNDS = [(10, "small"), (30, "medium"), (150, "large")]
+DAYS_PER_MONTH = 30.44
+PERCENTILES = [10, 25, 50, 75, 90]
+PERCENTILE_METRICS = ["cost_millions", "duration_months", "cost_per_hearing_day", "cost_per_witness"]
+
+class InquiryTable:
+    """Columns of the inquiries CSV keyed by header name, plus the file hash."""
+
+    def __init__(self, columns, sha256):
+        self.columns = columns
+        self.sha256 = sha256
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+def parse_number(text):
+    # Counts are sometimes recorded as lower bounds ("200+"); anything that is
+    # still not a number is missing (the CSV itself is checked by check_record).
+    text = text.strip().rstrip("+").replace(",", "")
+    try:
+        return float(text) if text else np.nan
+    except ValueError:
+        return np.nan
+
+def parse_date(text):
+    try:
+        return np.datetime64(text.strip(), "D") if text.strip() else np.datetime64("NaT")
+    except ValueError:
+        return np.datetime64("NaT")
+
+def data_date(table):
+    """The latest date the CSV records (None if it has none).
+
+    Builds measure ongoing inquiries to this by default rather than to
+    today, so the same CSV always gives the same figures.
+    """
+    dates = np.concatenate([table[name] for name in DATE_COLUMNS])
+    dates = dates[~np.isnat(dates)]
+    return dates.max().astype(date) if len(dates) else None
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_inquiries(path=DATA_CSV):
+    """Return the CSV as an InquiryTable, parsing each file version only once."""
+    st = os.stat(path)
+    return _load_inquiries(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+def check_record(header, row, line):
+    """Raise ValueError for a row whose values can't be in the right columns.
+
+    A missing or extra field shifts every later value into its neighbour's
+    column, where it would otherwise be read as a missing number or a bogus
+    description, so the whole load fails instead.
+    """
+    name = row[0] if row else ""
+    if len(row) != len(header):
+        raise ValueError(f"line {line} ({name}): {len(row)} fields, the header has {len(header)}")
+    for column, value in zip(header, row):
+        value = value.strip()
+        if not value:
+            continue
+        if column.endswith("_url") and not value.startswith(("http://", "https://")):
+            raise ValueError(f"line {line} ({name}): {column} is not a URL: {value[:40]!r}")
+        if column in NUMERIC_COLUMNS and np.isnan(parse_number(value)):
+            raise ValueError(f"line {line} ({name}): {column} is not a number: {value[:40]!r}")
+
+@lru_cache(maxsize=8)
+def _load_inquiries(path, mtime_ns, size):
+    with open(path, "rb") as f:
+        raw = f.read()
+    reader = csv.reader(io.StringIO(raw.decode("utf-8-sig")))
+    header = next(reader)
+    records = [row for row in reader if row]
+    for line, row in enumerate(records, start=2):
+        check_record(header, row, line)
+    by_column = list(zip(*records)) if records else [()] * len(header)
+
+    columns = {}
+    for name, values in zip(header, by_column):
+        if name in NUMERIC_COLUMNS:
+            columns[name] = np.array([parse_number(v) for v in values], dtype=float)
+        elif name in DATE_COLUMNS:
+            columns[name] = np.array([parse_date(v) for v in values], dtype="datetime64[D]")
+        else:
+            columns[name] = np.array([v.strip() for v in values], dtype=object)
+    table = InquiryTable(columns, hashlib.sha256(raw).hexdigest())
+    drop_implausible_hearing_days(table)
+    return table
+
+def drop_implausible_hearing_days(table):
+    """Blank hearing_days that exceed the days from establishment to close (or the CSV's latest date)."""
+    latest = data_date(table)
+    if latest is None:
+        return
+    end = np.where(np.isnat(table["date_closed"]), table["final_report_date"], table["date_closed"])
+    end = np.where(np.isnat(end), np.datetime64(latest, "D"), end)
+    span = (end - table["date_established"]).astype(float)  # NaN without a start date
+    days = table["hearing_days"]
+    bad = days > span
+    for name, count, limit in zip(table["name"][bad], days[bad], span[bad]):
+        warnings.warn(f"{name}: hearing_days {count:.0f} is more than the {limit:.0f} days it has run; ignored")
+    days[bad] = np.nan
+
+# ═══════════════════════════════════════════════════════════════
+# DERIVED COLUMNS
+# ═══════════════════════════════════════════════════════════════
+def duration_months(table, as_of=None):
+    # Open inquiries run to ``as_of`` (default today), as computeDuration does
+    as_of = np.datetime64(as_of or date.today(), "D")
+    start = table["date_established"]
+    end = np.where(np.isnat(table["date_closed"]), as_of, table["date_closed"])
+    days = (end - start).astype(float)
+    days[np.isnat(start) | (days < 0)] = np.nan
+    return np.round(days / DAYS_PER_MONTH)
+
+def scale_class(cost_millions):
+    labels = np.array([label for _, label in SCALE_BOUNDS] + ["very large"], dtype=object)
+    out = labels[np.searchsorted([b for b, _ in SCALE_BOUNDS], cost_millions, side="right")]
+    out[np.isnan(cost_millions)] = None
+    return out
+
+def per_unit(cost_millions, units):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = cost_millions * 1_000_000 / units
+    out[~(units > 0)] = np.nan
+    return out
+
+def type_label(inquiry_type, statutory_basis):
+    if inquiry_type == "non_statutory":
+        return "Non-statutory"
+    if "Scotland" in statutory_basis:
+        return "Statutory (Scotland)"
+    if "Northern Ireland" in statutory_basis or "(NI)" in statutory_basis:
+        return "Statutory (NI)"
+    return "Statutory"
+
+def percentile_summary(values):
+    present = values[~np.isnan(values)]
+    if not len(present):
+        return {"n": 0}
+    points = np.percentile(present, PERCENTILES)
+    return {"n": int(len(present)), **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, points)}}
+
+def compute_statistics(table, as_of=None):
+    """Derive every benchmark column and the per-subject-area percentiles."""
+    cost = table["cost_millions"]
+    derived = {
+        "duration_months": duration_months(table, as_of),
+        "scale": scale_class(cost),
+        "cost_per_hearing_day": per_unit(cost, table["hearing_days"]),
+        "cost_per_witness": per_unit(cost, table["witnesses_count"]),
+    }
+    metrics = {name: cost if name == "cost_millions" else derived[name] for name in PERCENTILE_METRICS}
+
+    areas, area_idx = np.unique(table["subject_area"].astype(str), return_inverse=True)
+    percentiles = {"all": {name: percentile_summary(values) for name, values in metrics.items()}}
+    for i, area in enumerate(areas):
+        mask = area_idx == i
+        percentiles[area] = {name: percentile_summary(values[mask]) for name, values in metrics.items()}
+
+    # Cheapest first, unknown cost last (stable, like the old JS sort)
+    order = np.argsort(np.where(np.isnan(cost), np.inf, cost), kind="stable")
+    return {"derived": derived, "percentiles": percentiles, "order": order}
+
+# ═══════════════════════════════════════════════════════════════
+# FRONT-END INDEX
+# ═══════════════════════════════════════════════════════════════
+def _num(value, ndigits=None):
+    if value is None or np.isnan(value):
+        return None
+    value = round(float(value), ndigits) if ndigits is not None else float(value)
+    return int(value) if value.is_integer() else value
+
+def _date(value):
+    return None if np.isnat(value) else str(value)
+
+def format_duration(months):
+    if months is None:
+        return None
+    if months < 12:
+        return f"{months} months"
+    years = round(months / 12, 1)
+    years = int(years) if years.is_integer() else years
+    return f"{years} year{'' if years == 1 else 's'}"
+
+def format_years(established, closed):
+    if not established:
+        return ""
+    if not closed:
+        return f"{established[:4]}–ongoing"
+    return established[:4] if established[:4] == closed[:4] else f"{established[:4]}–{closed[:4]}"
+
+def benchmark_records(table, stats):
+    """Rows in the shape src/data/benchmarks.js exposes as BENCHMARKS."""
+    d = stats["derived"]
+    records = []
+    for i in stats["order"]:
+        established, closed = _date(table["date_established"][i]), _date(table["date_closed"][i])
+        months = _num(d["duration_months"][i])
+        records.append({
+            # Curated labels for the charts and reports; display_name only where short_name won't do
+            "name": table["display_name"][i] or table["short_name"][i] or table["name"][i],
+            "fullName": table["name"][i],
+            "established": established,
+            "closed": closed,
+            "cost": _num(table["cost_millions"][i]),
+            "type": type_label(table["inquiry_type"][i], table["statutory_basis"][i]),
+            "subject": table["short_subject"][i],
+            "subjectArea": table["subject_area"][i],
+            "hearingDays": _num(table["hearing_days"][i]),
+            "witnesses": _num(table["witnesses_count"][i]),
+            # The UI shows documents in thousands
+            "docs": _num(table["documents_disclosed"][i] / 1000, 1),
+            "cps": _num(table["core_participants_count"][i]),
+            "pages": _num(table["final_report_pages"][i]),
+            "status": table["status"][i],
+            "year": format_years(established, closed),
+            "durationMonths": months,
+            "duration": format_duration(months),
+            "scale": d["scale"][i],
+            "costPerHearingDay": _num(d["cost_per_hearing_day"][i], 0),
+            "costPerWitness": _num(d["cost_per_witness"][i], 0),
+        })
+    return records
+
+def read_index(index_path=INDEX_JSON):
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def build_index(csv_path=DATA_CSV, index_path=INDEX_JSON, force=False):
+    """Write the front-end index unless it already matches the CSV's hash.
+
+    Returns True if the index was (re)written.
+    """
+    sha = file_sha256(csv_path)
+    existing = read_index(index_path)
+    if not force and existing and existing.get("sha256") == sha:
+        return False
+
+    table = load_inquiries(csv_path)
+    # The charts and reports label inquiries by these; they aren't derived
+    uncurated = [name for name, subject in zip(table["name"], table["short_subject"]) if not subject]
+    if uncurated:
+        warnings.warn(f"{len(uncurated)} inquiries have no short_subject and are left out of the index: "
+                      + "; ".join(uncurated))
+    as_of = data_date(table) or date.today()
+    stats = compute_statistics(table, as_of)
+    index = {
+        "source": os.path.relpath(csv_path, ROOT).replace(os.sep, "/"),
+        "sha256": table.sha256,
+        "asOf": as_of.isoformat(),
+        "inquiries": [record for record in benchmark_records(table, stats) if record["subject"]],
+        "percentiles": stats["percentiles"],
+    }
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, index_path)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the benchmark index from the inquiries CSV.")
+    parser.add_argument("--csv", default=DATA_CSV)
+    parser.add_argument("--index", default=INDEX_JSON)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the CSV hash is unchanged")
+    args = parser.parse_args(argv)
+
+    if build_index(args.csv, args.index, force=args.force):
+        print(f"Wrote {args.index}")
+    else:
+        print(f"{args.index} is up to date")
+
+if __name__ == "__main__":
+    main()
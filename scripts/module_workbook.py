@@ -0,0 +1,180 @@
+"""Toolkits for inquiries that run in modules, with the guidance held once.
+
+    python scripts/module_workbook.py -c covid.json -o "COVID-19 Toolkit.xlsx"
+    python scripts/module_workbook.py -o toolkit.xlsx --module M1 "Resilience and preparedness" --module M2 "Decision-making"
+    python scripts/module_workbook.py --update toolkit.xlsx --module M3 "Impact on healthcare systems"
+
+A modular toolkit is the usual workbook plus, for each module ("modules" in
+the build config), its own evidence and hearings checklists, decision log
+and risk register (build_workbook.module_tabs). It is written with the XML
+backend, so the whole file has one shared-strings table and one style
+table: the checklist's action names, the risks and the headers are stored
+once however many modules repeat them, and the module checklists link to
+the guidance on the shared phase tabs rather than copying it.
+
+``--update`` adds modules to an existing toolkit, or rebuilds the tabs of
+modules it already has, without rebuilding anything else. The module's
+sheets are rendered against the file's own string and style tables (new
+entries are appended, so existing sheets keep pointing at the right ones);
+then only those sheet parts, the two tables and the workbook's sheet list
+are rewritten and every other part is copied across still compressed. New
+modules go after the existing tabs, before the hidden Lists tab, which is
+where a full build puts them. Toolkits from build_workbook.py's default
+openpyxl backend keep their strings inline and have no string table; the
+update adds one for the module sheets, and the other sheets are unchanged.
+"""
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+import argparse
+import io
+import re
+import sys
+import time
+import zipfile
+
+from openpyxl.utils import absolute_coordinate, quote_sheetname
+
+import build_workbook as bw
+import formula_values
+import sheet_cache
+import xml_backend
+
+NS = {"m": xml_backend.MAIN_NS, "r": xml_backend.REL_NS, "p": xml_backend.PKG_REL_NS}
+FILTER_NAME = "_xlnm._FilterDatabase"
+
+def build(config, output=None):
+    """Build a modular toolkit (``config["modules"]``) with the XML backend."""
+    return bw.build_workbook({**config, "backend": "xml"}, output)
+
+# ═══════════════════════════════════════════════════════════════
+# UPDATE — add or rebuild modules inside an existing package
+# ═══════════════════════════════════════════════════════════════
+def read_book(zin):
+    """``(sheets, names)`` from workbook.xml: sheets as dicts in tab order, defined names as dicts."""
+    root = ElementTree.fromstring(zin.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(zin.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iterfind("p:Relationship", NS)}
+    sheets = []
+    for el in root.iterfind("m:sheets/m:sheet", NS):
+        target = targets[el.get(f"{{{xml_backend.REL_NS}}}id")]
+        sheets.append({"name": el.get("name"), "sheet_id": int(el.get("sheetId")), "state": el.get("state", "visible"),
+                       "rid": el.get(f"{{{xml_backend.REL_NS}}}id"),
+                       "part": target.lstrip("/") if target.startswith("/") else f"xl/{target}"})
+    names = []
+    for el in root.iterfind("m:definedNames/m:definedName", NS):
+        local = el.get("localSheetId")
+        names.append({"name": el.get("name"), "hidden": el.get("hidden"), "text": el.text or "",
+                      "sheet": None if local is None else sheets[int(local)]["name"]})
+    return sheets, names
+
+def book_xml(book, sheets, names, complete):
+    sheet_xml = "".join(f'<sheet name={quoteattr(s["name"])} sheetId="{s["sheet_id"]}" state="{s["state"]}" r:id="{s["rid"]}"/>'
+                        for s in sheets)
+    position = {s["name"]: i for i, s in enumerate(sheets)}
+    name_xml = []
+    for n in names:
+        local = "" if n["sheet"] is None else f' localSheetId="{position[n["sheet"]]}"'
+        hidden = f' hidden="{n["hidden"]}"' if n["hidden"] else ""
+        name_xml.append(f'<definedName name={quoteattr(n["name"])}{local}{hidden}>{escape(n["text"])}</definedName>')
+    book = re.sub(r"<sheets>.*?</sheets>", lambda m: f"<sheets>{sheet_xml}</sheets>", book, flags=re.S)
+    book = re.sub(r"<definedNames>.*?</definedNames>|<definedNames/>", "", book, flags=re.S)
+    if name_xml:
+        book = book.replace("</sheets>", f"</sheets><definedNames>{''.join(name_xml)}</definedNames>", 1)
+    if not complete and "fullCalcOnLoad" not in book:
+        # A formula the evaluator can't handle: have Excel recalculate on open
+        book = re.sub(r"<calcPr\b", '<calcPr fullCalcOnLoad="1"', book, count=1)
+    return book
+
+def update_modules(data, modules, config=None):
+    """Return the toolkit ``data`` (xlsx bytes) with ``modules``' tabs added or rebuilt.
+
+    ``config`` is the build config the toolkit was made with (register
+    rows, ...); its own "modules" are ignored.
+    """
+    config = bw.resolve_config({**(config or {}), "backend": "xml", "modules": modules})
+    with zipfile.ZipFile(io.BytesIO(data)) as zin:
+        members = set(zin.namelist())
+        # openpyxl writes its strings inline, so its toolkits have no table to extend yet
+        new_strings = "xl/sharedStrings.xml" not in members
+        sheets, names = read_book(zin)
+        by_name = {s["name"]: s for s in sheets}
+        next_sheet_id = max(s["sheet_id"] for s in sheets) + 1
+        rels_xml = zin.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+        next_rid = max(int(n) for n in re.findall(r'Id="rId(\d+)"', rels_xml)) + 1
+        next_part = max(int(n) for n in re.findall(r"xl/worksheets/sheet(\d+)\.xml", " ".join(members))) + 1
+        insert_at = next((i for i, s in enumerate(sheets) if s["name"] == bw.LISTS_TAB), len(sheets))
+
+        wb = xml_backend.XmlWorkbook.extending(zin)
+        rendered, added = [], []
+        for module in modules:
+            for tab_name, build_tab, _ in bw.module_tabs(module, config):
+                rendered.append(build_tab(wb))
+                if tab_name not in by_name:
+                    sheet = {"name": tab_name, "sheet_id": next_sheet_id, "state": "visible", "rid": f"rId{next_rid}",
+                             "part": f"xl/worksheets/sheet{next_part}.xml"}
+                    next_sheet_id, next_rid, next_part = next_sheet_id + 1, next_rid + 1, next_part + 1
+                    sheets.insert(insert_at, sheet)
+                    insert_at += 1
+                    by_name[tab_name] = sheet
+                    added.append(sheet)
+        xml_parts = wb.sheet_parts()
+        strings = list(wb._strings)
+
+        parts, complete = {}, True
+        for ws in rendered:
+            xml, ok = formula_values.fill_sheet(xml_parts[ws.title].decode("utf-8"), strings)
+            parts[by_name[ws.title]["part"]] = xml.encode("utf-8")
+            complete = complete and ok
+        # The filters of rebuilt sheets are redefined from the new sheets
+        titles = {ws.title for ws in rendered}
+        names = [n for n in names if not (n["name"] == FILTER_NAME and n["sheet"] in titles)]
+        names += [{"name": FILTER_NAME, "hidden": "1", "sheet": ws.title,
+                   "text": f"{quote_sheetname(ws.title)}!{absolute_coordinate(ws.auto_filter.ref)}"}
+                  for ws in rendered if ws.auto_filter.ref]
+
+        parts["xl/workbook.xml"] = book_xml(zin.read("xl/workbook.xml").decode("utf-8"), sheets, names, complete).encode("utf-8")
+        parts["xl/sharedStrings.xml"] = wb.shared_strings_xml().encode("utf-8")
+        parts["xl/styles.xml"] = wb.stylesheet_xml()
+        if added or new_strings:
+            rels = "".join(f'<Relationship Id="{s["rid"]}" Type="{xml_backend.REL_NS}/worksheet" Target="/{s["part"]}"/>'
+                           for s in added)
+            types = "".join(f'<Override PartName="/{s["part"]}" ContentType="{xml_backend.SHEET_CT}"/>' for s in added)
+            if new_strings:
+                rels += (f'<Relationship Id="rId{next_rid}" Type="{xml_backend.REL_NS}/sharedStrings" '
+                         f'Target="/xl/sharedStrings.xml"/>')
+                types += f'<Override PartName="/xl/sharedStrings.xml" ContentType="{xml_backend.STRINGS_CT}"/>'
+            parts["xl/_rels/workbook.xml.rels"] = rels_xml.replace("</Relationships>", rels + "</Relationships>").encode("utf-8")
+            content_types = zin.read("[Content_Types].xml").decode("utf-8")
+            parts["[Content_Types].xml"] = content_types.replace("</Types>", types + "</Types>").encode("utf-8")
+        return sheet_cache.rezip(zin, parts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a modular toolkit, or add / rebuild modules in one.")
+    parser.add_argument("-c", "--config", help="JSON build config (see build_workbook.py); its \"modules\" are built with -o")
+    parser.add_argument("-o", "--output", help="build a new modular toolkit here")
+    parser.add_argument("--update", metavar="XLSX", help="add or rebuild the --module tabs in this toolkit (from either backend), in place")
+    parser.add_argument("--module", nargs=2, metavar=("ID", "TITLE"), action="append", default=[],
+                        help="a module, e.g. --module M2 \"Core decision-making\" (repeatable)")
+    args = parser.parse_args(argv)
+    if bool(args.output) == bool(args.update):
+        parser.error("give either --output or --update")
+
+    config = bw.load_config(args.config) if args.config else {}
+    modules = [{"id": module_id, "title": title} for module_id, title in args.module]
+    t0 = time.perf_counter()
+    if args.output:
+        config["modules"] = (config.get("modules") or []) + modules
+        build(config, args.output)
+        print(f"Saved {len(config['modules'])} module(s) to {args.output} in {time.perf_counter() - t0:.1f}s")
+    else:
+        if not modules:
+            parser.error("--update needs at least one --module")
+        with open(args.update, "rb") as f:
+            data = update_modules(f.read(), modules, config)
+        with open(args.update, "wb") as f:
+            f.write(data)
+        print(f"Updated {', '.join(m['id'] for m in modules)} in {args.update} in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Content-addressed archive of generated toolkits.
+
+    python scripts/package_store.py archive/ acme-2026 toolkits/*.xlsx
+    python scripts/package_store.py archive/ acme-2026
+    python scripts/package_store.py archive/ acme-2026 --get covid-19-inquiry.xlsx -o restored.xlsx
+
+Toolkits are built reproducibly (reproducible() below, called by
+build_workbook.save_workbook): zip members in a fixed order with a fixed
+time and the document's created / modified dates pinned, so the same
+guidance and config always give the same bytes and the file's SHA-256 says
+whether a regenerated toolkit actually changed.
+
+The store keeps each distinct workbook once, as a recipe of its zip
+members, and each distinct member payload once, still compressed, all
+appended to ``objects.pack`` and indexed in ``objects.idx``. Toolkits
+differ in a few sheets, so a new version of one, or another engagement's
+copy of the shared guidance tabs, adds only the parts that differ. An
+engagement's manifest (``engagements/<name>.json``) lists every file name
+with the hashes it has had. Storing a toolkit that is already there is a
+hash and an index lookup, and writes nothing at all if the engagement's
+manifest already has it.
+"""
+from datetime import datetime, timezone
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import zipfile
+
+import sheet_cache
+
+# SOURCE_DATE_EPOCH is the reproducible-builds convention for overriding it
+PACKAGE_TIME = datetime.fromtimestamp(int(os.environ.get("SOURCE_DATE_EPOCH", 315532800)), timezone.utc)
+CORE_DATES = re.compile(r"(<dcterms:(created|modified)\b[^>]*>)[^<]*(</dcterms:\2>)")
+ENGAGEMENT = re.compile(r"[\w][\w.-]*")
+# Zip header fields a recipe records to write a member back byte for byte
+MEMBER_FIELDS = ("CRC", "file_size", "compress_size", "compress_type", "flag_bits", "date_time",
+                 "create_system", "create_version", "extract_version", "external_attr")
+
+def reproducible(data):
+    """Return the xlsx ``data`` with its members in order, at a fixed time, and its dates pinned."""
+    stamp = PACKAGE_TIME.strftime("%Y-%m-%dT%H:%M:%SZ")
+    with zipfile.ZipFile(io.BytesIO(data)) as zin:
+        parts = {}
+        if "docProps/core.xml" in zin.namelist():
+            core = zin.read("docProps/core.xml").decode("utf-8")
+            parts["docProps/core.xml"] = CORE_DATES.sub(lambda m: m.group(1) + stamp + m.group(3), core).encode("utf-8")
+        return sheet_cache.rezip(zin, parts)
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+# ═══════════════════════════════════════════════════════════════
+# STORE
+# ═══════════════════════════════════════════════════════════════
+class PackageStore:
+    """Workbooks stored once per hash under ``directory``, sharing identical zip members.
+
+    Payloads are appended to one pack file and found through an index of
+    ``kind digest offset length`` lines, so thousands of parts of a few KiB
+    cost their bytes rather than a filesystem block each. One process
+    writes to a store at a time.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.pack_path = os.path.join(directory, "objects.pack")
+        self.index_path = os.path.join(directory, "objects.idx")
+        self.index = {}
+        try:
+            with open(self.index_path, encoding="ascii") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) == 4:  # a line cut short by a crash is ignored
+                        kind, digest, offset, length = fields
+                        self.index[kind, digest] = (int(offset), int(length))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, digest):
+        return ("package", digest) in self.index
+
+    def append(self, blobs):
+        """Add ``blobs`` (``(kind, digest, bytes)``) that aren't stored yet; returns the bytes written."""
+        new = [(kind, digest, data) for kind, digest, data in blobs if (kind, digest) not in self.index]
+        if not new:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+        lines = []
+        with open(self.pack_path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            for kind, digest, data in new:
+                f.write(data)
+                lines.append(f"{kind} {digest} {offset} {len(data)}\n")
+                self.index[kind, digest] = (offset, len(data))
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # Indexed only once the payloads are on disk
+        with open(self.index_path, "a", encoding="ascii") as f:
+            f.write("".join(lines))
+        return sum(len(data) for _, _, data in new)
+
+    def put(self, data):
+        """Store the xlsx ``data``; returns ``(sha256, bytes written)``."""
+        digest = sha256(data)
+        if digest in self:
+            return digest, 0
+        payloads, members = {}, []
+        with zipfile.ZipFile(io.BytesIO(data)) as zin:
+            for info in zin.infolist():
+                payload = sheet_cache.read_compressed(zin, info)
+                blob = sha256(payload)
+                payloads[blob] = payload
+                members.append({"name": info.filename, "blob": blob, **{f: getattr(info, f) for f in MEMBER_FIELDS}})
+        recipe = {"size": len(data), "members": members}
+        if assemble(recipe, payloads) != data:
+            # Not a plain zipfile package (comments, extra fields, ...): keep it whole
+            payloads = {digest: data}
+            recipe = {"size": len(data), "blob": digest}
+        text = json.dumps(recipe, separators=(",", ":")).encode("utf-8")
+        # The recipe goes last: a package is only "in" the store once its objects are
+        written = self.append([("object", blob, payload) for blob, payload in payloads.items()])
+        return digest, written + self.append([("package", digest, text)])
+
+    def get(self, digest):
+        """The xlsx bytes stored as ``digest``; raises KeyError if there are none."""
+        if digest not in self:
+            raise KeyError(digest)
+        with open(self.pack_path, "rb") as f:
+            def read(kind, key):
+                offset, length = self.index[kind, key]
+                f.seek(offset)
+                return f.read(length)
+            recipe = json.loads(read("package", digest))
+            if "blob" in recipe:
+                return read("object", recipe["blob"])
+            return assemble(recipe, {m["blob"]: read("object", m["blob"]) for m in recipe["members"]})
+
+    # ── Engagement manifests ──
+    def manifest_path(self, engagement):
+        if not ENGAGEMENT.fullmatch(engagement):
+            raise ValueError(f"Engagement names are letters, digits, '.', '-' and '_', not {engagement!r}")
+        return os.path.join(self.directory, "engagements", engagement + ".json")
+
+    def manifest(self, engagement):
+        """``{file name: [{"sha256", "size", "saved"}, ...]}``, oldest version first."""
+        try:
+            with open(self.manifest_path(engagement), encoding="utf-8") as f:
+                return json.load(f)["files"]
+        except FileNotFoundError:
+            return {}
+
+    def write_manifest(self, engagement, manifest):
+        path = self.manifest_path(engagement)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"engagement": engagement, "files": dict(sorted(manifest.items()))}, f, indent=1)
+        os.replace(tmp, path)
+
+    def record(self, engagement, files):
+        """Add ``files`` (name -> (sha256, size)) to the engagement's manifest; returns the names that changed."""
+        manifest = self.manifest(engagement)
+        saved = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        changed = []
+        for name, (digest, size) in files.items():
+            versions = manifest.setdefault(name, [])
+            if not versions or versions[-1]["sha256"] != digest:
+                versions.append({"sha256": digest, "size": size, "saved": saved})
+                changed.append(name)
+        if changed:
+            self.write_manifest(engagement, manifest)
+        return changed
+
+    def add(self, engagement, files):
+        """Store ``files`` (name -> xlsx bytes) for an engagement; returns ``(changed names, bytes written)``."""
+        stored, written = {}, 0
+        for name, data in files.items():
+            digest, n = self.put(data)
+            stored[name] = (digest, len(data))
+            written += n
+        return self.record(engagement, stored), written
+
+def assemble(recipe, payloads):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zout:
+        for member in recipe["members"]:
+            info = zipfile.ZipInfo(member["name"], tuple(member["date_time"]))
+            for field in MEMBER_FIELDS:
+                setattr(info, field, tuple(member[field]) if field == "date_time" else member[field])
+            sheet_cache.write_compressed(zout, info, payloads[member["blob"]])
+    return buf.getvalue()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive toolkits in a content-addressed store.")
+    parser.add_argument("store", help="store directory")
+    parser.add_argument("engagement", help="engagement whose manifest records the files")
+    parser.add_argument("files", nargs="*", help="xlsx files to store (none: list the manifest)")
+    parser.add_argument("--get", metavar="NAME", help="restore the latest version of NAME")
+    parser.add_argument("-o", "--output", help="where --get writes (default: NAME)")
+    args = parser.parse_args(argv)
+    if not ENGAGEMENT.fullmatch(args.engagement):
+        parser.error(f"engagement names are letters, digits, '.', '-' and '_', not {args.engagement!r}")
+    store = PackageStore(args.store)
+
+    if args.get:
+        versions = store.manifest(args.engagement).get(args.get)
+        if not versions:
+            parser.error(f"{args.get!r} is not in {args.engagement}'s manifest")
+        with open(args.output or args.get, "wb") as f:
+            f.write(store.get(versions[-1]["sha256"]))
+        print(f"Restored {args.get} ({versions[-1]['sha256'][:12]}) to {args.output or args.get}")
+    elif args.files:
+        t0 = time.perf_counter()
+        files = {}
+        for path in args.files:
+            with open(path, "rb") as f:
+                files[os.path.basename(path)] = f.read()
+        changed, written = store.add(args.engagement, files)
+        total = sum(len(data) for data in files.values())
+        print(f"Stored {len(files)} file(s), {len(changed)} new or changed; wrote {written / 1024:.0f} KiB "
+              f"for {total / 1024:.0f} KiB of xlsx in {time.perf_counter() - t0:.2f}s")
+    else:
+        for name, versions in store.manifest(args.engagement).items():
+            latest = versions[-1]
+            print(f"{latest['sha256'][:12]}  {latest['size']:9d}  {latest['saved']}  {len(versions):3d}  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
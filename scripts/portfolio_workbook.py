@@ -0,0 +1,222 @@
+"""Portfolio dashboard across engagements, from the database ingest_toolkits.py fills.
+
+    python scripts/ingest_toolkits.py returned/ -d toolkits.sqlite
+    python scripts/portfolio_workbook.py toolkits.sqlite -o "Portfolio Dashboard.xlsx"
+
+Every aggregate is computed in one grouped scan per table. Risk ratings are
+re-evaluated in Python (build_workbook.risk_rating) from each row's
+likelihood and impact, so the dashboard holds values rather than one rating
+formula per risk for Excel to recalculate.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+from openpyxl.utils import get_column_letter
+
+import build_workbook as bw
+from build_workbook import add_banding, add_title, data_row, header_row, set_column_widths, styled_cell
+
+DEFAULT_OUTPUT = "Portfolio Dashboard.xlsx"
+
+# Risks still needing attention (the Risk Register's status list)
+CLOSED_RISK_STATUSES = ("Closed", "Accepted")
+
+def connect(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.create_function("risk_rating", 2, bw.risk_rating, deterministic=True)
+    return conn
+
+# ═══════════════════════════════════════════════════════════════
+# AGGREGATES
+# ═══════════════════════════════════════════════════════════════
+def engagements(conn):
+    """toolkit id -> display name, in name order."""
+    rows = conn.execute("SELECT id, inquiry_name, path FROM toolkits")
+    names = {tid: name or os.path.splitext(os.path.basename(path))[0] for tid, name, path in rows}
+    return dict(sorted(names.items(), key=lambda item: (item[1].lower(), item[0])))
+
+def phase_completion(conn):
+    """(toolkit id, phase) -> [items, complete, not applicable]."""
+    rows = conn.execute("""
+        SELECT toolkit_id, tab, COUNT(*), SUM(status = 'Complete'), SUM(status = 'N/A')
+        FROM phase_items GROUP BY toolkit_id, tab""")
+    return {(tid, tab): [n, done, na] for tid, tab, n, done, na in rows}
+
+def critical_risks(conn):
+    marks = ", ".join("?" * len(CLOSED_RISK_STATUSES))
+    return conn.execute(f"""
+        SELECT toolkit_id, num, phase, risk_description, likelihood, impact, owner, COALESCE(status, 'Open'), review_date
+        FROM risks
+        WHERE risk_rating(likelihood, impact) = 'Critical' AND COALESCE(status, 'Open') NOT IN ({marks})
+        ORDER BY toolkit_id, num""", CLOSED_RISK_STATUSES).fetchall()
+
+def budget_totals(conn, by):
+    """Budget, spend, committed and forecast summed by ``by`` (a budget column)."""
+    return {key: values for key, *values in conn.execute(f"""
+        SELECT {by}, TOTAL(budget), TOTAL(spend_to_date), TOTAL(committed), TOTAL(forecast_total)
+        FROM budget GROUP BY {by}""")}
+
+def pct(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+# ═══════════════════════════════════════════════════════════════
+# SHEETS
+# ═══════════════════════════════════════════════════════════════
+def total_row(ws, label, values, formats):
+    row = [styled_cell(ws, label, style="total")]
+    row += [styled_cell(ws, v, style="total", number_format=f) for v, f in zip(values, formats)]
+    ws.append(row)
+
+def add_summary_tab(wb, names, completion, risks, budgets):
+    ws = wb.create_sheet(title="Summary")
+    ws.sheet_properties.tabColor = bw.NAVY
+    headers = ["Engagement", "Checklist Items", "Complete", "% Complete", "Open Critical Risks",
+               "Budget (£)", "Forecast Total (£)", "Variance (£)", "Variance %"]
+    formats = [None, "#,##0", "#,##0", "0.0%", "#,##0", "#,##0", "#,##0", "#,##0", "0.0%"]
+    set_column_widths(ws, [40, 14, 12, 12, 14, 15, 15, 15, 12])
+    start = add_title(ws, "Portfolio Summary", f"{len(names)} engagement(s)")
+    ws.append(header_row(ws, headers))
+
+    critical, per_toolkit = {}, {}
+    for risk in risks:
+        critical[risk[0]] = critical.get(risk[0], 0) + 1
+    for (tid, _), counts in completion.items():
+        acc = per_toolkit.setdefault(tid, [0, 0, 0])
+        for i in range(3):
+            acc[i] += counts[i]
+    totals = [0] * 6
+    for tid, name in names.items():
+        items, done, na = per_toolkit.get(tid, [0, 0, 0])
+        budget, _, _, forecast = budgets.get(tid, [0, 0, 0, 0])
+        values = [name, items, done, pct(done, items - na), critical.get(tid, 0), budget, forecast,
+                  budget - forecast, pct(budget - forecast, budget)]
+        row = data_row(ws, values, len(headers))
+        for cell, fmt in zip(row[1:], formats[1:]):
+            cell.number_format = fmt
+        ws.append(row)
+        for i, v in enumerate([items, done, na, critical.get(tid, 0), budget, forecast]):
+            totals[i] += v
+    end = start + len(names)
+    add_banding(ws, start, end, len(headers))
+
+    items, done, na, n_critical, budget, forecast = totals
+    total_row(ws, "PORTFOLIO", [items, done, pct(done, items - na), n_critical, budget, forecast,
+                                budget - forecast, pct(budget - forecast, budget)], formats[1:])
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{end}"
+    return ws
+
+def add_phase_completion_tab(wb, names, completion):
+    ws = wb.create_sheet(title="Phase Completion")
+    ws.sheet_properties.tabColor = bw.MID_BLUE
+    phases = list(bw.phase_data)
+    headers = ["Engagement"] + phases + ["All Phases"]
+    set_column_widths(ws, [40] + [14] * (len(phases) + 1))
+    start = add_title(ws, "Completion by Phase", "Share of checklist items marked Complete (N/A items excluded)")
+    ws.append(header_row(ws, headers))
+
+    by_phase = {phase: [0, 0, 0] for phase in phases}
+    for tid, name in names.items():
+        values, overall = [name], [0, 0, 0]
+        for phase in phases:
+            counts = completion.get((tid, phase), [0, 0, 0])
+            values.append(pct(counts[1], counts[0] - counts[2]))
+            for acc in (overall, by_phase[phase]):
+                for i in range(3):
+                    acc[i] += counts[i]
+        values.append(pct(overall[1], overall[0] - overall[2]))
+        row = data_row(ws, values, len(headers))
+        for cell in row[1:]:
+            cell.number_format = "0%"
+        ws.append(row)
+    end = start + len(names)
+    add_banding(ws, start, end, len(headers))
+
+    all_counts = [sum(c[i] for c in by_phase.values()) for i in range(3)]
+    values = [pct(c[1], c[0] - c[2]) for c in by_phase.values()] + [pct(all_counts[1], all_counts[0] - all_counts[2])]
+    total_row(ws, "PORTFOLIO", values, ["0%"] * len(values))
+    return ws
+
+def add_critical_risks_tab(wb, names, risks):
+    ws = wb.create_sheet(title="Critical Risks")
+    ws.sheet_properties.tabColor = "C00000"
+    headers = ["Engagement", "#", "Phase", "Risk Description", "Likelihood", "Impact", "Owner", "Status", "Review Date"]
+    set_column_widths(ws, [35, 5, 18, 50, 12, 12, 18, 14, 12])
+    start = add_title(ws, "Open Critical Risks", "High likelihood and high impact, not closed or accepted")
+    ws.append(header_row(ws, headers))
+    order = {tid: i for i, tid in enumerate(names)}
+    for tid, *values in sorted(risks, key=lambda risk: order.get(risk[0], len(order))):
+        ws.append(data_row(ws, [names.get(tid), *values], len(headers)))
+    end = start + max(len(risks), 1)
+    if not risks:
+        ws.append(data_row(ws, ["No open critical risks"], len(headers)))
+    add_banding(ws, start, end, len(headers))
+    ws.auto_filter.ref = f"A{start}:{get_column_letter(len(headers))}{end}"
+    return ws
+
+def add_budget_variance_tab(wb, names, by_toolkit, by_category):
+    ws = wb.create_sheet(title="Budget Variance")
+    ws.sheet_properties.tabColor = "BF8F00"
+    headers = ["Engagement", "Budget (£)", "Spend to Date (£)", "Committed (£)", "Forecast Total (£)", "Variance (£)", "Variance %"]
+    formats = ["#,##0"] * 5 + ["0.0%"]
+    set_column_widths(ws, [40, 15, 15, 15, 15, 15, 12])
+    start = add_title(ws, "Budget Variance", "Variance is budget less forecast total")
+
+    def block(label_header, groups):
+        ws.append(header_row(ws, [label_header] + headers[1:]))
+        totals = [0] * 4
+        for label, values in groups:
+            budget, _, _, forecast = values
+            row = data_row(ws, [label, *values, budget - forecast, pct(budget - forecast, budget)], len(headers))
+            for cell, fmt in zip(row[1:], formats):
+                cell.number_format = fmt
+            ws.append(row)
+            totals = [t + v for t, v in zip(totals, values)]
+        budget, _, _, forecast = totals
+        total_row(ws, "TOTAL", [*totals, budget - forecast, pct(budget - forecast, budget)], formats)
+
+    block("Engagement", ((name, by_toolkit.get(tid, [0, 0, 0, 0])) for tid, name in names.items()))
+    end = start + len(names)
+    add_banding(ws, start, end, len(headers))
+
+    ws.append([])
+    category_start = end + 3
+    block("Cost Category", ((cat, by_category.get(cat, [0, 0, 0, 0])) for cat in bw.categories))
+    add_banding(ws, category_start, category_start + len(bw.categories), len(headers))
+    return ws
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+def build_portfolio(db_path, output=None):
+    """Write the dashboard for every toolkit in ``db_path``; returns like build_workbook."""
+    conn = connect(db_path)
+    try:
+        names = engagements(conn)
+        completion = phase_completion(conn)
+        risks = critical_risks(conn)
+        by_toolkit = budget_totals(conn, "toolkit_id")
+        by_category = budget_totals(conn, "cost_category")
+    finally:
+        conn.close()
+
+    wb = bw.new_workbook(bw.resolve_config({"streaming": True}))
+    add_summary_tab(wb, names, completion, risks, by_toolkit)
+    add_phase_completion_tab(wb, names, completion)
+    add_critical_risks_tab(wb, names, risks)
+    add_budget_variance_tab(wb, names, by_toolkit, by_category)
+    return bw.save_workbook(wb, output)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a portfolio dashboard from ingested toolkits.")
+    parser.add_argument("database", help="SQLite file written by ingest_toolkits.py")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"xlsx path to write (default: {DEFAULT_OUTPUT!r})")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.database):
+        parser.error(f"{args.database} does not exist")
+    print(f"Saved to {build_portfolio(args.database, args.output)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
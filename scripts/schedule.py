@@ -0,0 +1,152 @@
+"""Critical-path scheduling of the checklist.
+
+    python scripts/schedule.py --established 2026-01-05
+    python scripts/schedule.py --established 2026-01-05 --report 2030-06-30 --critical
+
+Each checklist item has a planning duration and the items it waits for
+(``phase_plan`` in build_workbook.py). The items are put in dependency order
+with Kahn's algorithm, then a forward pass gives each item's earliest start
+and finish and a backward pass from the end of the plan its latest start and
+finish. Slack is the difference; items without slack form the critical
+path. Every pass visits each item and each dependency once, so plans that
+repeat the checklist per module with thousands of items schedule in
+milliseconds.
+
+Durations are relative: the whole plan is stretched (or shrunk) so that it
+ends on the report date, by default the median from the duration curves
+(durations.py), or left in planning weeks if there is none.
+"""
+from collections import deque
+from datetime import date, timedelta
+import argparse
+import sys
+import time
+
+def critical_path(tasks):
+    """Schedule ``tasks``, a dict of ``id -> (duration, [prerequisite ids])``.
+
+    Returns ``(order, times)``: the ids in dependency order, and for each id
+    a dict of ``start``, ``finish``, ``latest_start``, ``latest_finish`` and
+    ``slack`` in the durations' units from the start of the plan. Raises
+    ValueError for an unknown prerequisite or a dependency cycle.
+    """
+    ids = list(tasks)
+    position = {task: i for i, task in enumerate(ids)}
+    duration = [float(tasks[task][0]) for task in ids]
+    successors = [[] for _ in ids]
+    waiting = [0] * len(ids)
+    for i, task in enumerate(ids):
+        for prerequisite in tasks[task][1]:
+            if prerequisite not in position:
+                raise ValueError(f"{task!r} waits for unknown item {prerequisite!r}")
+            successors[position[prerequisite]].append(i)
+            waiting[i] += 1
+
+    ready = deque(i for i in range(len(ids)) if not waiting[i])
+    order = []
+    while ready:
+        i = ready.popleft()
+        order.append(i)
+        for j in successors[i]:
+            waiting[j] -= 1
+            if not waiting[j]:
+                ready.append(j)
+    if len(order) < len(ids):
+        stuck = [ids[i] for i in range(len(ids)) if waiting[i]]
+        raise ValueError(f"Dependency cycle among {len(stuck)} items, e.g. {stuck[0]!r}")
+
+    # Forward pass: an item starts once all its prerequisites have finished
+    start = [0.0] * len(ids)
+    for i in order:
+        finish = start[i] + duration[i]
+        for j in successors[i]:
+            if finish > start[j]:
+                start[j] = finish
+    end = max((start[i] + duration[i] for i in order), default=0.0)
+    # Backward pass: an item must finish before any item waiting for it has to start
+    latest_finish = [end] * len(ids)
+    for i in reversed(order):
+        for j in successors[i]:
+            latest_start = latest_finish[j] - duration[j]
+            if latest_start < latest_finish[i]:
+                latest_finish[i] = latest_start
+
+    times = {}
+    for i, task in enumerate(ids):
+        times[task] = {
+            "start": start[i],
+            "finish": start[i] + duration[i],
+            "latest_start": latest_finish[i] - duration[i],
+            "latest_finish": latest_finish[i],
+            "slack": latest_finish[i] - duration[i] - start[i],
+        }
+    return [ids[i] for i in order], times
+
+def checklist_tasks(phase_data, plan):
+    """``(phase, action) -> (weeks, [prerequisites])`` for every checklist item.
+
+    Prerequisites in ``plan`` are action names, which are unique across the
+    phases; items missing from it take a week and wait for nothing.
+    """
+    phase_of = {action: phase for phase, data in phase_data.items() for action, *_ in data["items"]}
+    tasks = {}
+    for phase, data in phase_data.items():
+        for action, *_ in data["items"]:
+            weeks, after = plan.get(action, (1, []))
+            unknown = [a for a in after if a not in phase_of]
+            if unknown:
+                raise ValueError(f"{action!r} waits for unknown item {unknown[0]!r}")
+            tasks[(phase, action)] = (weeks, [(phase_of[a], a) for a in after])
+    return tasks
+
+def schedule_dates(tasks, established, report=None):
+    """Dated schedule of ``tasks`` (durations in weeks) starting on ``established``.
+
+    With a ``report`` date after ``established`` every duration is scaled so
+    the plan ends on it. Returns ``(order, rows, scale)`` where each row has
+    ``start``, ``finish``, ``latest_finish`` (dates), ``slack`` (days) and
+    ``critical``.
+    """
+    order, times = critical_path(tasks)
+    weeks = max((t["finish"] for t in times.values()), default=0)
+    scale = 1.0
+    if report is not None and report > established and weeks:
+        scale = (report - established).days / (weeks * 7)
+
+    def on(weeks):
+        return established + timedelta(days=round(weeks * 7 * scale))
+
+    rows = {}
+    for task, t in times.items():
+        slack = round(t["slack"] * 7 * scale)
+        rows[task] = {"start": on(t["start"]), "finish": on(t["finish"]), "latest_finish": on(t["latest_finish"]),
+                      "slack": slack, "critical": slack == 0}
+    return order, rows, scale
+
+def main(argv=None):
+    import build_workbook as bw
+    import durations
+
+    parser = argparse.ArgumentParser(description="Critical-path schedule of the toolkit checklist.")
+    parser.add_argument("--established", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--report", type=date.fromisoformat, help="date the plan should end (default: median from durations.py)")
+    parser.add_argument("--subject-area")
+    parser.add_argument("--inquiry-type")
+    parser.add_argument("--critical", action="store_true", help="list only the critical path")
+    args = parser.parse_args(argv)
+
+    report = args.report or durations.target_dates(args.established, args.subject_area, args.inquiry_type)["median"]
+    t0 = time.perf_counter()
+    order, rows, scale = schedule_dates(checklist_tasks(bw.phase_data, bw.phase_plan), args.established, report)
+    took = time.perf_counter() - t0
+    for phase, action in sorted(order, key=lambda task: (rows[task]["start"], rows[task]["finish"])):
+        row = rows[(phase, action)]
+        if args.critical and not row["critical"]:
+            continue
+        print(f"{row['start']}  {row['finish']}  {row['slack']:5d}d  {'*' if row['critical'] else ' '} {phase[:2]} {action}")
+    print(f"{len(order)} items, ending {max(r['finish'] for r in rows.values())} "
+          f"(durations x{scale:.2f}), scheduled in {took * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
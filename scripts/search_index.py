@@ -0,0 +1,189 @@
+"""BM25 search over the checklist guidance, risks and the statutory matrix.
+
+    python scripts/search_index.py                      # refresh src/data/search.index.json
+    python scripts/search_index.py "Section 40" vetting # query it
+    python scripts/search_index.py Maxwellisation -k 5
+
+Every phase action item (action, guidance and role), Risk Register row
+(risk, mitigation, owner) and matrix row in build_workbook.py is one
+document. The inverted index maps each term to a delta-encoded postings
+list of ``doc id, term frequency`` pairs and is written as compact JSON, so
+the web app (src/data/search.js) loads the same file the scripts query. The
+file carries a hash of the content and is only rewritten when that changes.
+"""
+from collections import Counter
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_JSON = os.path.join(ROOT, "src", "data", "search.index.json")
+INDEX_VERSION = 1
+DEFAULT_K = 10
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# add_title with a subtitle puts the header on row 4, so data starts on row 5
+FIRST_DATA_ROW = 5
+
+KINDS = ["Action", "Risk", "Matrix"]
+
+# Kept short: words like "section" and numbers like "40" matter here
+STOPWORDS = set("""
+a an and are as at be been but by can for from has have if in into is it its may must not of on or
+should so such than that the their then there these this to was were what when which who will with
+""".split())
+
+def tokenize(text):
+    """Lower-case word tokens without stopwords; a plural "s" is folded (search.js matches this)."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS or (len(word) < 2 and not word.isdigit()):
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+# ═══════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════
+def documents(phase_data, risks, matrix):
+    """Yield ``(tab, row, kind, title, detail, text)`` for each searchable row."""
+    for tab, data in phase_data.items():
+        for i, (action, desc, _, role) in enumerate(data["items"]):
+            yield tab, FIRST_DATA_ROW + i, "Action", action, desc, f"{action} {desc} {role}"
+    for i, (phase, desc, _, _, mitigation, owner) in enumerate(risks):
+        yield "Risk Register", FIRST_DATA_ROW + i, "Risk", desc, mitigation, f"{desc} {mitigation} {owner} {phase}"
+    for i, row in enumerate(matrix):
+        yield "Statutory vs Non-Statutory", FIRST_DATA_ROW + i, "Matrix", row[0], " | ".join(row[1:]), " ".join(row)
+
+def content_hash(docs):
+    text = json.dumps([INDEX_VERSION, K1, B, docs], ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def build_index(phase_data, risks, matrix):
+    """The index as the JSON-ready dict written to INDEX_JSON."""
+    docs = list(documents(phase_data, risks, matrix))
+    tabs = list(dict.fromkeys(doc[0] for doc in docs))
+    postings, lengths = {}, []
+    for doc_id, (*_, text) in enumerate(docs):
+        counts = Counter(tokenize(text))
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+    terms = {}
+    for term in sorted(postings):
+        flat, last = [], 0
+        for doc_id, tf in postings[term]:
+            flat += [doc_id - last, tf]
+            last = doc_id
+        terms[term] = flat
+    return {
+        "version": INDEX_VERSION,
+        "sha256": content_hash(docs),
+        "k1": K1,
+        "b": B,
+        "tabs": tabs,
+        "kinds": KINDS,
+        # [tab index, row, kind index, title, detail, length]
+        "docs": [[tabs.index(tab), row, KINDS.index(kind), title, detail, n]
+                 for (tab, row, kind, title, detail, _), n in zip(docs, lengths)],
+        "terms": terms,
+    }
+
+def read_index(index_path=INDEX_JSON):
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def write_index(phase_data, risks, matrix, index_path=INDEX_JSON, force=False):
+    """Write the index unless the file already matches the content; returns True if written."""
+    index = build_index(phase_data, risks, matrix)
+    existing = read_index(index_path)
+    if not force and existing and existing.get("sha256") == index["sha256"]:
+        return False
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, index_path)
+    return True
+
+# ═══════════════════════════════════════════════════════════════
+# QUERY
+# ═══════════════════════════════════════════════════════════════
+class SearchIndex:
+    """Decoded postings with per-term IDF and per-document length norms precomputed."""
+
+    def __init__(self, data):
+        self.tabs = data["tabs"]
+        self.kinds = data["kinds"]
+        self.docs = data["docs"]
+        k1, b = data["k1"], data["b"]
+        n = len(self.docs)
+        avgdl = sum(doc[5] for doc in self.docs) / n if n else 0
+        norms = [k1 * (1 - b + b * doc[5] / avgdl) for doc in self.docs]
+        self.postings = {}
+        for term, flat in data["terms"].items():
+            df = len(flat) // 2
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            doc_id, weights = 0, []
+            for i in range(0, len(flat), 2):
+                doc_id += flat[i]
+                tf = flat[i + 1]
+                weights.append((doc_id, idf * tf * (k1 + 1) / (tf + norms[doc_id])))
+            self.postings[term] = weights
+
+    def search(self, query, k=DEFAULT_K):
+        """Best ``k`` matches as dicts (score, tab, row, kind, title, detail), best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0) + weight
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [self.describe(doc_id, score) for doc_id, score in best]
+
+    def describe(self, doc_id, score):
+        tab, row, kind, title, detail, _ = self.docs[doc_id]
+        return {"score": score, "tab": self.tabs[tab], "row": row, "kind": self.kinds[kind], "title": title, "detail": detail}
+
+def load_index(index_path=INDEX_JSON):
+    data = read_index(index_path)
+    return SearchIndex(data) if data else None
+
+def main(argv=None):
+    import build_workbook as bw
+
+    parser = argparse.ArgumentParser(description="Build or query the guidance search index.")
+    parser.add_argument("query", nargs="*", help="search terms; with none, just refresh the index")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--index", default=INDEX_JSON)
+    parser.add_argument("--force", action="store_true", help="rewrite the index even if the content is unchanged")
+    args = parser.parse_args(argv)
+
+    if write_index(bw.phase_data, bw.risks, bw.matrix, args.index, force=args.force):
+        print(f"Wrote {args.index}")
+    elif not args.query:
+        print(f"{args.index} is up to date")
+    if args.query:
+        index = load_index(args.index)
+        t0 = time.perf_counter()
+        results = index.search(" ".join(args.query), args.k)
+        took = (time.perf_counter() - t0) * 1000
+        for r in results:
+            print(f"{r['score']:6.2f}  {r['kind']:6s}  {r['tab']} row {r['row']}: {r['title']}")
+        print(f"{len(results)} result(s) in {took:.3f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Cache of rendered worksheet XML, keyed by a hash of each tab's source data.
+
+    python scripts/build_workbook.py --cache-dir .toolkit-cache
+
+A tab whose source (checklist items, risks, matrix rows, budget categories,
+register rows, ...) hashes the same as in an earlier build is not rendered
+again: an empty placeholder sheet holds its place in the workbook and, after
+openpyxl has saved the package, the placeholder's part is swapped for the
+cached XML. Only tabs whose source changed go through openpyxl cell by cell.
+
+Each entry is one file: a line of JSON (the styles below, as their
+SpreadsheetML, and the tab's filter range) followed by the compressed sheet
+XML, so reading the cache never runs code from it. The directory is kept
+under ``max_bytes`` by removing the least recently used entries, which also
+clears out those left behind by older versions of the build code.
+
+Cell and conditional-format style indices are workbook-wide, so each entry
+also records the styles its XML refers to; they are re-registered in the new
+workbook and the indices in the cached XML are rewritten to match. openpyxl
+numbers them as it writes each sheet (cell styles in streaming mode as the
+rows are appended), so the placeholder carries the cached styles, in the
+order the XML first uses them, to be numbered at the same point.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import tempfile
+import zipfile
+import zlib
+
+import openpyxl
+from openpyxl.formatting.rule import Rule
+from openpyxl.styles import Alignment, Border, Font, Protection
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.styles.fills import Fill
+from openpyxl.xml.functions import fromstring, tostring
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Attributes that hold a workbook-wide style index, by the table they index
+CELL_STYLE_ATTR = re.compile(r'(<(?:c|row) [^>]*?\bs=")(\d+)(")|(<col [^>]*?\bstyle=")(\d+)(")')
+DXF_ATTR = re.compile(r'(<cfRule [^>]*?\bdxfId=")(\d+)(")')
+
+# Custom number formats are numbered from here on (ECMA-376 18.8.31)
+FIRST_CUSTOM_NUMFMT = 164
+
+# Every member rezip writes gets this time: the earliest a zip can record
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".sheet"
+# Style objects an entry records, by their field in a style spec
+STYLE_CLASSES = {"font": Font, "fill": Fill, "border": Border, "protection": Protection, "alignment": Alignment}
+
+def code_version():
+    """Hash of the build scripts and openpyxl version.
+
+    Any change to the code that renders a tab invalidates every cache entry.
+    """
+    h = hashlib.sha256(openpyxl.__version__.encode())
+    for name in sorted(os.listdir(SCRIPTS_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(SCRIPTS_DIR, name), "rb") as f:
+                h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()
+
+def source_hash(*parts):
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# ── Style tables ──
+def style_spec(wb, idx):
+    """The objects behind cell style ``idx``, independent of any index."""
+    sa = wb._cell_styles[idx]
+    if sa.numFmtId < FIRST_CUSTOM_NUMFMT:
+        number_format = sa.numFmtId
+    else:
+        number_format = wb._number_formats[sa.numFmtId - FIRST_CUSTOM_NUMFMT]
+    return {
+        "font": wb._fonts[sa.fontId],
+        "fill": wb._fills[sa.fillId],
+        "border": wb._borders[sa.borderId],
+        "number_format": number_format,
+        "protection": wb._protections[sa.protectionId],
+        "alignment": wb._alignments[sa.alignmentId],
+        "pivotButton": sa.pivotButton,
+        "quotePrefix": sa.quotePrefix,
+        "named_style": wb._named_styles[sa.xfId].name,
+    }
+
+def style_array(wb, spec):
+    """Add the fonts, fills, ... of ``spec`` to ``wb``'s style tables; returns the cell style, not yet numbered."""
+    sa = StyleArray()
+    sa.fontId = wb._fonts.add(spec["font"])
+    sa.fillId = wb._fills.add(spec["fill"])
+    sa.borderId = wb._borders.add(spec["border"])
+    sa.protectionId = wb._protections.add(spec["protection"])
+    sa.alignmentId = wb._alignments.add(spec["alignment"])
+    if isinstance(spec["number_format"], int):
+        sa.numFmtId = spec["number_format"]
+    else:
+        sa.numFmtId = wb._number_formats.add(spec["number_format"]) + FIRST_CUSTOM_NUMFMT
+    sa.pivotButton = spec["pivotButton"]
+    sa.quotePrefix = spec["quotePrefix"]
+    sa.xfId = wb._named_styles.names.index(spec["named_style"])
+    return sa
+
+def used_indices(xml):
+    """The cell style and dxf indices ``xml`` refers to, each in order of first use."""
+    cells = dict.fromkeys(int(m.group(2) or m.group(5)) for m in CELL_STYLE_ATTR.finditer(xml))
+    dxfs = dict.fromkeys(int(m.group(2)) for m in DXF_ATTR.finditer(xml))
+    return list(cells), list(dxfs)
+
+def remap_indices(xml, cell_map, dxf_map):
+    def cell(m):
+        if m.group(1):
+            return m.group(1) + str(cell_map[int(m.group(2))]) + m.group(3)
+        return m.group(4) + str(cell_map[int(m.group(5))]) + m.group(6)
+    xml = CELL_STYLE_ATTR.sub(cell, xml)
+    return DXF_ATTR.sub(lambda m: m.group(1) + str(dxf_map[int(m.group(2))]) + m.group(3), xml)
+
+# ── Entries ──
+def to_xml(obj):
+    return tostring(obj.to_tree()).decode("utf-8")
+
+def encode_entry(entry):
+    header = {
+        "auto_filter": entry["auto_filter"],
+        "cell_styles": {idx: {**spec, **{field: to_xml(spec[field]) for field in STYLE_CLASSES}}
+                        for idx, spec in entry["cell_styles"].items()},
+        "dxfs": {idx: to_xml(dxf) for idx, dxf in entry["dxfs"].items()},
+    }
+    return json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n" + entry["xml"]
+
+def decode_entry(data):
+    header, _, xml = data.partition(b"\n")
+    header = json.loads(header)
+    return {
+        "xml": xml,
+        "auto_filter": header["auto_filter"],
+        "cell_styles": {int(idx): {**spec, **{field: cls.from_tree(fromstring(spec[field])) for field, cls in STYLE_CLASSES.items()}}
+                        for idx, spec in header["cell_styles"].items()},
+        "dxfs": {int(idx): DifferentialStyle.from_tree(fromstring(dxf)) for idx, dxf in header["dxfs"].items()},
+    }
+
+# ── Cache ──
+class SheetCache:
+    """Rendered sheet parts stored as one file per tab under ``directory``, at most ``max_bytes`` in all."""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = code_version()
+        self.rendered = []
+        self.reused = []
+
+    def key(self, tab_name, source, streaming):
+        if source is None:
+            return None
+        return source_hash(self.version, "streaming" if streaming else "normal", tab_name, source)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = decode_entry(f.read())
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, SyntaxError):
+            # Unreadable (cut short, or not an entry): rendered and written again
+            return None
+        try:
+            os.utime(path)  # recently used, for evict()
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(encode_entry(entry))
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Remove the least recently used entries until the directory holds at most ``max_bytes`` of them."""
+        entries = []
+        for folder, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(ENTRY_SUFFIX):
+                    path = os.path.join(folder, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        used = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if used <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
+
+    def build(self, wb, tabs, streaming, save):
+        """Add ``tabs`` to ``wb``, reusing cached sheets, and return the xlsx bytes.
+
+        ``tabs`` yields ``(tab name, builder, source)``; a source of None means
+        the tab is always rendered (e.g. register rows streamed from a CSV).
+        ``save`` turns the workbook into xlsx bytes.
+        """
+        self.rendered, self.reused = [], []
+        sheets, reused = [], {}
+        for tab_name, build, source in tabs:
+            key = self.key(tab_name, source, streaming)
+            entry = self.get(key) if key else None
+            if entry is None:
+                ws = build(wb)
+                self.rendered.append(tab_name)
+            else:
+                ws = wb.create_sheet(title=tab_name)
+                if entry["auto_filter"]:
+                    # Workbook.xml carries the filter's defined name
+                    ws.auto_filter.ref = entry["auto_filter"]
+                xml = zlib.decompress(entry["xml"]).decode("utf-8")
+                reused[tab_name] = (xml, *place_styles(wb, ws, xml, entry, streaming))
+                self.reused.append(tab_name)
+            sheets.append((ws, key, entry))
+
+        data = save(wb)
+        parts = {}
+        stored = False
+        with zipfile.ZipFile(io.BytesIO(data)) as zin:
+            names = set(zin.namelist())
+            for ws, key, entry in sheets:
+                part = ws.path.lstrip("/")
+                if entry is not None:
+                    xml, cells, rules = reused[ws.title]
+                    # Numbered by now; the placeholder's own XML is discarded
+                    cell_map = {idx: wb._cell_styles.index(sa) for idx, sa in cells.items()}
+                    dxf_map = {idx: rule.dxfId for idx, rule in rules.items()}
+                    parts[part] = remap_indices(xml, cell_map, dxf_map).encode("utf-8")
+                elif key is not None and sheet_rels(part) not in names:
+                    # Sheets with relationships (hyperlinks, comments, tables)
+                    # depend on other parts and are always rendered.
+                    self.put(key, capture(wb, ws, zin.read(part).decode("utf-8")))
+                    stored = True
+            if stored:
+                self.evict()
+            if not parts:
+                return data
+            return rezip(zin, parts)
+
+def place_styles(wb, ws, xml, entry, streaming):
+    """Give the placeholder ``ws`` the cached sheet's styles, so they are numbered where its cells would be.
+
+    Returns ``(cell styles, conditional-format rules)``, each keyed by the
+    index ``xml`` uses.
+    """
+    cell_order, dxf_order = used_indices(xml)
+    cells = {idx: style_array(wb, entry["cell_styles"][idx]) for idx in cell_order}
+    if streaming:
+        # Write-only sheets number cell styles as rows are appended
+        for sa in cells.values():
+            wb._cell_styles.add(sa)
+    else:
+        for column, sa in enumerate(cells.values(), 1):
+            ws.cell(row=1, column=column)._style = StyleArray(sa)
+    rules = {}
+    for idx in dxf_order:
+        rules[idx] = Rule(type="expression", formula=["FALSE"], dxf=entry["dxfs"][idx])
+        ws.conditional_formatting.add("A1", rules[idx])
+    return cells, rules
+
+def sheet_rels(part):
+    folder, name = part.rsplit("/", 1)
+    return f"{folder}/_rels/{name}.rels"
+
+def capture(wb, ws, xml):
+    cells, dxfs = used_indices(xml)
+    return {
+        "xml": zlib.compress(xml.encode("utf-8")),
+        "cell_styles": {idx: style_spec(wb, idx) for idx in cells},
+        "dxfs": {idx: wb._differential_styles[idx] for idx in dxfs},
+        "auto_filter": ws.auto_filter.ref,
+    }
+
+def rezip(zin, parts):
+    """Copy ``zin`` with ``parts`` (name -> bytes) replaced or added.
+
+    Other members are copied still compressed, so a large register that is
+    not being replaced costs a memcpy rather than inflate + deflate. Members
+    are written in part_order with a fixed time, so the same parts always
+    give the same bytes (see package_store.py).
+    """
+    infos = {info.filename: info for info in zin.infolist()}
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zout:
+        for name in sorted(infos.keys() | parts.keys(), key=part_order):
+            if name in parts:
+                zout.writestr(zip_info(name), parts[name])
+            else:
+                copy_compressed(zin, zout, infos[name])
+    return buf.getvalue()
+
+def part_order(name):
+    # [Content_Types].xml first, as Excel writes it, then by name
+    return name != "[Content_Types].xml", name
+
+def zip_info(name):
+    info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3
+    info.external_attr = 0o600 << 16
+    return info
+
+def copy_compressed(zin, zout, info):
+    out = zip_info(info.filename)
+    for attr in ("compress_type", "CRC", "compress_size", "file_size", "create_version", "extract_version"):
+        setattr(out, attr, getattr(info, attr))
+    out.flag_bits = info.flag_bits & 0x0806  # deflate level and UTF-8 names; sizes are known, so no data descriptor
+    write_compressed(zout, out, read_compressed(zin, info))
+
+def read_compressed(zin, info):
+    """The member's payload as stored, without inflating it."""
+    zin.fp.seek(info.header_offset)
+    header = zin.fp.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    zin.fp.seek(name_length + extra_length, io.SEEK_CUR)
+    return zin.fp.read(info.compress_size)
+
+def write_compressed(zout, info, data):
+    # zipfile has no public raw copy; this mirrors what ZipFile.write does
+    # for an already-compressed payload.
+    info.header_offset = zout.fp.tell()
+    zout.fp.write(info.FileHeader())
+    zout.fp.write(data)
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(info)
+    zout.NameToInfo[info.filename] = info
+    zout._didModify = True
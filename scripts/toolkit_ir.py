@@ -0,0 +1,320 @@
+"""Compile the checklist content once and render it to several formats.
+
+    python scripts/toolkit_ir.py -o build/
+    python scripts/toolkit_ir.py -o build/ --formats json csv --cache-dir .toolkit-cache
+
+The content tables in build_workbook.py (info, instructions, phase_data,
+risks, matrix, categories, the register headers and the validation lists)
+are compiled into one intermediate representation: a Toolkit of Sheets, each
+with its headers, rows of plain values and the Validations on its columns.
+The compiled Toolkit is pickled under the cache directory, keyed by a hash of
+the content, so an unchanged source is never compiled twice. Every requested
+renderer (xlsx, ODS, a zip of CSVs, JSON for the web app) then reads that one
+pickle in its own worker process.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape, quoteattr
+import argparse
+import csv
+import io
+import json
+import os
+import pickle
+import re
+import sys
+import time
+import zipfile
+
+from openpyxl.utils import get_column_letter
+
+import build_workbook as bw
+import sheet_cache
+
+# Bump when the shape of the IR changes, so older pickles are not reused
+IR_VERSION = 1
+DEFAULT_CACHE_DIR = ".toolkit-cache"
+
+Toolkit = namedtuple("Toolkit", "sha256 lists sheets")
+# ``notes`` are free-text lines shown below the table (the Overview's instructions)
+Sheet = namedtuple("Sheet", "name title subtitle color headers rows validations notes")
+# A drop-down of ``Toolkit.lists[list_name]`` on every data row of ``column`` (a header)
+Validation = namedtuple("Validation", "column list_name")
+
+# ═══════════════════════════════════════════════════════════════
+# COMPILE
+# ═══════════════════════════════════════════════════════════════
+def content_hash(register_rows):
+    return sheet_cache.source_hash(
+        IR_VERSION, register_rows, bw.info, bw.instructions, bw.phase_data, bw.risks, bw.matrix, bw.categories,
+        bw.validation_lists, bw.phase_headers, bw.decision_headers, bw.risk_headers, bw.matrix_headers,
+        bw.budget_headers, bw.cp_headers, bw.stakeholder_headers)
+
+def register_sheet(name, title, subtitle, color, headers, register_rows, validations):
+    rows = [(idx,) for idx in range(1, register_rows + 1)]
+    return Sheet(name, title, subtitle, color, headers, rows, validations, [])
+
+def compile_sheets(register_rows):
+    yield Sheet("Overview", "Public Inquiry Consulting Toolkit", "Lifecycle Management Workbook", bw.NAVY,
+                ["Field", "Value"], [(label.rstrip(":"), value) for label, value in bw.info], [], bw.instructions)
+    for tab_name, data in bw.phase_data.items():
+        rows = [(idx, action, desc, priority, role, "Not Started")
+                for idx, (action, desc, priority, role) in enumerate(data["items"], 1)]
+        yield Sheet(tab_name, tab_name, data["subtitle"], data["color"], bw.phase_headers, rows,
+                    [Validation("Status", "Status"), Validation("Priority", "Priority")], [])
+    yield register_sheet("Decision Log", "Decision Log", "Capturing key decisions for institutional memory", "7030A0",
+                         bw.decision_headers, register_rows, [Validation("Phase", "Phase")])
+    # Ratings are stored as values here; the xlsx toolkit keeps them as formulas
+    rows = [(idx, phase, desc, like, impact, bw.risk_rating(like, impact), mitigation, owner, "Open")
+            for idx, (phase, desc, like, impact, mitigation, owner) in enumerate(bw.risks, 1)]
+    yield Sheet("Risk Register", "Risk Register", "Common pitfalls and risks across the inquiry lifecycle", "C00000",
+                bw.risk_headers, rows,
+                [Validation("Likelihood", "Likelihood"), Validation("Impact", "Likelihood"), Validation("Status", "RiskStatus")], [])
+    yield Sheet("Statutory vs Non-Statutory", "Statutory vs Non-Statutory Decision Matrix",
+                "Key differences to inform scoping advice", "548235", bw.matrix_headers, bw.matrix, [], [])
+    yield Sheet("Budget Tracker", "Budget Tracker", "Monitoring inquiry expenditure against budget", "BF8F00",
+                bw.budget_headers, [(cat,) for cat in bw.categories], [], [])
+    yield register_sheet("CP Register", "Core Participant Register",
+                         "Tracking core participants, legal representation, and funding", "7030A0",
+                         bw.cp_headers, register_rows,
+                         [Validation("Type", "CPType"), Validation("Funding Status", "Funding")])
+    yield register_sheet("Stakeholder Map", "Stakeholder Map", "Key relationships and engagement approach", "548235",
+                         bw.stakeholder_headers, register_rows,
+                         [Validation("Category", "StakeholderCategory"), Validation("Influence", "Influence"),
+                          Validation("Engagement Level", "EngagementLevel")])
+
+def compile_toolkit(register_rows=50):
+    """Build the IR straight from the content tables (no cache)."""
+    sheets = []
+    for sheet in compile_sheets(register_rows):
+        rows = [tuple(row) + (None,) * (len(sheet.headers) - len(row)) for row in sheet.rows]
+        for v in sheet.validations:
+            if v.column not in sheet.headers or v.list_name not in bw.validation_lists:
+                raise ValueError(f"{sheet.name!r}: bad validation {v}")
+        sheets.append(sheet._replace(headers=list(sheet.headers), rows=rows, notes=list(sheet.notes)))
+    return Toolkit(content_hash(register_rows), dict(bw.validation_lists), sheets)
+
+def ir_path(cache_dir, key):
+    return os.path.join(cache_dir, "ir", f"{key}.pickle")
+
+def compiled(cache_dir=DEFAULT_CACHE_DIR, register_rows=50):
+    """Return ``(path of the pickled IR, compiled now?)``, compiling only on a cache miss."""
+    path = ir_path(cache_dir, content_hash(register_rows))
+    if os.path.exists(path):
+        return path, False
+    toolkit = compile_toolkit(register_rows)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(toolkit, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path, True
+
+def load_toolkit(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+# ═══════════════════════════════════════════════════════════════
+# RENDERERS — each takes the Toolkit and an output path
+# ═══════════════════════════════════════════════════════════════
+def column_widths(sheet, minimum=5, maximum=55):
+    """Character widths from the longest header or value in each column."""
+    widths = [len(str(h)) + 2 for h in sheet.headers]
+    for row in sheet.rows:
+        for i, v in enumerate(row):
+            if v is not None:
+                widths[i] = max(widths[i], len(str(v)) + 2)
+    return [min(max(w, minimum), maximum) for w in widths]
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+# ── xlsx ──
+def render_xlsx(toolkit, path):
+    wb = bw.new_workbook(bw.resolve_config({"streaming": True}))
+    for sheet in toolkit.sheets:
+        ws = wb.create_sheet(title=sheet.name)
+        ws.sheet_properties.tabColor = sheet.color
+        bw.set_column_widths(ws, column_widths(sheet))
+        start = bw.add_title(ws, sheet.title, sheet.subtitle)
+        ws.append(bw.header_row(ws, sheet.headers))
+        for row in sheet.rows:
+            ws.append(bw.data_row(ws, row, len(sheet.headers)))
+        end = start + len(sheet.rows)
+        bw.add_banding(ws, start, end, len(sheet.headers))
+        for v in sheet.validations:
+            bw.add_list_validation(ws, v.list_name, get_column_letter(sheet.headers.index(v.column) + 1), start + 1)
+        if sheet.notes:
+            ws.append([])
+            for r, note in enumerate(sheet.notes, end + 2):
+                ws.append([bw.styled_cell(ws, note, bw.body_font, alignment=bw.wrap_align)])
+                bw.merge_row(ws, r, max(len(sheet.headers), 5))
+        if sheet.rows:
+            ws.auto_filter.ref = f"A{start}:{get_column_letter(len(sheet.headers))}{end}"
+    bw.add_lists_tab(wb)
+    return bw.save_workbook(wb, path)
+
+# ── ODS (OpenDocument 1.2, written directly) ──
+ODS_MIMETYPE = "application/vnd.oasis.opendocument.spreadsheet"
+ODS_NS = {
+    "office": "urn:oasis:names:tc:opendocument:xmlns:office:1.0",
+    "style": "urn:oasis:names:tc:opendocument:xmlns:style:1.0",
+    "table": "urn:oasis:names:tc:opendocument:xmlns:table:1.0",
+    "text": "urn:oasis:names:tc:opendocument:xmlns:text:1.0",
+    "fo": "urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0",
+    "of": "urn:oasis:names:tc:opendocument:xmlns:of:1.2",
+}
+ODS_MANIFEST = f"""<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+<manifest:file-entry manifest:full-path="/" manifest:media-type="{ODS_MIMETYPE}"/>
+<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>"""
+ODS_CELL_STYLES = f"""<style:style style:name="title" style:family="table-cell"><style:text-properties fo:font-size="14pt" fo:font-weight="bold" fo:color="#{bw.NAVY}"/></style:style>
+<style:style style:name="subtitle" style:family="table-cell"><style:text-properties fo:font-size="11pt" fo:font-weight="bold" fo:color="#{bw.MID_BLUE}"/></style:style>
+<style:style style:name="header" style:family="table-cell"><style:table-cell-properties fo:background-color="#{bw.NAVY}"/><style:text-properties fo:font-weight="bold" fo:color="#{bw.WHITE}"/></style:style>
+<style:style style:name="body" style:family="table-cell"><style:table-cell-properties fo:wrap-option="wrap" style:vertical-align="top"/></style:style>"""
+
+def ods_cell(value, style="body", validation=None):
+    attrs = f' table:style-name="{style}"'
+    if validation:
+        attrs += f' table:content-validation-name="{validation}"'
+    if value is None:
+        return f"<table:table-cell{attrs}/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<table:table-cell{attrs} office:value-type="float" office:value="{value!r}"><text:p>{value}</text:p></table:table-cell>'
+    return f'<table:table-cell{attrs} office:value-type="string"><text:p>{escape(str(value))}</text:p></table:table-cell>'
+
+def ods_content(toolkit):
+    widths = {}
+    validations, tables = [], []
+    for sheet in toolkit.sheets:
+        cols = []
+        for w in column_widths(sheet):
+            name = widths.setdefault(w, f"co{len(widths) + 1}")
+            cols.append(f'<table:table-column table:style-name="{name}"/>')
+        by_column = {}
+        for v in sheet.validations:
+            name = f"val{len(validations) + 1}"
+            items = ";".join("&quot;" + escape(o.replace('"', '""'), {'"': "&quot;"}) + "&quot;"
+                             for o in toolkit.lists[v.list_name])
+            validations.append(f'<table:content-validation table:name="{name}" table:allow-empty-cell="true" '
+                               f'table:condition="of:cell-content-is-in-list({items})" table:display-list="unsorted"/>')
+            by_column[sheet.headers.index(v.column)] = name
+
+        rows = [f"<table:table-row>{ods_cell(sheet.title, 'title')}</table:table-row>"]
+        if sheet.subtitle:
+            rows.append(f"<table:table-row>{ods_cell(sheet.subtitle, 'subtitle')}</table:table-row>")
+        rows.append("<table:table-row><table:table-cell/></table:table-row>")
+        rows.append("<table:table-row>" + "".join(ods_cell(h, "header") for h in sheet.headers) + "</table:table-row>")
+        for row in sheet.rows:
+            rows.append("<table:table-row>" + "".join(ods_cell(v, validation=by_column.get(i)) for i, v in enumerate(row))
+                        + "</table:table-row>")
+        if sheet.notes:
+            rows.append("<table:table-row><table:table-cell/></table:table-row>")
+            rows.extend(f"<table:table-row>{ods_cell(note)}</table:table-row>" for note in sheet.notes)
+        tables.append(f"<table:table table:name={quoteattr(sheet.name)}>{''.join(cols)}{''.join(rows)}</table:table>")
+
+    column_styles = "".join(
+        f'<style:style style:name="{name}" style:family="table-column">'
+        f'<style:table-column-properties style:column-width="{w * 0.19:.2f}cm"/></style:style>'
+        for w, name in widths.items())
+    xmlns = " ".join(f'xmlns:{prefix}="{uri}"' for prefix, uri in ODS_NS.items())
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<office:document-content {xmlns} office:version="1.2">'
+            f"<office:automatic-styles>{column_styles}{ODS_CELL_STYLES}</office:automatic-styles>"
+            f"<office:body><office:spreadsheet>"
+            f"<table:content-validations>{''.join(validations)}</table:content-validations>"
+            f"{''.join(tables)}</office:spreadsheet></office:body></office:document-content>")
+
+def render_ods(toolkit, path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        # The mimetype must come first and be stored uncompressed
+        zf.writestr(zipfile.ZipInfo("mimetype"), ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+        zf.writestr("META-INF/manifest.xml", ODS_MANIFEST)
+        zf.writestr("content.xml", ods_content(toolkit))
+    return path
+
+# ── CSV bundle ──
+def render_csv(toolkit, path):
+    """A zip with one CSV per sheet (header row first) plus lists.csv."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, sheet in enumerate(toolkit.sheets, 1):
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator="\n")
+            writer.writerow(sheet.headers)
+            writer.writerows(sheet.rows)
+            zf.writestr(f"{i:02d}-{slug(sheet.name)}.csv", buf.getvalue())
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(["list", "option"])
+        writer.writerows((name, option) for name, options in toolkit.lists.items() for option in options)
+        zf.writestr("lists.csv", buf.getvalue())
+    return path
+
+# ── JSON for the web app ──
+def render_json(toolkit, path):
+    data = {
+        "sha256": toolkit.sha256,
+        "lists": toolkit.lists,
+        "sheets": [{
+            "name": sheet.name,
+            "title": sheet.title,
+            "subtitle": sheet.subtitle,
+            "color": sheet.color,
+            "headers": sheet.headers,
+            "rows": sheet.rows,
+            "validations": [v._asdict() for v in sheet.validations],
+            "notes": sheet.notes,
+        } for sheet in toolkit.sheets],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp, path)
+    return path
+
+# format -> (renderer, default file name)
+renderers = {
+    "xlsx": (render_xlsx, "Inquiry Consulting Toolkit (content).xlsx"),
+    "ods": (render_ods, "Inquiry Consulting Toolkit.ods"),
+    "csv": (render_csv, "Inquiry Consulting Toolkit (csv).zip"),
+    "json": (render_json, "toolkit.json"),
+}
+
+def render(fmt, toolkit_path, output):
+    """Worker: load the compiled IR and run one renderer; returns seconds taken."""
+    t0 = time.perf_counter()
+    renderers[fmt][0](load_toolkit(toolkit_path), output)
+    return time.perf_counter() - t0
+
+def render_all(output_dir, formats=tuple(renderers), cache_dir=DEFAULT_CACHE_DIR, jobs=None, register_rows=50):
+    """Compile (or reuse) the IR once, then render ``formats`` in parallel.
+
+    Returns ``(compiled now?, {format: (path, seconds)})``.
+    """
+    toolkit_path, fresh = compiled(cache_dir, register_rows)
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=jobs or min(len(formats), os.cpu_count())) as pool:
+        futures = {}
+        for fmt in formats:
+            path = os.path.join(output_dir, renderers[fmt][1])
+            futures[fmt] = path, pool.submit(render, fmt, toolkit_path, path)
+        return fresh, {fmt: (path, future.result()) for fmt, (path, future) in futures.items()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the toolkit content to xlsx, ODS, CSV and JSON from one compile.")
+    parser.add_argument("-o", "--output-dir", required=True, help="directory for the rendered files")
+    parser.add_argument("--formats", nargs="+", choices=list(renderers), default=list(renderers))
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"where compiled IR is kept (default: {DEFAULT_CACHE_DIR!r})")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per format)")
+    parser.add_argument("--register-rows", type=int, default=50, help="numbered blank rows in each register")
+    args = parser.parse_args(argv)
+
+    fresh, results = render_all(args.output_dir, args.formats, args.cache_dir, args.jobs, args.register_rows)
+    print("Compiled content" if fresh else f"Content unchanged; reused the IR in {args.cache_dir}")
+    for fmt, (path, seconds) in results.items():
+        print(f"  {fmt:5s} {seconds:6.2f}s  {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,351 @@
+"""Local HTTP service that builds toolkit workbooks on request.
+
+    python scripts/toolkit_service.py --port 8765 --jobs 2 --cache-dir .toolkit-cache
+    curl -X POST --data '{"info": {"Chair": "Sir A"}}' localhost:8765/build -o toolkit.xlsx
+    curl localhost:8765/stats
+    python scripts/toolkit_service.py --check     # exercise a server on a free localhost port
+
+POST /build takes a build_workbook config as JSON (register rows as lists)
+and returns the xlsx. Each request is keyed by a hash of the resolved config
+(its "as_of" is the only date a build depends on), the build code and the
+inquiries CSV. Results are kept in a size-bounded LRU:
+recent workbooks in memory, older ones spilled to ``<cache dir>/results``,
+which is itself bounded and survives restarts. Concurrent requests for the
+same key share one build. Builds run in a process pool so the event loop
+only parses requests and copies bytes; at most ``jobs`` builds run at once
+and the rest wait their turn. The X-Cache response header says how each
+request was served: memory, disk, coalesced or built.
+
+Only the standard library is used: the HTTP/1.1 handling is deliberately
+minimal (one request per connection) as the service listens on localhost.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import build_workbook as bw
+import inquiry_data
+import sheet_cache
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_DIR = ".toolkit-cache"
+MEMORY_BYTES = 64 * 1024 * 1024
+DISK_BYTES = 1024 * 1024 * 1024
+MAX_BODY = 16 * 1024 * 1024
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+class ResultCache:
+    """LRU of built workbooks by key: newest in memory, spilled to disk beyond ``memory_bytes``."""
+
+    def __init__(self, directory=None, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.memory = OrderedDict()
+        self.memory_used = 0
+        # key -> size, least recently used first; rebuilt from the directory on start
+        self.disk = OrderedDict()
+        self.disk_used = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(directory):
+                if name.endswith(".xlsx"):
+                    st = os.stat(os.path.join(directory, name))
+                    entries.append((st.st_mtime, name[:-5], st.st_size))
+            for _, key, size in sorted(entries):
+                self.disk[key] = size
+                self.disk_used += size
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".xlsx")
+
+    def get(self, key):
+        """``(data, "memory" | "disk")``, or ``(None, None)`` on a miss."""
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            return data, "memory"
+        if key in self.disk:
+            try:
+                with open(self.path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                self.drop_from_disk(key)
+                return None, None
+            self.drop_from_disk(key, remove=True)
+            self.put(key, data)
+            return data, "disk"
+        return None, None
+
+    def put(self, key, data):
+        if key in self.memory:
+            self.memory_used -= len(self.memory.pop(key))
+        self.memory[key] = data
+        self.memory_used += len(data)
+        while self.memory_used > self.memory_bytes and len(self.memory) > 1:
+            old_key, old = self.memory.popitem(last=False)
+            self.memory_used -= len(old)
+            self.spill(old_key, old)
+
+    def spill(self, key, data):
+        if not self.directory or len(data) > self.disk_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path(key))
+        self.disk[key] = len(data)
+        self.disk_used += len(data)
+        while self.disk_used > self.disk_bytes:
+            self.drop_from_disk(next(iter(self.disk)), remove=True)
+
+    def drop_from_disk(self, key, remove=False):
+        self.disk_used -= self.disk.pop(key)
+        if remove:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        return {"memory_entries": len(self.memory), "memory_bytes": self.memory_used,
+                "disk_entries": len(self.disk), "disk_bytes": self.disk_used}
+
+def build_bytes(config, cache_dir=None):
+    """Worker: the xlsx for ``config``, reusing unchanged tabs from the sheet cache if given."""
+    cache = None
+    # The sheet cache holds openpyxl sheets; XML-backend builds go without it
+    if cache_dir and bw.resolve_config(config)["backend"] == "openpyxl":
+        cache = sheet_cache.SheetCache(os.path.join(cache_dir, "sheets"))
+    return bw.build_workbook(config, cache=cache)
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ToolkitService:
+    def __init__(self, jobs=None, cache_dir=None, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs)
+        self.cache_dir = cache_dir
+        self.results = ResultCache(cache_dir and os.path.join(cache_dir, "results"), memory_bytes, disk_bytes)
+        self.slots = asyncio.Semaphore(self.jobs)
+        self.in_flight = {}
+        self.code_version = sheet_cache.code_version()
+        self.counts = {"memory": 0, "disk": 0, "coalesced": 0, "built": 0, "errors": 0}
+        self.build_seconds = 0.0
+
+    def key(self, config):
+        resolved = bw.resolve_config(config)
+        return sheet_cache.source_hash(self.code_version, inquiry_data.load_inquiries().sha256, resolved)
+
+    async def workbook(self, config):
+        """``(data, how, key)`` for ``config``; ``how`` is memory, disk, coalesced or built."""
+        key = self.key(config)
+        data, how = self.results.get(key)
+        if data is None and key in self.in_flight:
+            data, how = await asyncio.shield(self.in_flight[key]), "coalesced"
+        elif data is None:
+            future = asyncio.get_running_loop().create_future()
+            self.in_flight[key] = future
+            try:
+                async with self.slots:
+                    t0 = time.perf_counter()
+                    data = await asyncio.get_running_loop().run_in_executor(self.pool, build_bytes, config, self.cache_dir)
+                    self.build_seconds += time.perf_counter() - t0
+                self.results.put(key, data)
+                future.set_result(data)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Waiters see the exception; mark it retrieved so an unshared failure isn't logged
+                future.exception()
+                raise
+            finally:
+                del self.in_flight[key]
+            how = "built"
+        self.counts[how] += 1
+        return data, how, key
+
+    def stats(self):
+        return {**self.counts, "in_flight": len(self.in_flight), "jobs": self.jobs,
+                "build_seconds": round(self.build_seconds, 3), **self.results.stats()}
+
+    # ── HTTP ──
+    async def handle(self, reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+            if path == "/build":
+                if method != "POST":
+                    raise HttpError(405, "POST a JSON config to /build")
+                try:
+                    config = json.loads(body or b"{}")
+                    if not isinstance(config, dict):
+                        raise ValueError("config must be a JSON object")
+                    bw.resolve_config(config)
+                except ValueError as e:
+                    raise HttpError(400, str(e))
+                data, how, key = await self.workbook(config)
+                await respond(writer, 200, data, XLSX_TYPE, {"X-Cache": how, "ETag": f'"{key}"'})
+            elif path == "/stats":
+                await respond(writer, 200, json.dumps(self.stats()).encode(), "application/json")
+            else:
+                raise HttpError(404, f"no route {path}")
+        except HttpError as e:
+            await respond(writer, e.status, json.dumps({"error": str(e)}).encode(), "application/json")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            self.counts["errors"] += 1
+            await respond(writer, 500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode(), "application/json")
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def read_request(reader):
+    """``(method, path, body)`` of one HTTP/1.1 request."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        # Past the stream's buffer limit (64 KiB by default) without a blank line
+        raise HttpError(431, "request line and headers too long")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HttpError(400, f"malformed Content-Length {headers['content-length']!r}")
+    if length > MAX_BODY:
+        raise HttpError(413, f"request body over {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+async def respond(writer, status, body, content_type, headers=None):
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}",
+             f"Content-Length: {len(body)}", "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+# ═══════════════════════════════════════════════════════════════
+# LOCALHOST CHECK
+# ═══════════════════════════════════════════════════════════════
+async def request(port, method, path, body=b""):
+    """A minimal client: ``(status, headers, body)``."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in head[1:] if line)
+    data = await reader.readexactly(int(headers["Content-Length"]))
+    writer.close()
+    return int(head[0].split()[1]), headers, data
+
+async def check(concurrent=8, jobs=2):
+    """Serve on a free port; identical concurrent requests must share one build, repeats must hit the cache."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        service = ToolkitService(jobs, cache_dir, memory_bytes=1)
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        problems = []
+        try:
+            config = json.dumps({"info": {"Inquiry Name": "Service Check"}}).encode()
+            t0 = time.perf_counter()
+            first = await asyncio.gather(*(request(port, "POST", "/build", config) for _ in range(concurrent)))
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            status, headers, data = await request(port, "POST", "/build", config)
+            warm = time.perf_counter() - t0
+            other = await request(port, "POST", "/build", json.dumps({"info": {"Inquiry Name": "Other"}}).encode())
+            again = await request(port, "POST", "/build", config)
+            bad = await request(port, "POST", "/build", b'{"colour": "red"}')
+            xml = await request(port, "POST", "/build", b'{"backend": "xml"}')
+            stats = json.loads((await request(port, "GET", "/stats"))[2])
+
+            if {r[0] for r in first} != {200} or len({r[2] for r in first}) != 1:
+                problems.append("concurrent requests did not all get the same workbook")
+            if sorted(r[1]["X-Cache"] for r in first) != ["built"] + ["coalesced"] * (concurrent - 1):
+                problems.append(f"expected one build for {concurrent} identical requests: {[r[1]['X-Cache'] for r in first]}")
+            if status != 200 or data != first[0][2]:
+                problems.append("repeat request returned a different workbook")
+            # memory_bytes=1 keeps only the newest entry in memory, so once
+            # another workbook is built the first comes back from disk
+            if (headers["X-Cache"], other[1]["X-Cache"], again[1]["X-Cache"]) != ("memory", "built", "disk"):
+                problems.append(f"unexpected cache use: {headers['X-Cache']}, {other[1]['X-Cache']}, {again[1]['X-Cache']}")
+            if bad[0] != 400:
+                problems.append(f"unknown config key gave HTTP {bad[0]}")
+            if xml[0] != 200:
+                problems.append(f"an XML-backend build gave HTTP {xml[0]}")
+            if stats["errors"]:
+                problems.append(f"{stats['errors']} build error(s)")
+            print(f"{concurrent} concurrent identical requests: {cold:.2f}s; repeat: {warm * 1000:.1f} ms")
+            print(f"stats: {stats}")
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve toolkit workbooks over HTTP on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-j", "--jobs", type=int, help="concurrent builds (default: one per core)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="spilled results and the sheet cache")
+    parser.add_argument("--memory-mb", type=float, default=MEMORY_BYTES / 2**20, help="results kept in memory")
+    parser.add_argument("--disk-mb", type=float, default=DISK_BYTES / 2**20, help="results kept on disk")
+    parser.add_argument("--check", action="store_true", help="run the localhost self-check and exit")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        problems = asyncio.run(check())
+        for line in problems:
+            print(line)
+        print(f"{len(problems)} problem(s)" if problems else "Service check passed")
+        return 1 if problems else 0
+
+    async def run():
+        service = ToolkitService(args.jobs, args.cache_dir, int(args.memory_mb * 2**20), int(args.disk_mb * 2**20))
+        server = await service.serve(args.host, args.port)
+        print(f"Serving on http://{args.host}:{server.sockets[0].getsockname()[1]} with {service.jobs} build worker(s)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+"""Direct SpreadsheetML backend: rows go straight into the zip as XML text.
+
+    python scripts/build_workbook.py --backend xml
+    python scripts/xml_backend.py --check            # compare against openpyxl
+
+XmlWorkbook and XmlWorksheet provide the small part of openpyxl's write-only
+API the tab builders use (create_sheet, append, column/row dimensions,
+freeze_panes, data_validations, conditional_formatting, merged_cells,
+auto_filter), so every builder runs unchanged on either backend. The
+difference is per cell: an XmlCell is a plain slotted record, its style is
+looked up in a table of (named style, font, fill, alignment, border, number
+format) combinations resolved once each, strings go into a shared-strings
+table, and each row is formatted as text and written to the open zip entry.
+
+openpyxl's objects are still used for things there are only a handful of:
+the style table itself (an internal Workbook that never holds a sheet),
+validations, conditional formats, the auto-filter and defined names.
+"""
+from collections import defaultdict
+from copy import copy
+from datetime import date, datetime, time, timedelta
+from xml.sax.saxutils import escape, quoteattr
+import argparse
+import io
+import numbers
+import shutil
+import sys
+import tempfile
+import zipfile
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE, get_time_format
+from openpyxl.formatting.formatting import ConditionalFormattingList
+from openpyxl.packaging.core import DocumentProperties
+from openpyxl.packaging.extended import ExtendedProperties
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE, is_date_format
+from openpyxl.styles.stylesheet import apply_stylesheet, write_stylesheet
+from openpyxl.utils import absolute_coordinate, column_index_from_string, get_column_letter, quote_sheetname
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.utils.datetime import to_excel
+from openpyxl.utils.exceptions import IllegalCharacterError
+from openpyxl.workbook.child import INVALID_TITLE_REGEX
+from openpyxl.workbook.defined_name import DefinedNameDict
+from openpyxl.worksheet.cell_range import MultiCellRange
+from openpyxl.worksheet.datavalidation import DataValidationList
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.properties import WorksheetProperties
+from openpyxl.writer.theme import theme_xml
+from openpyxl.xml.functions import tostring
+
+import formula_values
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+SHEET_CT = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+STRINGS_CT = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+
+# Rows are formatted into a buffer and handed to the zip stream in chunks
+FLUSH_ROWS = 512
+
+class XmlCell:
+    """A cell value plus the style attributes the builders set on it."""
+
+    __slots__ = ("value", "style", "font", "fill", "alignment", "border", "number_format")
+
+    def __init__(self, ws=None, value=None):
+        self.value = value
+        self.style = self.font = self.fill = self.alignment = self.border = self.number_format = None
+
+class Dimension:
+    __slots__ = ("width", "height")
+
+    def __init__(self):
+        self.width = self.height = None
+
+class XmlWorksheet:
+    cell_class = XmlCell
+
+    def __init__(self, parent, title, index):
+        self.parent = parent
+        self.title = title
+        self.index = index
+        self.path = f"xl/worksheets/sheet{index + 1}.xml"
+        self.sheet_state = "visible"
+        self.sheet_properties = WorksheetProperties()
+        self.column_dimensions = defaultdict(Dimension)
+        self.row_dimensions = defaultdict(Dimension)
+        self.freeze_panes = None
+        self.data_validations = DataValidationList()
+        self.conditional_formatting = ConditionalFormattingList()
+        self.merged_cells = MultiCellRange()
+        self.auto_filter = AutoFilter()
+        self._stream = None
+        self._buffer = []
+        self._row = 0
+        self.closed = False
+
+    # ── Head: everything before <sheetData> ──
+    def _sheet_view(self):
+        if not self.freeze_panes or self.freeze_panes == "A1":
+            return '<sheetViews><sheetView workbookViewId="0"><selection activeCell="A1" sqref="A1"/></sheetView></sheetViews>'
+        col, row = coordinate_from_string(self.freeze_panes)
+        x, y = column_index_from_string(col) - 1, row - 1
+        pane = "bottomRight" if x and y else ("bottomLeft" if y else "topRight")
+        split = (f' xSplit="{x}"' if x else "") + (f' ySplit="{y}"' if y else "")
+        return (f'<sheetViews><sheetView workbookViewId="0"><pane{split} topLeftCell="{self.freeze_panes}" '
+                f'activePane="{pane}" state="frozen"/><selection pane="{pane}" activeCell="A1" sqref="A1"/>'
+                f'</sheetView></sheetViews>')
+
+    def _open(self):
+        self._stream = self.parent._archive.open(self.path, "w", force_zip64=True)
+        head = [f'<worksheet xmlns="{MAIN_NS}">', tostring(self.sheet_properties.to_tree()).decode(), self._sheet_view(),
+                '<sheetFormatPr baseColWidth="8" defaultRowHeight="15"/>']
+        widths = sorted((column_index_from_string(c), d.width) for c, d in self.column_dimensions.items() if d.width)
+        if widths:
+            head.append("<cols>" + "".join(f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in widths) + "</cols>")
+        head.append("<sheetData>")
+        self._stream.write("".join(head).encode("utf-8"))
+
+    # ── Rows ──
+    def append(self, row):
+        if self.closed:
+            raise RuntimeError(f"{self.title!r} was closed when the next sheet was created")
+        if self._stream is None:
+            self._open()
+        self._row = r = self._row + 1
+        dim = self.row_dimensions.get(r)
+        attrs = f' ht="{dim.height}" customHeight="1"' if dim is not None and dim.height else ""
+        cells = self.parent._row_cells(r, row)
+        if cells or attrs:
+            self._buffer.append(f'<row r="{r}"{attrs}>{cells}</row>')
+            if len(self._buffer) >= FLUSH_ROWS:
+                self._flush()
+
+    def _flush(self):
+        self._stream.write("".join(self._buffer).encode("utf-8"))
+        self._buffer = []
+
+    # ── Tail: everything after </sheetData> ──
+    def close(self):
+        if self.closed:
+            return
+        if self._stream is None:
+            self._open()
+        self._flush()
+        tail = ["</sheetData>"]
+        if self.auto_filter.ref:
+            tail.append(tostring(self.auto_filter.to_tree()).decode())
+        if self.merged_cells.ranges:
+            refs = [str(r) for r in self.merged_cells.ranges]
+            tail.append(f'<mergeCells count="{len(refs)}">' + "".join(f'<mergeCell ref="{r}"/>' for r in refs) + "</mergeCells>")
+        blank = DifferentialStyle()
+        for cf in self.conditional_formatting:
+            for rule in cf.rules:
+                if rule.dxf and rule.dxf != blank:
+                    rule.dxfId = self.parent._styles._differential_styles.add(rule.dxf)
+            tail.append(tostring(cf.to_tree()).decode())
+        if self.data_validations.dataValidation:
+            tail.append(tostring(self.data_validations.to_tree()).decode())
+        tail.append('<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/></worksheet>')
+        self._stream.write("".join(tail).encode("utf-8"))
+        self._stream.close()
+        self._stream = None
+        self.closed = True
+
+class XmlWorkbook:
+    """Write-only workbook that streams each sheet's XML into a zip as it is built."""
+
+    def __init__(self):
+        # Style registry only: holds fonts, fills, named styles and dxfs
+        self._styles = Workbook(write_only=True)
+        self._xf_ids = {}
+        self._strings = {}
+        self._string_refs = 0
+        self._file = tempfile.TemporaryFile()
+        self._archive = zipfile.ZipFile(self._file, "w", zipfile.ZIP_DEFLATED)
+        self.worksheets = []
+        self.defined_names = DefinedNameDict()
+        self._saved = False
+
+    @classmethod
+    def extending(cls, zin):
+        """A workbook whose string and style tables start as those of the package ``zin``.
+
+        Sheets built in it refer to the package's existing strings and styles,
+        so their parts can be added to that package (see sheet_parts) without
+        rewriting the sheets already there.
+        """
+        wb = cls()
+        apply_stylesheet(zin, wb._styles)
+        shared = formula_values.SharedStrings(zin)
+        wb._strings = {shared[i]: i for i in range(len(shared.items))}
+        # References from the sheets that are kept, give or take those being replaced
+        wb._string_refs = shared.count
+        return wb
+
+    def add_named_style(self, style):
+        self._styles.add_named_style(style)
+
+    def create_sheet(self, title):
+        if INVALID_TITLE_REGEX.search(title) or len(title) > 31:
+            raise ValueError(f"Invalid worksheet title {title!r}")
+        if self.worksheets:
+            self.worksheets[-1].close()
+        ws = XmlWorksheet(self, title, len(self.worksheets))
+        self.worksheets.append(ws)
+        return ws
+
+    # ── Cells ──
+    def _style_id(self, cell, number_format):
+        """Index into cellXfs for ``cell``; each combination is resolved once."""
+        key = (cell.style, id(cell.font), id(cell.fill), id(cell.alignment), id(cell.border), number_format)
+        hit = self._xf_ids.get(key)
+        if hit is not None:
+            return hit[0]
+        styles = self._styles
+        sa = copy(styles._named_styles[cell.style].as_tuple() if cell.style else styles._cell_styles[0])
+        if cell.font is not None:
+            sa.fontId = styles._fonts.add(cell.font)
+        if cell.fill is not None:
+            sa.fillId = styles._fills.add(cell.fill)
+        if cell.alignment is not None:
+            sa.alignmentId = styles._alignments.add(cell.alignment)
+        if cell.border is not None:
+            sa.borderId = styles._borders.add(cell.border)
+        if number_format is not None:
+            if number_format in BUILTIN_FORMATS_REVERSE:
+                sa.numFmtId = BUILTIN_FORMATS_REVERSE[number_format]
+            else:
+                sa.numFmtId = styles._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+        xf = styles._cell_styles.add(sa)
+        # The style objects are kept so their ids can't be reused by others
+        self._xf_ids[key] = (xf, cell.font, cell.fill, cell.alignment, cell.border)
+        return xf
+
+    def _string_id(self, text):
+        self._string_refs += 1
+        idx = self._strings.get(text)
+        if idx is None:
+            if ILLEGAL_CHARACTERS_RE.search(text):
+                raise IllegalCharacterError(f"{text!r} cannot be used in worksheets.")
+            idx = self._strings[text] = len(self._strings)
+        return idx
+
+    def _row_cells(self, r, row):
+        out = []
+        for col, cell in enumerate(row, 1):
+            if isinstance(cell, XmlCell):
+                value, number_format = cell.value, cell.number_format
+                styled = cell.style is not None or cell.font is not None or cell.fill is not None \
+                    or cell.alignment is not None or cell.border is not None or number_format is not None
+            else:
+                value, number_format, styled = cell, None, False
+            if isinstance(value, (date, time, timedelta)) and not is_date_format(number_format or "General"):
+                number_format, styled = get_time_format(type(value)), True
+                if not isinstance(cell, XmlCell):
+                    cell = XmlCell(value=value)
+            s = f' s="{self._style_id(cell, number_format)}"' if styled else ""
+            ref = f"{column_letter(col)}{r}"
+
+            if value is None or value == "":
+                if styled:
+                    out.append(f'<c r="{ref}"{s}/>')
+            elif isinstance(value, bool):
+                out.append(f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, numbers.Number):
+                # float() so NumPy scalars print as plain numbers
+                out.append(f'<c r="{ref}"{s} t="n"><v>{float(value)!r}</v></c>' if isinstance(value, float)
+                           else f'<c r="{ref}"{s} t="n"><v>{value}</v></c>')
+            elif isinstance(value, str):
+                if len(value) > 1 and value.startswith("="):
+                    out.append(f'<c r="{ref}"{s}><f>{escape(value[1:])}</f><v></v></c>')
+                elif value in ERROR_CODES:
+                    out.append(f'<c r="{ref}"{s} t="e"><v>{value}</v></c>')
+                else:
+                    out.append(f'<c r="{ref}"{s} t="s"><v>{self._string_id(value)}</v></c>')
+            elif isinstance(value, (date, time, timedelta)):
+                if isinstance(value, (datetime, time)) and value.tzinfo is not None:
+                    raise TypeError("Excel does not support timezones in datetimes.")
+                out.append(f'<c r="{ref}"{s} t="n"><v>{to_excel(value)!r}</v></c>')
+            else:
+                raise ValueError(f"Cannot convert {value!r} to Excel")
+        return "".join(out)
+
+    # ── Package ──
+    def _write_part(self, name, xml):
+        self._archive.writestr(name, xml if isinstance(xml, bytes) else xml.encode("utf-8"))
+
+    def _workbook_xml(self):
+        sheets, names = [], [tostring(dn.to_tree()).decode() for dn in self.defined_names.values()]
+        for ws in self.worksheets:
+            sheets.append(f'<sheet name={quoteattr(ws.title)} sheetId="{ws.index + 1}" state="{ws.sheet_state}" r:id="rId{ws.index + 1}"/>')
+            if ws.auto_filter.ref:
+                ref = f"{quote_sheetname(ws.title)}!{absolute_coordinate(ws.auto_filter.ref)}"
+                names.append(f'<definedName name="_xlnm._FilterDatabase" localSheetId="{ws.index}" hidden="1">{escape(ref)}</definedName>')
+        defined = f"<definedNames>{''.join(names)}</definedNames>" if names else ""
+        return (f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><workbookPr/>'
+                f'<bookViews><workbookView activeTab="0"/></bookViews><sheets>{"".join(sheets)}</sheets>{defined}'
+                f'<calcPr calcId="124519" fullCalcOnLoad="1"/></workbook>')
+
+    def _shared_strings_xml(self):
+        items = "".join(f'<si><t xml:space="preserve">{escape(s)}</t></si>' for s in self._strings)
+        return f'<sst xmlns="{MAIN_NS}" count="{self._string_refs}" uniqueCount="{len(self._strings)}">{items}</sst>'
+
+    def _relationships(self):
+        n = len(self.worksheets)
+        rels = [f'<Relationship Id="rId{ws.index + 1}" Type="{REL_NS}/worksheet" Target="/{ws.path}"/>' for ws in self.worksheets]
+        rels.append(f'<Relationship Id="rId{n + 1}" Type="{REL_NS}/styles" Target="styles.xml"/>')
+        rels.append(f'<Relationship Id="rId{n + 2}" Type="{REL_NS}/theme" Target="theme/theme1.xml"/>')
+        rels.append(f'<Relationship Id="rId{n + 3}" Type="{REL_NS}/sharedStrings" Target="sharedStrings.xml"/>')
+        return f'<Relationships xmlns="{PKG_REL_NS}">{"".join(rels)}</Relationships>'
+
+    def _content_types(self):
+        ct = "application/vnd.openxmlformats-officedocument"
+        overrides = [
+            ("/xl/workbook.xml", f"{ct}.spreadsheetml.sheet.main+xml"),
+            ("/xl/styles.xml", f"{ct}.spreadsheetml.styles+xml"),
+            ("/xl/sharedStrings.xml", STRINGS_CT),
+            ("/xl/theme/theme1.xml", f"{ct}.theme+xml"),
+            ("/docProps/core.xml", "application/vnd.openxmlformats-package.core-properties+xml"),
+            ("/docProps/app.xml", f"{ct}.extended-properties+xml"),
+        ] + [(f"/{ws.path}", SHEET_CT) for ws in self.worksheets]
+        return (f'<Types xmlns="{CT_NS}">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                + "".join(f'<Override PartName="{p}" ContentType="{t}"/>' for p, t in overrides) + "</Types>")
+
+    def sheet_parts(self):
+        """Finish the sheets only and return ``{title: sheet xml}``, in place of save.
+
+        The string and style tables then cover every sheet: write them with
+        shared_strings_xml() and stylesheet_xml().
+        """
+        if self._saved:
+            raise RuntimeError("Workbook has already been saved")
+        self._saved = True
+        if self.worksheets:
+            self.worksheets[-1].close()
+        self._archive.close()
+        with zipfile.ZipFile(self._file) as zin:
+            parts = {ws.title: zin.read(ws.path) for ws in self.worksheets}
+        self._file.close()
+        return parts
+
+    def shared_strings_xml(self):
+        return self._shared_strings_xml()
+
+    def stylesheet_xml(self):
+        return tostring(write_stylesheet(self._styles))
+
+    def save(self, filename):
+        """Finish the package and write it to a path or binary file object."""
+        if self._saved:
+            raise RuntimeError("Workbook has already been saved")
+        self._saved = True
+        if self.worksheets:
+            self.worksheets[-1].close()
+        self._write_part("xl/sharedStrings.xml", self._shared_strings_xml())
+        self._write_part("xl/styles.xml", self.stylesheet_xml())
+        self._write_part("xl/theme/theme1.xml", theme_xml)
+        self._write_part("xl/workbook.xml", self._workbook_xml())
+        self._write_part("xl/_rels/workbook.xml.rels", self._relationships())
+        self._write_part("docProps/core.xml", tostring(DocumentProperties().to_tree()))
+        self._write_part("docProps/app.xml", tostring(ExtendedProperties().to_tree()))
+        self._write_part("_rels/.rels", (
+            f'<Relationships xmlns="{PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            f'<Relationship Id="rId2" Type="{PKG_REL_NS}/metadata/core-properties" Target="docProps/core.xml"/>'
+            f'<Relationship Id="rId3" Type="{REL_NS}/extended-properties" Target="docProps/app.xml"/>'
+            "</Relationships>"))
+        self._write_part("[Content_Types].xml", self._content_types())
+        self._archive.close()
+
+        self._file.seek(0)
+        if hasattr(filename, "write"):
+            shutil.copyfileobj(self._file, filename)
+        else:
+            with open(filename, "wb") as f:
+                shutil.copyfileobj(self._file, f)
+        self._file.close()
+
+_letters = {}
+
+def column_letter(col):
+    letter = _letters.get(col)
+    if letter is None:
+        letter = _letters[col] = get_column_letter(col)
+    return letter
+
+# ═══════════════════════════════════════════════════════════════
+# CHECK — the XML backend against the openpyxl path
+# ═══════════════════════════════════════════════════════════════
+def sheet_summary(ws):
+    """Everything about a loaded sheet that both backends must agree on."""
+    return {
+        "freeze_panes": ws.freeze_panes,
+        "auto_filter": ws.auto_filter.ref,
+        "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+        "validations": sorted((dv.type, dv.formula1, str(dv.sqref), dv.allow_blank, dv.error, dv.errorTitle)
+                              for dv in ws.data_validations.dataValidation),
+        "conditional_formatting": sorted((str(cf.sqref), tuple(tuple(r.formula) for r in cf.rules),
+                                          tuple(repr(r.dxf) for r in cf.rules)) for cf in ws.conditional_formatting),
+        "widths": {k: v.width for k, v in ws.column_dimensions.items() if v.width},
+        "heights": {k: v.height for k, v in ws.row_dimensions.items() if v.height},
+        "tab_color": ws.sheet_properties.tabColor.rgb if ws.sheet_properties.tabColor else None,
+        "state": ws.sheet_state,
+    }
+
+def cell_summary(cell):
+    return (cell.value, cell.number_format, cell.style, repr(cell.font), repr(cell.fill),
+            repr(cell.border), repr(cell.alignment))
+
+def compare_workbooks(expected, actual):
+    """Differences between two saved workbooks (paths or file objects), as text lines."""
+    from openpyxl import load_workbook
+
+    a, b = load_workbook(expected), load_workbook(actual)
+    if a.sheetnames != b.sheetnames:
+        return [f"sheet names differ: {a.sheetnames} != {b.sheetnames}"]
+    names_a = {name: dn.attr_text for name, dn in a.defined_names.items()}
+    names_b = {name: dn.attr_text for name, dn in b.defined_names.items()}
+    diffs = [] if names_a == names_b else [f"defined names differ: {names_a} != {names_b}"]
+    for name in a.sheetnames:
+        x, y = a[name], b[name]
+        sx, sy = sheet_summary(x), sheet_summary(y)
+        diffs += [f"{name}: {key} {sx[key]!r} != {sy[key]!r}" for key in sx if sx[key] != sy[key]]
+        for row in range(1, max(x.max_row, y.max_row) + 1):
+            for col in range(1, max(x.max_column, y.max_column) + 1):
+                cx, cy = cell_summary(x.cell(row, col)), cell_summary(y.cell(row, col))
+                if cx != cy:
+                    diffs.append(f"{name}!{get_column_letter(col)}{row}: {cx} != {cy}")
+    return diffs
+
+def check(rows=200):
+    """Build the toolkit with both backends and compare the results."""
+    import bench_workbook
+    import build_workbook as bw
+
+    def config(backend):
+        return {
+            "backend": backend,
+            "info": {"Inquiry Name": "Check Inquiry", "Date Established": date(2024, 1, 15)},
+            "decisions": bench_workbook.decision_rows(rows),
+            "core_participants": bench_workbook.core_participant_rows(rows),
+            "stakeholders": bench_workbook.stakeholder_rows(rows),
+        }
+
+    expected, actual = io.BytesIO(), io.BytesIO()
+    bw.build_workbook(config("openpyxl"), expected)
+    bw.build_workbook(config("xml"), actual)
+    return compare_workbooks(expected, actual)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the XML backend's output with openpyxl's.")
+    parser.add_argument("--check", action="store_true", required=True)
+    parser.add_argument("--rows", type=int, default=200, help="rows per register in the comparison build")
+    args = parser.parse_args(argv)
+
+    diffs = check(args.rows)
+    for line in diffs[:50]:
+        print(line)
+    if diffs:
+        print(f"{len(diffs)} difference(s)")
+        return 1
+    print("XML backend output matches openpyxl")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+// BM25 search over the checklist guidance, Risk Register and statutory matrix.
+// The inverted index is built by scripts/search_index.py into search.index.json
+// (rebuilt only when the content changes) — regenerate it rather than editing
+// the JSON by hand. Postings are [doc gap, term frequency, ...] per term.
+import INDEX from "./search.index.json";
+
+// Mirrors scripts/search_index.py so queries hit the same terms
+const STOPWORDS = new Set(`
+a an and are as at be been but by can for from has have if in into is it its may must not of on or
+should so such than that the their then there these this to was were what when which who will with
+`.split(/\s+/).filter(Boolean));
+
+export function tokenize(text) {
+  const tokens = [];
+  for (let word of (text || "").toLowerCase().match(/[a-z0-9]+/g) || []) {
+    if (STOPWORDS.has(word) || (word.length < 2 && !/^\d+$/.test(word))) continue;
+    if (word.length > 4 && word.endsWith("s") && !word.endsWith("ss")) word = word.slice(0, -1);
+    tokens.push(word);
+  }
+  return tokens;
+}
+
+const N = INDEX.docs.length;
+const AVGDL = INDEX.docs.reduce((sum, d) => sum + d[5], 0) / N;
+const NORMS = INDEX.docs.map((d) => INDEX.k1 * (1 - INDEX.b + INDEX.b * d[5] / AVGDL));
+
+// Postings are decoded on first use of each term
+const postings = new Map();
+
+function weights(term) {
+  if (postings.has(term)) return postings.get(term);
+  // Own keys only: "constructor" would otherwise find Object.prototype's
+  const flat = Object.hasOwn(INDEX.terms, term) ? INDEX.terms[term] : [];
+  const df = flat.length / 2;
+  const idf = Math.log(1 + (N - df + 0.5) / (df + 0.5));
+  const out = [];
+  let doc = 0;
+  for (let i = 0; i < flat.length; i += 2) {
+    doc += flat[i];
+    const tf = flat[i + 1];
+    out.push([doc, idf * tf * (INDEX.k1 + 1) / (tf + NORMS[doc])]);
+  }
+  postings.set(term, out);
+  return out;
+}
+
+// Best k matches as { score, tab, row, kind, title, detail }, best first
+export function searchGuidance(query, k = 10) {
+  const scores = new Map();
+  for (const term of new Set(tokenize(query))) {
+    for (const [doc, w] of weights(term)) scores.set(doc, (scores.get(doc) || 0) + w);
+  }
+  return [...scores]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, k)
+    .map(([doc, score]) => {
+      const [tab, row, kind, title, detail] = INDEX.docs[doc];
+      return { score, tab: INDEX.tabs[tab], row, kind: INDEX.kinds[kind], title, detail };
+    });
+}
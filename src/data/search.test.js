@@ -0,0 +1,28 @@
+// node --test src/ (npm test). Node needs an import attribute for JSON that
+// Vite doesn't, so .json modules are loaded as plain ES modules here.
+import { register } from "node:module";
+import assert from "node:assert/strict";
+import { test } from "node:test";
+
+register(`data:text/javascript,${encodeURIComponent(`
+  import { readFile } from "node:fs/promises";
+  export async function load(url, context, next) {
+    if (!url.endsWith(".json")) return next(url, context);
+    const json = await readFile(new URL(url), "utf8");
+    return { format: "module", source: "export default " + json, shortCircuit: true };
+  }
+`)}`);
+const { searchGuidance, tokenize } = await import("./search.js");
+
+test("finds guidance by stemmed terms", () => {
+  const [best] = searchGuidance("disclosure documents");
+  assert.ok(best.score > 0);
+  assert.ok(tokenize("Documents").includes("document"));
+});
+
+test("Object.prototype names are ordinary terms", () => {
+  for (const query of ["constructor", "toString", "__proto__", "hasOwnProperty"]) {
+    assert.deepEqual(searchGuidance(query), []);
+  }
+  assert.deepEqual(searchGuidance("constructor disclosure"), searchGuidance("disclosure"));
+});
@@ -0,0 +1,28 @@
+import os
+import sys
+
+# The scripts are run directly rather than installed, so import them the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import pytest
+
+@pytest.fixture(scope="session")
+def returned_toolkits(tmp_path_factory):
+    """Two built toolkits as a team might send them back: one untouched, one partly filled in and saved by openpyxl."""
+    import build_workbook as bw
+    from openpyxl import load_workbook
+
+    directory = tmp_path_factory.mktemp("returned")
+    bw.build_workbook({"info": {"Inquiry Name": "Alpha Inquiry"}}, str(directory / "alpha.xlsx"))
+    bw.build_workbook({"info": {"Inquiry Name": "Beta Inquiry", "Chair": "Dame Beta"}}, str(directory / "beta.xlsx"))
+    wb = load_workbook(directory / "beta.xlsx")
+    phase = wb[next(iter(bw.phase_data))]
+    phase["F5"] = phase["F6"] = "Complete"
+    phase["F7"] = "N/A"
+    risks = wb["Risk Register"]
+    risks["D5"] = risks["D6"] = "High"  # both now High / High: Critical
+    risks["I6"] = "Closed"
+    budget = wb["Budget Tracker"]
+    budget["C5"], budget["E5"] = 250_000, 700_000
+    wb.save(directory / "beta.xlsx")
+    return directory
@@ -0,0 +1,32 @@
+"""Batch builds: one toolkit per CSV row, with bad rows reported rather than fatal."""
+import csv
+
+from openpyxl import load_workbook
+
+import batch_workbooks
+import inquiry_data
+
+def test_output_names_are_unique():
+    rows = [{"name": "Grenfell Tower Inquiry"}, {"name": "Grenfell Tower  inquiry!"}, {"name": ""}]
+    assert list(batch_workbooks.output_names(rows)) == [
+        "grenfell-tower-inquiry.xlsx", "grenfell-tower-inquiry-2.xlsx", "inquiry.xlsx"]
+
+def test_build_all(tmp_path):
+    rows = batch_workbooks.read_rows(inquiry_data.DATA_CSV)[:2]
+    bad = {**rows[0], "name": "Bad Row", "inquiry_type": "royal_commission"}
+    csv_path = tmp_path / "inquiries.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows([*rows, bad])
+
+    results = {name: (inquiry, error) for name, inquiry, _, error in
+               batch_workbooks.build_all(str(csv_path), str(tmp_path / "out"), jobs=2)}
+    assert "unknown inquiry_type" in results["bad-row.xlsx"][1]
+    assert not (tmp_path / "out" / "bad-row.xlsx").exists()
+    for row, name in zip(rows, batch_workbooks.output_names(rows)):
+        assert results[name] == (row["name"], None)
+        wb = load_workbook(tmp_path / "out" / name, read_only=True)
+        overview = [r for r in wb["Overview"].iter_rows(values_only=True) if r and r[0] == "Inquiry Name:"]
+        assert overview[0][1] == row["name"]
+        assert "Comparable Inquiries" in wb.sheetnames
@@ -0,0 +1,33 @@
+"""The bootstrap cost forecast and the Budget Tracker it seeds."""
+import io
+
+import numpy as np
+from openpyxl import load_workbook
+import pytest
+
+import budget_forecast
+import build_workbook as bw
+
+def test_bootstrap_percentiles():
+    assert budget_forecast.bootstrap_percentiles(np.full(5, 7.0)).tolist() == [7.0, 7.0, 7.0]
+    values = np.array([1.0, 2.0, 4.0, 8.0, 100.0])
+    p10, p50, p90 = budget_forecast.bootstrap_percentiles(values)
+    assert 1 < p10 < p50 < p90 < 100
+    # A resample's P90 is often below the outlier, so the average is too
+    assert p90 < np.percentile(values, 90)
+    assert budget_forecast.bootstrap_percentiles(values).tolist() == [p10, p50, p90]
+
+def test_forecast_splits_the_totals():
+    result = budget_forecast.forecast(bw.categories, hearing_days=120)
+    assert result["n"] > 10 and not result["widened"]
+    assert result["shares"].sum() == pytest.approx(1)
+    np.testing.assert_allclose(result["by_category"].sum(axis=0), list(result["totals"].values()))
+
+def test_unmatched_filters_widen():
+    result = budget_forecast.forecast(bw.categories, subject_area="no such area")
+    assert result["widened"] and result["n"] > 10
+
+def test_budget_tracker_leaves_forecast_total_blank():
+    ws = load_workbook(io.BytesIO(bw.build_workbook({})))["Budget Tracker"]
+    rows = [row for row in ws.iter_rows(values_only=True) if row[0] in bw.categories][:len(bw.categories)]
+    assert all(row[1] > 0 and row[4] is None for row in rows)
@@ -0,0 +1,27 @@
+"""Building the same toolkit on different days gives the same bytes."""
+from datetime import date
+
+import build_workbook as bw
+import durations
+import inquiry_data
+
+class Later(date):
+    @classmethod
+    def today(cls):
+        return cls(2031, 3, 1)
+
+def config():
+    return {"info": {"Date Established": "2024-01-15"}, "schedule": {}}
+
+def test_same_bytes_on_another_day(monkeypatch):
+    first = bw.build_workbook(config())
+    for module in (bw, durations, inquiry_data):
+        monkeypatch.setattr(module, "date", Later)
+    assert bw.build_workbook(config()) == first
+
+def test_as_of_defaults_to_the_csv():
+    assert bw.as_of_date(bw.resolve_config({})) == inquiry_data.data_date(inquiry_data.load_inquiries())
+    assert bw.as_of_date(bw.resolve_config({"as_of": "2026-06-30"})) == date(2026, 6, 30)
+
+def test_as_of_moves_the_benchmarks():
+    assert bw.build_workbook(config()) != bw.build_workbook({**config(), "as_of": "2030-01-01"})
@@ -0,0 +1,50 @@
+"""Comparable-inquiry scores over the inquiries CSV."""
+import numpy as np
+import pytest
+
+import comparables
+import inquiry_data
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    return comparables.load_index(index_path=str(tmp_path_factory.mktemp("comparables") / "index.npz"))
+
+def test_an_inquiry_is_its_own_best_match(index):
+    table = inquiry_data.load_inquiries()
+    rows = [i for i in range(len(table["name"])) if table["description"][i]][:20]
+    for i in rows:
+        best = comparables.find_comparables(comparables.query_from_row(table, i), k=1, index=index)[0]
+        assert best["row"] == i and best["score"] == pytest.approx(1)
+        name = table["name"][i]
+        assert comparables.find_comparables(comparables.query_from_row(table, i), k=1, exclude={name},
+                                            index=index)[0]["name"] != name
+
+def test_missing_parts_take_the_mean(index):
+    # As if the first three inquiries had no description
+    text = index["text"].copy()
+    text[:3] = 0
+    score, text, category, scale = comparables.similarities({**index, "text": text},
+                                                           {"description": "hospital maternity deaths"})
+    assert np.isnan(category).all() and np.isnan(scale).all()
+    known = ~np.isnan(text)
+    assert not known[:3].any() and known[3:].all()
+    np.testing.assert_allclose(score[known], text[known])
+    np.testing.assert_allclose(score[~known], text[known].mean())
+
+def test_category_agreement_is_weighted(index):
+    query = {"subject_area": index["cat_subject_area"][0], "inquiry_type": "no such type"}
+    _, _, category, _ = comparables.similarities(index, query)
+    same = index["cat_subject_area"] == query["subject_area"]
+    # Subject area is worth 0.5 of the 0.8 the two fields carry together
+    expected = np.where(same, 0.5 / 0.8, 0)
+    both = (index["cat_subject_area"] != "") & (index["cat_inquiry_type"] != "")
+    np.testing.assert_allclose(category[both], expected[both])
+
+def test_saved_index_matches_a_fresh_one(tmp_path):
+    path = str(tmp_path / "index.npz")
+    comparables.load_index(index_path=path, rebuild=True)
+    with np.load(path, allow_pickle=False) as saved:
+        fresh = comparables.build_index()
+        assert set(saved.files) == set(fresh)
+        for key in fresh:
+            np.testing.assert_array_equal(saved[key], fresh[key])
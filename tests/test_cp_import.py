@@ -0,0 +1,34 @@
+"""Deduplicating and grouping core participant lists."""
+import cp_import
+
+def import_rows(tmp_path, *lists):
+    paths = []
+    for n, text in enumerate(lists):
+        path = tmp_path / f"list{n}.csv"
+        path.write_text("Name,Solicitor\n" + text)
+        paths.append(str(path))
+    rows, stats = cp_import.import_participants(paths)
+    columns = cp_import.register_columns
+    return [dict(zip(columns, row)) for row in rows], stats
+
+def test_namesakes_with_different_firms_stay_apart(tmp_path):
+    rows, stats = import_rows(tmp_path, "John Smith,Firm A\nJohn Smith,Firm B\nJane Doe,Firm B\n")
+    assert stats["unique"] == 3
+    by_firm = {row["Recognised Legal Rep"]: row for row in rows if row["Name / Organisation"] == "John Smith"}
+    assert set(by_firm) == {"Firm A", "Firm B"}
+    jane = next(row for row in rows if row["Name / Organisation"] == "Jane Doe")
+    assert by_firm["Firm B"]["Joint Representation Group"] == jane["Joint Representation Group"]
+    assert by_firm["Firm A"]["Joint Representation Group"] is None
+
+def test_merged_rows_keep_every_firm(tmp_path):
+    rows, stats = import_rows(tmp_path, "Mr John Smith,Firm A\nJane Doe,Firm D\n", "Smith John,Firm A / Firm D\nJohn Smith,\n")
+    assert stats["unique"] == 2
+    john = next(row for row in rows if row["Name / Organisation"] == "Mr John Smith")
+    assert john["Recognised Legal Rep"] == "Firm A; Firm D"
+    assert len({row["Joint Representation Group"] for row in rows}) == 1
+
+def test_firmless_row_does_not_join_namesakes(tmp_path):
+    rows, stats = import_rows(tmp_path, "Anna Kowalski,Firm A\nAnna Kowalsky,\nAnna Kowalsky,Firm B\n")
+    # The typo merges the firmless row with one of them, never both firms into one participant
+    assert stats["unique"] == 2
+    assert sorted(row["Recognised Legal Rep"] for row in rows) == ["Firm A", "Firm B"]
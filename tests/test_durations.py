@@ -0,0 +1,50 @@
+"""Kaplan–Meier duration curves and the Overview's Target Report Date."""
+from datetime import date
+import io
+import json
+
+import numpy as np
+from openpyxl import load_workbook
+
+import build_workbook as bw
+import durations
+import inquiry_data
+
+# Closed after 2, 3 and 5 months; one still open at 3 and one at 8
+MONTHS = np.array([2.0, 3.0, 3.0, 5.0, 8.0])
+CLOSED = np.array([True, True, False, True, False])
+
+def test_kaplan_meier_by_hand():
+    times, survival = durations.kaplan_meier(MONTHS, CLOSED)
+    # S(2) = 4/5, S(3) = 4/5 * 3/4 (the open one at 3 is still at risk), S(5) = 3/5 * 1/2
+    assert times.tolist() == [2, 3, 5]
+    np.testing.assert_allclose(survival[0], [0.8, 0.6, 0.3])
+    assert durations.quantile_time(times, survival, 0.5)[0] == 5
+    assert np.isnan(durations.quantile_time(times, survival, 0.8)[0])
+    # 2 months at 1, 1 at 0.8, 2 at 0.6, 3 at 0.3
+    np.testing.assert_allclose(durations.restricted_mean(times, survival, 8.0), [4.9])
+
+def test_weights_count_inquiries():
+    # Counting the first inquiry twice is the same as listing it twice
+    _, weighted = durations.kaplan_meier(MONTHS, CLOSED, [[2, 1, 1, 1, 1]])
+    _, listed = durations.kaplan_meier(np.r_[2.0, MONTHS], np.r_[True, CLOSED])
+    np.testing.assert_allclose(weighted, listed)
+
+def test_curves_saved_per_csv_only(tmp_path):
+    path = str(tmp_path / "durations.json")
+    durations.load_curves(curves_path=path, rebuild=True)
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["key"]["sha256"] == inquiry_data.load_inquiries().sha256 and "as_of" not in saved["key"]
+    # Another date is computed, not written over the saved curves
+    durations.load_curves(as_of=date(2030, 1, 1), curves_path=path)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == saved
+
+def target_report_date(config):
+    ws = load_workbook(io.BytesIO(bw.build_workbook(config)))["Overview"]
+    return next(row[1] for row in ws.iter_rows(values_only=True) if row[0] == "Target Report Date:")
+
+def test_target_report_date_needs_date_established():
+    assert target_report_date({}) is None
+    assert target_report_date({"info": {"Date Established": "2024-01-15"}}).startswith("Median ")
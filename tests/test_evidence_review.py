@@ -0,0 +1,33 @@
+"""The evidence-review simulation ranks team sizes and times the recommended one over the same scenarios."""
+import numpy as np
+import pytest
+
+import evidence_review
+
+OPTIONS = {"scenarios": 5000, "hearing_days": 60}
+
+@pytest.fixture(scope="module")
+def result():
+    return evidence_review.run(weeks_to_hearing=40, **OPTIONS)
+
+def test_larger_teams_finish_sooner(result):
+    on_time = [row["on_time"] for row in result["staffing"]]
+    assert on_time == sorted(on_time) and on_time[0] < on_time[-1]
+    recommended = result["recommended"]
+    assert recommended == next(row["team"] for row in result["staffing"]
+                               if row["on_time"] >= evidence_review.TARGET_CONFIDENCE)
+    assert result["timeline_team"] == recommended
+
+def test_timeline_matches_the_team_on_its_own(result):
+    alone = evidence_review.simulate([result["timeline_team"]], 40, **OPTIONS)
+    assert len(result["timeline"]) == len(alone["timeline"])
+    for ours, theirs in zip(result["timeline"], alone["timeline"]):
+        assert ours[0] == theirs[0]
+        for a, b in zip(ours[1:], theirs[1:]):
+            np.testing.assert_array_equal(a, b)
+
+def test_no_team_on_time_falls_back_to_the_last():
+    result = evidence_review.run(weeks_to_hearing=10, team_sizes=[2, 5], documents=2_000_000, scenarios=500)
+    assert result["recommended"] is None and result["timeline_team"] == 5
+    assert result["timeline"][-1][0] > 10
+    np.testing.assert_array_equal(result["inputs"]["documents"], 2_000_000)
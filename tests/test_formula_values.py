@@ -0,0 +1,66 @@
+"""The formula evaluator follows Excel's rules, and fill_package caches its results in the package."""
+import io
+import zipfile
+
+import openpyxl
+import pytest
+
+import formula_values as fv
+
+@pytest.mark.parametrize("formula, cells, expected", [
+    ('IF(A1>5,"big","small")', {"A1": 7.0}, "big"),
+    ('IF(A1>5,"big","small")', {"A1": 3.0}, "small"),
+    ('AND(A1>0,B1="")', {"A1": 1.0}, True),     # a blank equals ""
+    ("OR(A1,B1)", {}, False),
+    ("NOT(TRUE)", {}, False),
+    ("SUM(A1:B2)", {"A1": 1.0, "B2": 2.5, "A2": "x"}, 3.5),  # text in a range is skipped
+    ("A1=0", {}, True),                         # and a blank equals 0
+    ('"x"&A1&1.5', {"A1": 2.0}, "x21.5"),
+    ('"a"<"B"', {}, True),                      # text compares without case
+    ('"1"+1', {}, 2.0),
+])
+def test_evaluate(formula, cells, expected):
+    assert fv.evaluate(formula, cells) == expected
+
+@pytest.mark.parametrize("formula, cells, error", [
+    ("1/0", {}, "#DIV/0!"),
+    ('"a"+1', {}, "#VALUE!"),
+    ("SUM(A1:A2)+1", {"A1": fv.Error("#N/A")}, "#N/A"),
+])
+def test_errors_propagate(formula, cells, error):
+    value = fv.evaluate(formula, cells)
+    assert isinstance(value, fv.Error) and value == error
+
+def test_unsupported_functions_are_reported():
+    with pytest.raises(fv.Unsupported):
+        fv.evaluate("VLOOKUP(A1,B1:C2,2)")
+
+def package(*formulas):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([2, 3, "Open"])
+    ws.append(["=A1*B1", '=IF(C1="Open",A2+1,0)', "=SUM(A1:B1)&\" total\""])
+    for formula in formulas:
+        ws.append([formula])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+def workbook_xml(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return z.read("xl/workbook.xml").decode("utf-8")
+
+def test_fill_package_round_trip():
+    filled = fv.fill_package(package())
+    values = openpyxl.load_workbook(io.BytesIO(filled), data_only=True).active
+    assert [c.value for c in values[2]] == [6, 7, "5 total"]
+    # The formulas themselves are kept
+    formulas = openpyxl.load_workbook(io.BytesIO(filled)).active
+    assert formulas["A2"].value == "=A1*B1"
+    assert "fullCalcOnLoad" not in workbook_xml(filled)
+
+def test_unsupported_formula_keeps_full_recalculation():
+    filled = fv.fill_package(package("=VLOOKUP(A1,A1:B1,2)"))
+    values = openpyxl.load_workbook(io.BytesIO(filled), data_only=True).active
+    assert values["A2"].value == 6 and values["A3"].value is None
+    assert "fullCalcOnLoad" in workbook_xml(filled)
@@ -0,0 +1,35 @@
+"""Built and filled-in toolkits read back into SQLite."""
+import sqlite3
+
+import build_workbook as bw
+import ingest_toolkits
+
+def test_ingest(tmp_path, returned_toolkits):
+    db = str(tmp_path / "toolkits.sqlite")
+    results = list(ingest_toolkits.ingest([str(returned_toolkits), str(tmp_path / "missing.xlsx")], db, jobs=2))
+    assert [error for _, error in results if error is not None] == [results[-1][1]]
+    assert "missing.xlsx" in results[-1][0]
+
+    conn = sqlite3.connect(db)
+    toolkits = dict(conn.execute("SELECT inquiry_name, id FROM toolkits"))
+    assert set(toolkits) == {"Alpha Inquiry", "Beta Inquiry"}
+    assert conn.execute("SELECT chair FROM toolkits WHERE id = ?", (toolkits["Beta Inquiry"],)).fetchone() == ("Dame Beta",)
+    items = sum(len(data["items"]) for data in bw.phase_data.values())
+    for name, complete, na in [("Alpha Inquiry", 0, 0), ("Beta Inquiry", 2, 1)]:
+        assert conn.execute("SELECT COUNT(*), TOTAL(status = 'Complete'), TOTAL(status = 'N/A') FROM phase_items "
+                            "WHERE toolkit_id = ?", (toolkits[name],)).fetchone() == (items, complete, na)
+    # Beta was saved by openpyxl, so its ratings have no cached value and are evaluated on ingest
+    assert conn.execute("SELECT likelihood, impact, risk_rating, status FROM risks WHERE toolkit_id = ? AND num = 1",
+                        (toolkits["Beta Inquiry"],)).fetchone() == ("High", "High", "Critical", "Open")
+    assert conn.execute("SELECT COUNT(*) FROM risks WHERE risk_rating IS NULL").fetchone() == (0,)
+    assert conn.execute("SELECT spend_to_date, forecast_total FROM budget WHERE toolkit_id = ? AND cost_category = ?",
+                        (toolkits["Beta Inquiry"], bw.categories[0])).fetchone() == (250_000, 700_000)
+    assert conn.execute("SELECT COUNT(*) FROM budget").fetchone() == (2 * len(bw.categories),)
+    conn.close()
+
+    # Ingesting again replaces a file's rows rather than adding to them
+    list(ingest_toolkits.ingest([str(returned_toolkits / "beta.xlsx")], db, jobs=1))
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM toolkits").fetchone() == (2,)
+    assert conn.execute("SELECT COUNT(*) FROM budget").fetchone() == (2 * len(bw.categories),)
+    conn.close()
@@ -0,0 +1,48 @@
+"""The inquiries CSV as the benchmark index and statistics read it."""
+import csv
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+import inquiry_data
+
+FULLER = "Independent Inquiry into the issues raised by the David Fuller case"
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    # A new path, so the load (and its warnings) isn't served from the cache
+    path = tmp_path / "inquiries.csv"
+    shutil.copy(inquiry_data.DATA_CSV, path)
+    return str(path)
+
+def test_hearing_days_longer_than_the_inquiry_are_dropped(csv_copy):
+    with pytest.warns(UserWarning, match="David Fuller case: hearing_days 3700"):
+        table = inquiry_data.load_inquiries(csv_copy)
+    fuller = list(table["name"]).index(FULLER)
+    assert np.isnan(table["hearing_days"][fuller])
+    assert np.isnan(inquiry_data.compute_statistics(table)["derived"]["cost_per_hearing_day"][fuller])
+    # and only it
+    with open(csv_copy, encoding="utf-8-sig") as f:
+        recorded = [row["hearing_days"] for row in csv.DictReader(f)]
+    assert (table["hearing_days"] > 0).sum() == sum(1 for v in recorded if v.strip()) - 1
+
+def test_index_leaves_out_uncurated_inquiries(tmp_path, csv_copy):
+    index_path = str(tmp_path / "index.json")
+    with pytest.warns(UserWarning, match="no short_subject") as record:
+        assert inquiry_data.build_index(csv_copy, index_path)
+    table = inquiry_data.load_inquiries(csv_copy)
+    uncurated = {name for name, subject in zip(table["name"], table["short_subject"]) if not subject}
+    assert uncurated and all(name in str(w.message) for w in record if "short_subject" in str(w.message)
+                             for name in uncurated)
+    with open(index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    names = {r["fullName"] for r in index["inquiries"]}
+    assert not names & uncurated and len(names) == len(table) - len(uncurated)
+    assert all(r["subject"] for r in index["inquiries"])
+    # Ongoing inquiries are measured to the CSV's own latest date
+    assert index["asOf"] == inquiry_data.data_date(table).isoformat()
+
+def test_shipped_index_is_current():
+    assert inquiry_data.read_index()["sha256"] == inquiry_data.file_sha256(inquiry_data.DATA_CSV)
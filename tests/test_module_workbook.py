@@ -0,0 +1,20 @@
+"""Adding modules to a built toolkit gives the workbook a full modular build would."""
+import io
+
+import pytest
+
+import build_workbook as bw
+import module_workbook
+import xml_backend
+
+INFO = {"Inquiry Name": "Test Inquiry", "Date Established": "2024-01-15"}
+M1 = {"id": "M1", "title": "Resilience and preparedness"}
+M2 = {"id": "M2", "title": "Decision-making"}
+
+@pytest.mark.parametrize("backend", ["openpyxl", "xml"])
+def test_update_matches_full_build(backend):
+    data = bw.build_workbook({"info": INFO, "backend": backend})
+    data = module_workbook.update_modules(data, [M1], {"info": INFO})
+    data = module_workbook.update_modules(data, [M1, M2], {"info": INFO})
+    full = module_workbook.build({"info": INFO, "modules": [M1, M2]})
+    assert xml_backend.compare_workbooks(io.BytesIO(full), io.BytesIO(data)) == []
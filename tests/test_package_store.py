@@ -0,0 +1,47 @@
+"""Toolkits stored in the package store come back byte for byte and share unchanged parts."""
+import json
+import os
+
+import pytest
+
+import build_workbook as bw
+import package_store
+
+@pytest.fixture(scope="module")
+def toolkits():
+    return {
+        "a.xlsx": bw.build_workbook({"info": {"Inquiry Name": "Inquiry A"}}),
+        "b.xlsx": bw.build_workbook({"info": {"Inquiry Name": "Inquiry B"}}),
+    }
+
+def test_reproducible_is_idempotent(toolkits):
+    data = toolkits["a.xlsx"]
+    assert package_store.reproducible(data) == data
+
+def test_round_trip_and_shared_members(tmp_path, toolkits):
+    store = package_store.PackageStore(str(tmp_path))
+    digest_a, written_a = store.put(toolkits["a.xlsx"])
+    digest_b, written_b = store.put(toolkits["b.xlsx"])
+    assert digest_a == package_store.sha256(toolkits["a.xlsx"]) and digest_a != digest_b
+    # Only the Overview and the package's own recipe differ
+    assert 0 < written_b < written_a / 4
+    assert store.put(toolkits["a.xlsx"]) == (digest_a, 0)
+    reopened = package_store.PackageStore(str(tmp_path))
+    assert reopened.get(digest_a) == toolkits["a.xlsx"] and reopened.get(digest_b) == toolkits["b.xlsx"]
+    with pytest.raises(KeyError):
+        reopened.get("0" * 64)
+
+def test_manifest_records_versions(tmp_path, toolkits):
+    store = package_store.PackageStore(str(tmp_path))
+    assert store.add("acme-2026", {"toolkit.xlsx": toolkits["a.xlsx"]})[0] == ["toolkit.xlsx"]
+    path = store.manifest_path("acme-2026")
+    before = os.stat(path).st_mtime_ns
+    # Unchanged: nothing stored and the manifest left alone
+    assert store.add("acme-2026", {"toolkit.xlsx": toolkits["a.xlsx"]}) == ([], 0)
+    assert os.stat(path).st_mtime_ns == before
+    store.add("acme-2026", {"toolkit.xlsx": toolkits["b.xlsx"]})
+    with open(path, encoding="utf-8") as f:
+        versions = json.load(f)["files"]["toolkit.xlsx"]
+    assert [v["sha256"] for v in versions] == [package_store.sha256(toolkits[n]) for n in ("a.xlsx", "b.xlsx")]
+    with pytest.raises(ValueError):
+        store.manifest_path("../elsewhere")
@@ -0,0 +1,48 @@
+"""The portfolio dashboard's figures for toolkits built, filled in and ingested."""
+import io
+
+from openpyxl import load_workbook
+import pytest
+
+import build_workbook as bw
+import ingest_toolkits
+import portfolio_workbook
+
+def critical(likelihood, impact):
+    return bw.risk_rating(likelihood, impact) == "Critical"
+
+@pytest.fixture(scope="module")
+def dashboard(tmp_path_factory, returned_toolkits):
+    db = str(tmp_path_factory.mktemp("portfolio") / "toolkits.sqlite")
+    assert all(error is None for _, error in ingest_toolkits.ingest([str(returned_toolkits)], db, jobs=2))
+    return load_workbook(io.BytesIO(portfolio_workbook.build_portfolio(db)))
+
+def rows(ws, first):
+    """Rows from the one starting with ``first`` on, keyed by their first value."""
+    values = list(ws.iter_rows(values_only=True))
+    start = next(i for i, row in enumerate(values) if row[0] == first)
+    return {row[0]: row[1:] for row in values[start:] if row[0] is not None}
+
+def test_summary(dashboard):
+    items = sum(len(data["items"]) for data in bw.phase_data.values())
+    defaults = sum(critical(r[2], r[3]) for r in bw.risks)
+    # Beta's first risk was made Critical and its second closed
+    beta = defaults - critical(*bw.risks[0][2:4]) - critical(*bw.risks[1][2:4]) + 1
+    summary = rows(dashboard["Summary"], "Alpha Inquiry")
+    a, b = summary["Alpha Inquiry"], summary["Beta Inquiry"]
+    assert a[:4] == (items, 0, 0, defaults) and a[4] > 0 and a[5:7] == (0, a[4])
+    assert b[:4] == (items, 2, pytest.approx(2 / (items - 1)), beta)
+    assert b[4] == a[4] and b[5:7] == (700_000, b[4] - 700_000)
+    assert summary["PORTFOLIO"][:2] == (2 * items, 2) and summary["PORTFOLIO"][3] == defaults + beta
+
+def test_critical_risks(dashboard):
+    listed = [row for row in dashboard["Critical Risks"].iter_rows(min_row=5, values_only=True) if row[0]]
+    assert ("Beta Inquiry", 1) in {row[:2] for row in listed}
+    assert ("Beta Inquiry", 2) not in {row[:2] for row in listed}
+    assert all(critical(row[4], row[5]) and row[7] not in portfolio_workbook.CLOSED_RISK_STATUSES for row in listed)
+
+def test_budget_variance_by_category(dashboard):
+    by_category = rows(dashboard["Budget Variance"], "Cost Category")
+    spend, committed, forecast = by_category[bw.categories[0]][1:4]
+    assert (spend, committed, forecast) == (250_000, 0, 700_000)
+    assert by_category["TOTAL"][3] == 700_000
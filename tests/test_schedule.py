@@ -0,0 +1,49 @@
+"""Critical path, slack and dated schedules for small hand-worked plans."""
+from datetime import date
+
+import pytest
+
+import schedule
+
+# A(3) -> B(2) -> D(4); A -> C(1) -> D; E(2) waits for nothing.
+# Critical path A, B, D ends at 9; C has 1 week of slack and E 7.
+TASKS = {
+    "A": (3, []),
+    "B": (2, ["A"]),
+    "C": (1, ["A"]),
+    "D": (4, ["B", "C"]),
+    "E": (2, []),
+}
+
+def test_critical_path():
+    order, times = schedule.critical_path(TASKS)
+    assert set(order) == set(TASKS)
+    for task, (_, after) in TASKS.items():
+        assert all(order.index(p) < order.index(task) for p in after)
+    assert {task: t["slack"] for task, t in times.items()} == {"A": 0, "B": 0, "C": 1, "D": 0, "E": 7}
+    assert times["D"]["start"] == 5 and times["D"]["finish"] == 9
+    assert times["C"]["start"] == 3 and times["C"]["latest_start"] == 4
+    assert times["E"]["latest_finish"] == 9
+
+def test_cycle_is_an_error():
+    with pytest.raises(ValueError, match="cycle"):
+        schedule.critical_path({**TASKS, "A": (3, ["D"])})
+
+def test_unknown_prerequisite_is_an_error():
+    with pytest.raises(ValueError, match="unknown item 'Z'"):
+        schedule.critical_path({**TASKS, "E": (2, ["Z"])})
+
+def test_checklist_unknown_prerequisite_is_an_error():
+    phase_data = {"Setup": {"items": [("Appoint chair",), ("Publish terms",)]}}
+    with pytest.raises(ValueError, match="unknown item"):
+        schedule.checklist_tasks(phase_data, {"Publish terms": (1, ["Appoint panel"])})
+
+def test_schedule_dates_stretch_to_the_report_date():
+    established = date(2026, 1, 5)
+    order, rows, scale = schedule.schedule_dates(TASKS, established, report=date(2026, 1, 5 + 18))
+    assert scale == pytest.approx(18 / 63)
+    assert rows["D"]["finish"] == date(2026, 1, 23)
+    assert [task for task in order if rows[task]["critical"]] == ["A", "B", "D"]
+    # Without a report date the plan stays in planning weeks
+    _, rows, scale = schedule.schedule_dates(TASKS, established)
+    assert scale == 1.0 and rows["D"]["finish"] == date(2026, 3, 9)
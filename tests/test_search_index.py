@@ -0,0 +1,47 @@
+"""BM25 scores and postings for a small hand-worked corpus."""
+import math
+
+import pytest
+
+import build_workbook as bw
+import search_index
+
+PHASES = {"Setup": {"items": [
+    ("Appoint chair", "Choose the chair", "x", "Sponsor"),
+    ("Publish terms", "Terms of reference", "x", "Secretary"),
+]}}
+RISKS = [("Setup", "Delay in appointments", "H", "M", "Escalate early", "Sponsor")]
+MATRIX = [("Powers", "Yes", "No")]
+
+@pytest.fixture
+def data():
+    return search_index.build_index(PHASES, RISKS, MATRIX)
+
+def test_postings_are_delta_encoded(data):
+    assert [doc[5] for doc in data["docs"]] == [5, 5, 6, 3]
+    # sponsor is in documents 0 and 2, once each
+    assert data["terms"]["sponsor"] == [0, 1, 2, 1]
+    # plurals fold: "terms" twice in document 1, "appointments" to "appointment"
+    assert data["terms"]["term"] == [1, 2] and "appointment" in data["terms"]
+
+def test_bm25_by_hand(data):
+    result, = search_index.SearchIndex(data).search("chair")
+    idf = math.log(1 + (4 - 1 + 0.5) / (1 + 0.5))
+    norm = 1.2 * (1 - 0.75 + 0.75 * 5 / 4.75)
+    assert result["score"] == pytest.approx(idf * 2 * 2.2 / (2 + norm))
+    assert (result["tab"], result["row"], result["kind"], result["title"]) == ("Setup", 5, "Action", "Appoint chair")
+
+def test_ranking_and_unknown_terms(data):
+    index = search_index.SearchIndex(data)
+    results = index.search("sponsor escalate")
+    assert [r["kind"] for r in results] == ["Risk", "Action"]
+    assert index.search("constructor toString") == []
+
+def test_written_only_when_content_changes(tmp_path):
+    path = str(tmp_path / "search.index.json")
+    assert search_index.write_index(PHASES, RISKS, MATRIX, path)
+    assert not search_index.write_index(PHASES, RISKS, MATRIX, path)
+    assert search_index.write_index(PHASES, RISKS[:0], MATRIX, path)
+
+def test_shipped_index_is_current():
+    assert search_index.read_index()["sha256"] == search_index.build_index(bw.phase_data, bw.risks, bw.matrix)["sha256"]
@@ -0,0 +1,57 @@
+"""A build that reuses cached tabs must give the same bytes as one that renders them all."""
+import pytest
+
+import bench_workbook
+import build_workbook as bw
+import sheet_cache
+
+def config(chair="Sir Test", decisions=40, hearing_days=120):
+    # Lists, not generators, so the registers are cached too
+    return {
+        "info": {"Inquiry Name": "Test Inquiry", "Chair": chair},
+        "decisions": list(bench_workbook.decision_rows(decisions)),
+        "core_participants": list(bench_workbook.core_participant_rows(40)),
+        "forecast": {"hearing_days": hearing_days, "inquiry_type": "statutory"},
+        "index_terms": ["Section 40"],
+    }
+
+# Each change re-renders an early tab and leaves later ones to the cache
+CHANGES = {
+    "overview": {"chair": "Dame Other"},
+    "decision-log": {"decisions": 60},
+    "forecast": {"hearing_days": 200},
+}
+
+@pytest.mark.parametrize("streaming", [False, True], ids=["normal", "streaming"])
+@pytest.mark.parametrize("change", CHANGES)
+def test_partly_cached_build_matches_fresh(tmp_path, change, streaming):
+    bw.build_workbook({**config(), "streaming": streaming}, cache=sheet_cache.SheetCache(tmp_path))
+    cache = sheet_cache.SheetCache(tmp_path)
+    cached = bw.build_workbook({**config(**CHANGES[change]), "streaming": streaming}, cache=cache)
+    assert cache.rendered and cache.reused
+    assert cached == bw.build_workbook({**config(**CHANGES[change]), "streaming": streaming})
+
+def test_entries_are_not_pickles(tmp_path):
+    bw.build_workbook(config(), cache=sheet_cache.SheetCache(tmp_path))
+    entries = list(tmp_path.rglob("*" + sheet_cache.ENTRY_SUFFIX))
+    assert entries and not list(tmp_path.rglob("*.pickle"))
+    for path in entries:
+        data = path.read_bytes()
+        assert not data.startswith(b"\x80")  # pickle protocol 2+ header
+        assert sheet_cache.decode_entry(data)["cell_styles"]
+
+def test_unreadable_entry_is_rendered_again(tmp_path):
+    bw.build_workbook(config(), cache=sheet_cache.SheetCache(tmp_path))
+    for path in tmp_path.rglob("*" + sheet_cache.ENTRY_SUFFIX):
+        path.write_bytes(b"not an entry")
+    cache = sheet_cache.SheetCache(tmp_path)
+    assert bw.build_workbook(config(), cache=cache) == bw.build_workbook(config())
+    assert cache.rendered and not cache.reused
+
+def test_eviction_keeps_the_cache_under_its_limit(tmp_path):
+    bw.build_workbook(config(), cache=sheet_cache.SheetCache(tmp_path))
+    sizes = [path.stat().st_size for path in tmp_path.rglob("*" + sheet_cache.ENTRY_SUFFIX)]
+    limit = sum(sizes) // 2
+    bw.build_workbook(config(chair="Dame Other"), cache=sheet_cache.SheetCache(tmp_path, max_bytes=limit))
+    remaining = [path.stat().st_size for path in tmp_path.rglob("*" + sheet_cache.ENTRY_SUFFIX)]
+    assert remaining and sum(remaining) <= limit
@@ -0,0 +1,36 @@
+"""The localhost service: its self-check (coalescing, result caching) and request parsing."""
+import asyncio
+
+import pytest
+
+import toolkit_service
+
+def test_service_check():
+    assert asyncio.run(toolkit_service.check(concurrent=4)) == []
+
+def test_xml_backend_builds_without_the_sheet_cache(tmp_path):
+    data = toolkit_service.build_bytes({"backend": "xml"}, str(tmp_path))
+    assert data[:2] == b"PK" and not (tmp_path / "sheets").exists()
+
+def read(data, limit=2**16):
+    async def run():
+        reader = asyncio.StreamReader(limit=limit)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await toolkit_service.read_request(reader)
+    return asyncio.run(run())
+
+def test_read_request():
+    assert read(b"POST /build?x=1 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}") == ("POST", "/build", b"{}")
+
+@pytest.mark.parametrize("data, status", [
+    (b"GARBAGE\r\n\r\n", 400),
+    (b"POST /build HTTP/1.1\r\nContent-Length: ten\r\n\r\n", 400),
+    (b"POST /build HTTP/1.1\r\nContent-Length: -5\r\n\r\n", 400),
+    (f"POST /build HTTP/1.1\r\nContent-Length: {toolkit_service.MAX_BODY + 1}\r\n\r\n".encode(), 413),
+    (b"GET /stats HTTP/1.1\r\nX-Padding: " + b"a" * 2**17 + b"\r\n\r\n", 431),
+])
+def test_read_request_rejects(data, status):
+    with pytest.raises(toolkit_service.HttpError) as error:
+        read(data)
+    assert error.value.status == status
@@ -0,0 +1,44 @@
+"""The XML backend (and streaming mode) must produce the same workbook as openpyxl."""
+from datetime import date
+import io
+
+import pytest
+
+import bench_workbook
+import build_workbook as bw
+import xml_backend
+
+def default_config():
+    return {}
+
+def rich_config():
+    # Generators are consumed by a build, so each build gets a fresh config
+    return {
+        "info": {"Inquiry Name": "Test Inquiry", "Chair": "Sir Test", "Date Established": date(2024, 1, 15)},
+        "decisions": bench_workbook.decision_rows(120),
+        "core_participants": bench_workbook.core_participant_rows(120),
+        "stakeholders": bench_workbook.stakeholder_rows(120),
+        "forecast": {"hearing_days": 120, "inquiry_type": "statutory"},
+        "comparables": {"description": "hospital deaths", "subject_area": "health"},
+        "evidence_review": {"documents": 200000, "weeks_to_hearing": 40, "teams": [10, 20]},
+        "index_terms": ["Section 40", "Maxwellisation"],
+        "schedule": {"established": "2024-01-15"},
+        "modules": [{"id": "M1", "title": "Resilience and preparedness"}, {"id": "M2", "title": "Decision-making"}],
+    }
+
+def build(config, **options):
+    buf = io.BytesIO()
+    bw.build_workbook({**config, **options}, buf)
+    buf.seek(0)
+    return buf
+
+@pytest.mark.parametrize("config", [default_config, rich_config], ids=["default", "rich"])
+def test_xml_backend_matches_openpyxl(config):
+    assert xml_backend.compare_workbooks(build(config()), build(config(), backend="xml")) == []
+
+@pytest.mark.parametrize("config", [default_config, rich_config], ids=["default", "rich"])
+def test_streaming_matches_openpyxl(config):
+    assert xml_backend.compare_workbooks(build(config()), build(config(), streaming=True)) == []
+
+def test_check():
+    assert xml_backend.check(rows=20) == []